@@ -84,8 +84,19 @@ class CommonInfoAdminMixin:
     """
     Mixin to be used in a django model admin class.
     Sets all four `CommonInfo` attributes to "readonly" and sets the creator / last modifier on form save.
+    Loads the creator / last modifier with the objects to avoid one query per row in the changelist.
     """
 
+    # Fields of the user model to load with the objects, defaults to the queryset's "AUDIT_USER_FIELDS"
+    audit_user_fields = None
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Models with custom managers might not provide the method
+        if hasattr(queryset, "with_audit_users"):
+            queryset = queryset.with_audit_users(user_fields=self.audit_user_fields)
+        return queryset
+
     def get_readonly_fields(self, request, obj=None):
         """
         Set the fields CommonInfo handles to readonly to avoid users fiddling around with them.
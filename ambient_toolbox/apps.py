@@ -2,7 +2,7 @@ from django.apps import AppConfig
 from django.core.checks import Tags, register
 from django.utils.translation import gettext_lazy as _
 
-from ambient_toolbox.autodiscover.settings import get_autodiscover_enabled, get_namespaces
+from ambient_toolbox.autodiscover.settings import get_autodiscover_enabled, get_autodiscover_lazy, get_namespaces
 from ambient_toolbox.static_role_permissions.settings import (
     get_static_role_permissions_enable_system_check,
     get_static_role_permissions_path,
@@ -23,9 +23,10 @@ class AmbientToolboxConfig(AppConfig):
             register(check_permissions_against_models, Tags.models)
 
         # Function autodiscovery feature
-        if get_autodiscover_enabled():
-            # Register all decorated functions before they get imported by something else which will break the
-            # registration process since decorators are only executed the first time.
+        if get_autodiscover_enabled() and not get_autodiscover_lazy():
+            # Register all decorated functions on startup. In lazy mode, this is postponed until the first call of
+            # "get_registered_callables()", modules imported in the meantime are replayed from their recorded
+            # registrations.
             from ambient_toolbox.autodiscover import decorator_based_registry  # noqa: PLC0415
 
             decorator_based_registry.autodiscover(namespaces=get_namespaces())
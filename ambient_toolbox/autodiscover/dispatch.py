@@ -0,0 +1,171 @@
+import asyncio
+import dataclasses
+import os
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.db import connections
+
+from ambient_toolbox.autodiscover.logger import get_logger
+
+
+@dataclasses.dataclass(kw_only=True)
+class DispatchResult:
+    """
+    Outcome of calling a single handler with a payload (or a batch of payloads)
+    """
+
+    handler: typing.Callable
+    payload: typing.Any
+    result: typing.Any = None
+    error: Exception | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+class HandlerDispatcher:
+    """
+    Calls a list of handlers with payloads and collects their results and errors.
+    Handlers can be executed one after another, in a thread pool or concurrently in an asyncio event loop. Coroutine
+    functions are supported in every mode.
+    """
+
+    MODE_SEQUENTIAL = "sequential"
+    MODE_THREADS = "threads"
+    MODE_ASYNCIO = "asyncio"
+
+    MODES = (MODE_SEQUENTIAL, MODE_THREADS, MODE_ASYNCIO)
+
+    # Same default as the "ThreadPoolExecutor", which is used if "max_workers" isn't set
+    DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+    def __init__(
+        self,
+        *,
+        handlers: list[typing.Callable],
+        mode: str = MODE_SEQUENTIAL,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f'Invalid dispatch mode "{mode}". Choose one of: {", ".join(self.MODES)}.')
+
+        if timeout is not None and mode == self.MODE_SEQUENTIAL:
+            raise ValueError('Timeouts are only supported in the "threads" and "asyncio" modes.')
+
+        self.handlers = handlers
+        self.mode = mode
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    def dispatch(self, *, payloads: list) -> list[DispatchResult]:
+        """
+        Calls every handler once per payload
+        """
+        return self._execute(calls=[(handler, payload) for handler in self.handlers for payload in payloads])
+
+    def dispatch_batch(self, *, payloads: list, batch_size: int | None = None) -> list[DispatchResult]:
+        """
+        Calls every handler with lists of payloads, containing at most "batch_size" payloads each.
+        If no batch size is given, every handler is called exactly once with all payloads.
+        """
+        batch_size = batch_size or max(len(payloads), 1)
+        batches = [payloads[index : index + batch_size] for index in range(0, len(payloads), batch_size)]
+        return self._execute(calls=[(handler, batch) for handler in self.handlers for batch in batches])
+
+    async def adispatch(self, *, payloads: list) -> list[DispatchResult]:
+        """
+        Calls every handler once per payload concurrently in the running event loop
+        """
+        return await self._execute_asyncio(
+            calls=[(handler, payload) for handler in self.handlers for payload in payloads]
+        )
+
+    def _execute(self, *, calls: list[tuple[typing.Callable, typing.Any]]) -> list[DispatchResult]:
+        if self.mode == self.MODE_THREADS:
+            return self._execute_threads(calls=calls)
+        if self.mode == self.MODE_ASYNCIO:
+            return asyncio.run(self._execute_asyncio(calls=calls))
+        return [self._call(handler=handler, payload=payload) for handler, payload in calls]
+
+    def _call(self, *, handler: typing.Callable, payload: typing.Any) -> DispatchResult:  # noqa: ANN401
+        try:
+            if iscoroutinefunction(handler):
+                result = async_to_sync(handler)(payload)
+            else:
+                result = handler(payload)
+        except Exception as e:  # noqa: BLE001
+            get_logger().exception("Handler '%s' failed.", getattr(handler, "__name__", handler))
+            return DispatchResult(handler=handler, payload=payload, error=e)
+
+        return DispatchResult(handler=handler, payload=payload, result=result)
+
+    def _call_in_thread(self, *, handler: typing.Callable, payload: typing.Any) -> DispatchResult:  # noqa: ANN401
+        try:
+            return self._call(handler=handler, payload=payload)
+        finally:
+            # Database connections are bound to the thread, so we have to close them before the thread is re-used
+            connections.close_all()
+
+    def _call_with_timeout(self, *, handler: typing.Callable, payload: typing.Any) -> DispatchResult:  # noqa: ANN401
+        if self.timeout is None:
+            return self._call_in_thread(handler=handler, payload=payload)
+
+        # Python can't stop a running thread, so the handler runs in a thread of its own, which is abandoned if it
+        # exceeds the timeout. This way, the timeout starts when the handler starts and the worker is freed for the
+        # next handler.
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(self._call_in_thread, handler=handler, payload=payload)
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            return DispatchResult(
+                handler=handler,
+                payload=payload,
+                error=TimeoutError(f"Handler didn't finish within {self.timeout} seconds."),
+            )
+        finally:
+            executor.shutdown(wait=False)
+
+    def _execute_threads(self, *, calls: list[tuple[typing.Callable, typing.Any]]) -> list[DispatchResult]:
+        if not calls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers or self.DEFAULT_MAX_WORKERS, len(calls))) as executor:
+            futures = [
+                executor.submit(self._call_with_timeout, handler=handler, payload=payload) for handler, payload in calls
+            ]
+            return [future.result() for future in futures]
+
+    async def _execute_asyncio(self, *, calls: list[tuple[typing.Callable, typing.Any]]) -> list[DispatchResult]:
+        return list(
+            await asyncio.gather(*(self._acall(handler=handler, payload=payload) for handler, payload in calls))
+        )
+
+    async def _acall(self, *, handler: typing.Callable, payload: typing.Any) -> DispatchResult:  # noqa: ANN401
+        if iscoroutinefunction(handler):
+            coroutine = handler(payload)
+        else:
+            # Sync handlers run in a thread of their own, otherwise they would block each other
+            coroutine = sync_to_async(self._call_in_thread, thread_sensitive=False)(handler=handler, payload=payload)
+
+        try:
+            result = await asyncio.wait_for(coroutine, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return DispatchResult(
+                handler=handler,
+                payload=payload,
+                error=TimeoutError(f"Handler didn't finish within {self.timeout} seconds."),
+            )
+        except Exception as e:  # noqa: BLE001
+            get_logger().exception("Handler '%s' failed.", getattr(handler, "__name__", handler))
+            return DispatchResult(handler=handler, payload=payload, error=e)
+
+        # Sync handlers already return a result object
+        if isinstance(result, DispatchResult):
+            return result
+        return DispatchResult(handler=handler, payload=payload, result=result)
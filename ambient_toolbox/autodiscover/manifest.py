@@ -0,0 +1,105 @@
+import json
+import os
+from pathlib import Path
+
+from ambient_toolbox.utils.file import md5_checksum
+
+# Increase when the structure of the manifest changes to invalidate existing manifest files
+MANIFEST_VERSION = 2
+
+
+def get_file_fingerprint(*, file_path: Path) -> dict:
+    """
+    Returns the data we need to detect if a source file changed since the manifest was created
+    """
+    stat = os.stat(file_path)
+    return {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "checksum": md5_checksum(str(file_path)),
+    }
+
+
+def is_file_unchanged(*, file_path: Path, fingerprint: dict) -> bool:
+    """
+    Checks if the given source file still matches the stored fingerprint.
+    The cheap "stat" call is done first, the checksum is only calculated if the modification time differs, for
+    example because the code was checked out or copied in a deployment.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+
+    if stat.st_size != fingerprint["size"]:
+        return False
+
+    if stat.st_mtime_ns == fingerprint["mtime"]:
+        return True
+
+    return md5_checksum(str(file_path)) == fingerprint["checksum"]
+
+
+def build_manifest(*, namespaces: list[str], module_files: dict[str, Path], registry: dict[str, list[str]]) -> dict:
+    """
+    Creates a JSON-serialisable manifest containing the registry and the fingerprints of all scanned source files.
+    The registry is expected in its compact form, a list of "module:name" paths per registry group.
+    """
+    return {
+        "version": MANIFEST_VERSION,
+        "namespaces": sorted(set(namespaces)),
+        "modules": {
+            module_path: get_file_fingerprint(file_path=file_path) for module_path, file_path in module_files.items()
+        },
+        "registry": registry,
+    }
+
+
+def write_manifest(*, path: Path | str, manifest: dict) -> None:
+    """
+    Writes the manifest to the given path.
+    The file is replaced atomically, so a worker booting in parallel will never read a half-written manifest.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(*, path: Path | str) -> dict | None:
+    """
+    Reads the manifest from the given path. Returns None if there is no usable manifest.
+    """
+    try:
+        with open(path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+
+    return manifest
+
+
+def get_registry_from_manifest(
+    *, manifest: dict, namespaces: list[str], module_files: dict[str, Path]
+) -> dict[str, list[str]] | None:
+    """
+    Returns the registry stored in the manifest if it's still up-to-date.
+    "module_files" has to contain all modules which are currently found in the namespaces of the manifest.
+    Returns None if a namespace is missing or if a source file was added, removed or changed.
+    """
+    if not set(namespaces).issubset(manifest["namespaces"]):
+        return None
+
+    fingerprints = manifest["modules"]
+    if set(module_files.keys()) != set(fingerprints.keys()):
+        return None
+
+    for module_path, file_path in module_files.items():
+        if not is_file_unchanged(file_path=file_path, fingerprint=fingerprints[module_path]):
+            return None
+
+    return manifest["registry"]
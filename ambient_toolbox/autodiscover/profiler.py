@@ -0,0 +1,65 @@
+import contextlib
+import dataclasses
+import time
+from collections.abc import Iterator
+
+
+@dataclasses.dataclass(kw_only=True)
+class ModuleImportProfile:
+    """
+    Measurement of a single module handled by the autodiscovery
+    """
+
+    module: str
+    duration: float
+    callables: int
+    imported: bool
+
+
+class AutodiscoverProfiler:
+    """
+    Collects the time the autodiscovery spends in its phases and per module.
+    Pass an instance to "DecoratorBasedRegistry.autodiscover()" to record a run.
+    """
+
+    PHASE_CACHE_LOOKUP = "cache_lookup"
+    PHASE_MANIFEST_LOOKUP = "manifest_lookup"
+    PHASE_DIRECTORY_SCAN = "directory_scan"
+    PHASE_IMPORTS = "imports"
+    PHASE_CACHE_WRITE = "cache_write"
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.modules: list[ModuleImportProfile] = []
+
+    @contextlib.contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """
+        Adds the time spent in the wrapped block to the given phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - start
+
+    def add_module(self, *, module: str, duration: float, callables: int, imported: bool) -> None:
+        self.modules.append(
+            ModuleImportProfile(module=module, duration=duration, callables=callables, imported=imported)
+        )
+
+    def get_sorted_modules(self) -> list[ModuleImportProfile]:
+        """
+        Returns the measured modules, slowest first
+        """
+        return sorted(self.modules, key=lambda module_profile: module_profile.duration, reverse=True)
+
+    def as_dict(self) -> dict:
+        """
+        Returns a JSON-serialisable representation of the collected data
+        """
+        return {
+            "total": sum(self.phases.values()),
+            "phases": self.phases,
+            "modules": [dataclasses.asdict(module_profile) for module_profile in self.get_sorted_modules()],
+        }
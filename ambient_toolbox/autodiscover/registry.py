@@ -1,21 +1,37 @@
+import contextlib
 import dataclasses
+import hashlib
 import importlib
 import json
 import os
 import sys
+import time
 import typing
 from pathlib import Path
 
 from django.apps import apps
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.db import connections
 
+from ambient_toolbox.autodiscover.dispatch import DispatchResult, HandlerDispatcher
 from ambient_toolbox.autodiscover.logger import get_logger
-from ambient_toolbox.autodiscover.settings import get_autodiscover_app_base_path, get_autodiscover_cache_key
-from ambient_toolbox.autodiscover.utils import unique_append_to_inner_list
-
-
-# TODO: use (kw_only=True) once Python 3.9 compat was dropped
-@dataclasses.dataclass
+from ambient_toolbox.autodiscover.manifest import (
+    build_manifest,
+    get_registry_from_manifest,
+    load_manifest,
+    write_manifest,
+)
+from ambient_toolbox.autodiscover.profiler import AutodiscoverProfiler
+from ambient_toolbox.autodiscover.settings import (
+    get_autodiscover_app_base_path,
+    get_autodiscover_cache_key,
+    get_autodiscover_manifest_path,
+    get_namespaces,
+)
+from ambient_toolbox.middleware.performance import measure
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class CallableDefinition:
     """
     Projection to store registered functions in a JSON-serialisable way
@@ -24,6 +40,21 @@ class CallableDefinition:
     module: str
     name: str
 
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.module, self.name
+
+    def to_path(self) -> str:
+        """
+        Returns the compact "module:name" notation used in the cache and the manifest
+        """
+        return f"{self.module}:{self.name}"
+
+    @classmethod
+    def from_path(cls, path: str) -> "CallableDefinition":
+        module, name = path.split(":")
+        return cls(module=module, name=name)
+
 
 class DecoratorBasedRegistry:
     """
@@ -33,24 +64,33 @@ class DecoratorBasedRegistry:
     _instance: "DecoratorBasedRegistry" = None
 
     def __init__(self):
-        self.registry: dict = {}
+        # Ordered set of callables per registry group, keyed by (module, name)
+        self.registry: dict[str, dict[tuple[str, str], CallableDefinition]] = {}
+        # Version stamp of the cached registry the in-process registry was loaded from
+        self._cache_version: str | None = None
+        # Set while a profiled autodiscovery is running
+        self._profiler: AutodiscoverProfiler | None = None
+        # Imported callables per registry group, built on first access
+        self._resolved_callables: dict[str, list[typing.Callable]] = {}
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super().__new__(cls)
+            # Registrations per module, kept when the singleton is re-initialised since modules are only executed once
+            cls._instance._module_registrations = {}
         return cls._instance
 
     def register(self, *, registry_group: str) -> typing.Callable:
         def decorator(decoratee) -> typing.Callable:
             # Add decoratee to dependency list
-            function_definition = dataclasses.asdict(
-                CallableDefinition(module=decoratee.__module__, name=decoratee.__name__)
-            )
+            callable_definition = CallableDefinition(module=decoratee.__module__, name=decoratee.__name__)
+
+            # Remember registration to be able to restore it without importing the module again
+            module_registrations = self._module_registrations.setdefault(decoratee.__module__, {})
+            module_registrations[(registry_group, callable_definition.name)] = callable_definition
 
             # Add decoratee path to registry
-            self.registry = unique_append_to_inner_list(
-                data=self.registry, key=registry_group, value=function_definition
-            )
+            self._add_to_registry(registry_group=registry_group, callable_definition=callable_definition)
 
             logger = get_logger()
             logger.debug("Registered callable '%s'", decoratee.__name__)
@@ -60,21 +100,122 @@ class DecoratorBasedRegistry:
 
         return decorator
 
-    def autodiscover(self, *, namespaces: list[str]) -> None:
+    def autodiscover(
+        self, *, namespaces: list[str], profiler: AutodiscoverProfiler | None = None, use_cache: bool = True
+    ) -> None:
         """
         Detects message registries which have been registered via the "register_*" decorator.
+        If a profiler is given, it will record the time spent in every phase and module.
+        Without "use_cache", the Django cache is neither read nor written, e.g. to measure a cold start without
+        affecting other processes.
         """
+        self._profiler = profiler
+        try:
+            self._autodiscover(namespaces=namespaces, use_cache=use_cache)
+        finally:
+            self._profiler = None
+
+    def _autodiscover(self, *, namespaces: list[str], use_cache: bool = True) -> None:
         # Fetch registered functions from cache, if possible
-        self.registry = self._load_handlers_from_cache()
+        with self._measure(phase=AutodiscoverProfiler.PHASE_CACHE_LOOKUP):
+            self._set_registry(registry=self._load_handlers_from_cache() if use_cache else {})
 
         # If functions were cached, we don't have to go through the file system (again)
         if len(self.registry) > 0:
             return
 
+        logger = get_logger()
+
+        # If there is an up-to-date manifest, we can skip importing all the modules
+        with self._measure(phase=AutodiscoverProfiler.PHASE_MANIFEST_LOOKUP):
+            manifest_registry = self._load_handlers_from_manifest(namespaces=namespaces)
+
+        if manifest_registry is not None:
+            self._set_registry(registry=manifest_registry)
+            logger.debug("Function autodiscovery loaded registry from manifest.")
+        else:
+            with self._measure(phase=AutodiscoverProfiler.PHASE_DIRECTORY_SCAN):
+                module_files = self._scan_modules(namespaces=namespaces)
+            with self._measure(phase=AutodiscoverProfiler.PHASE_IMPORTS):
+                self._import_modules(module_paths=list(module_files.keys()))
+
+        # Log to shell which functions have been detected
+        logger.debug("Function autodiscovery running...")
+        registration_counter = 0
+        for group in self.registry.keys():
+            function_list = ", ".join(x.to_path() for x in self.registry[group].values())
+            logger.debug(f"* {group}: [{function_list}]")
+            registration_counter += len(self.registry[group])
+
+        logger.debug(f"{registration_counter} functions detected.\n")
+
+        # Update cache
+        if use_cache:
+            with self._measure(phase=AutodiscoverProfiler.PHASE_CACHE_WRITE):
+                self._write_handlers_to_cache()
+
+    def preload(self) -> None:
+        """
+        Runs the autodiscovery for all configured namespaces and resolves the callables of every registry group.
+        Call it in the master process of a pre-forking server like gunicorn with "--preload", so all workers inherit a
+        warm registry instead of building their own.
+        """
+        self.autodiscover(namespaces=get_namespaces())
+        for registry_group in list(self.registry.keys()):
+            self.get_registered_callables(registry_group=registry_group)
+
+        # Forked workers must not share the connections opened in the master process
+        caches.close_all()
+        connections.close_all()
+
+    def _measure(self, *, phase: str) -> contextlib.AbstractContextManager:
+        if self._profiler is None:
+            return contextlib.nullcontext()
+        return self._profiler.measure(phase)
+
+    def create_manifest(self, *, namespaces: list[str], path: Path | str) -> dict:
+        """
+        Imports all modules in the given namespaces and stores the detected handlers together with the fingerprints
+        of their source files in a manifest file.
+        """
+        module_files = self._scan_modules(namespaces=namespaces)
+
+        self._set_registry(registry={})
+        self._import_modules(module_paths=list(module_files.keys()))
+
+        manifest = build_manifest(
+            namespaces=namespaces, module_files=module_files, registry=self._pack_registry(registry=self.registry)
+        )
+        write_manifest(path=path, manifest=manifest)
+
+        return manifest
+
+    def invalidate(self, *, registry_group: str | None = None) -> None:
+        """
+        Drops the resolved callables of the given registry group or of all groups if none is given.
+        They will be resolved again on the next call of "get_registered_callables()".
+        """
+        if registry_group is None:
+            self._resolved_callables.clear()
+        else:
+            self._resolved_callables.pop(registry_group, None)
+
+    def _set_registry(self, *, registry: dict) -> None:
+        """
+        Replaces the registry and invalidates the resolved callables if its content changed
+        """
+        if registry != self.registry:
+            self.invalidate()
+        self.registry = registry
+
+    def _scan_modules(self, *, namespaces: list[str]) -> dict[str, Path]:
+        """
+        Returns the module path and the source file of all modules within the given namespaces of all local apps.
+        """
         # Project directory
         project_path = get_autodiscover_app_base_path()
-        logger = get_logger()
 
+        module_files = {}
         for app_config in apps.get_app_configs():
             app_path = Path(app_config.path).resolve()
 
@@ -88,64 +229,236 @@ class DecoratorBasedRegistry:
                 try:
                     # Detected python code is a single file
                     if os.path.exists(app_path / f"{target_path}.py"):
-                        module_path = f"{app_config.name}.{namespace}"
-                        self._force_import(module_path=module_path)
+                        module_files[f"{app_config.name}.{namespace}"] = app_path / f"{target_path}.py"
 
                     # Detected python code is a python module
                     for module in os.listdir(app_path / target_path):
                         if module[-3:] != ".py":
                             continue
                         module_name = module.replace(".py", "")
-                        module_path = f"{app_config.name}.{namespace}.{module_name}"
-                        self._force_import(module_path=module_path)
+                        if module_name == "__init__":
+                            # The package itself, importing "__init__" would create a second module object
+                            module_files[f"{app_config.name}.{namespace}"] = app_path / target_path / module
+                        else:
+                            module_files[f"{app_config.name}.{namespace}.{module_name}"] = (
+                                app_path / target_path / module
+                            )
 
                 except FileNotFoundError:
                     pass
 
-        # Log to shell which functions have been detected
-        logger.debug("Function autodiscovery running...")
-        registration_counter = 0
-        for group in self.registry.keys():
-            function_list = ", ".join(str(x) for x in self.registry[group])
-            logger.debug(f"* {group}: [{function_list}]")
-            registration_counter += len(self.registry[group])
+        return module_files
 
-        logger.debug(f"{registration_counter} functions detected.\n")
+    def _import_modules(self, *, module_paths: list[str]) -> None:
+        for module_path in module_paths:
+            if self._profiler is None:
+                self._force_import(module_path=module_path)
+                continue
 
-        # Update cache
-        cache.set(get_autodiscover_cache_key(), json.dumps(self.registry))
+            imported = module_path not in sys.modules
+            start = time.perf_counter()
+            self._force_import(module_path=module_path)
+            self._profiler.add_module(
+                module=module_path,
+                duration=time.perf_counter() - start,
+                callables=len(self._module_registrations.get(module_path, [])),
+                imported=imported,
+            )
 
     def _force_import(self, *, module_path: str) -> None:
-        sys_module = sys.modules.get(module_path)
-        if sys_module:
-            importlib.reload(sys_module)
-        else:
-            importlib.import_module(module_path)
-
+        """
+        Ensures the registrations of the given module are part of the registry.
+        Modules which were imported before - for example by something else before the autodiscovery ran - are not
+        executed again. Instead, the registrations recorded when their decorators ran are replayed.
+        """
         logger = get_logger()
+
+        if module_path in sys.modules:
+            self._replay_registrations(module_path=module_path)
+            logger.debug(f'"{module_path}" already imported, registrations replayed.')
+            return
+
+        importlib.import_module(module_path)
         logger.debug(f'"{module_path}" imported.')
 
+    def _replay_registrations(self, *, module_path: str) -> None:
+        for (registry_group, _name), callable_definition in self._module_registrations.get(module_path, {}).items():
+            self._add_to_registry(registry_group=registry_group, callable_definition=callable_definition)
+
+    def _add_to_registry(self, *, registry_group: str, callable_definition: CallableDefinition) -> None:
+        group = self.registry.setdefault(registry_group, {})
+        if callable_definition.key not in group:
+            group[callable_definition.key] = callable_definition
+            self.invalidate(registry_group=registry_group)
+
+    @staticmethod
+    def _pack_registry(*, registry: dict[str, dict[tuple[str, str], CallableDefinition]]) -> dict[str, list[str]]:
+        """
+        Converts the registry to its compact, JSON-serialisable form
+        """
+        return {
+            group: [callable_definition.to_path() for callable_definition in definitions.values()]
+            for group, definitions in registry.items()
+        }
+
+    @staticmethod
+    def _unpack_registry(*, data: dict[str, list[str]]) -> dict[str, dict[tuple[str, str], CallableDefinition]]:
+        """
+        Restores the registry from its compact form. Raises a ValueError if the data has an unknown format.
+        """
+        registry = {}
+        try:
+            for group, paths in data.items():
+                definitions = (CallableDefinition.from_path(path) for path in paths)
+                registry[group] = {definition.key: definition for definition in definitions}
+        except (AttributeError, TypeError) as e:
+            raise ValueError("Invalid registry data.") from e
+        return registry
+
+    def clear_cache(self) -> None:
+        """
+        Removes the registry from the Django cache, so the next autodiscovery has to detect the handlers again
+        """
+        cache.delete_many([get_autodiscover_cache_key(), self._get_cache_version_key()])
+        self._cache_version = None
+
+    @staticmethod
+    def _get_cache_version_key() -> str:
+        return f"{get_autodiscover_cache_key()}_version"
+
+    def _write_handlers_to_cache(self) -> None:
+        """
+        Stores the registry in the Django cache, together with a cheap version stamp of its content
+        """
+        cached_data = json.dumps(self._pack_registry(registry=self.registry))
+        version = hashlib.md5(cached_data.encode(), usedforsecurity=False).hexdigest()
+
+        cache.set_many({get_autodiscover_cache_key(): cached_data, self._get_cache_version_key(): version})
+        self._cache_version = version
+
     def _load_handlers_from_cache(self) -> dict:
         """
-        Get registered handler definitions from Django cache
+        Get registered handler definitions from Django cache.
+        The in-process registry is used as long as the version stamp in the cache didn't change, so the full registry
+        is only fetched and decoded if another process stored a different one.
         """
+        version = cache.get(self._get_cache_version_key())
+        if version is not None and version == self._cache_version and len(self.registry) > 0:
+            return self.registry
+
         cached_data = cache.get(get_autodiscover_cache_key())
         if cached_data is None:
             return {}
-        return json.loads(cached_data)
+
+        try:
+            registry = self._unpack_registry(data=json.loads(cached_data))
+        except ValueError:
+            # Data was cached in an outdated format, so we have to discover the handlers again
+            return {}
+
+        self._cache_version = version
+        return registry
+
+    def _load_handlers_from_manifest(self, *, namespaces: list[str]) -> dict | None:
+        """
+        Get registered handler definitions from the manifest file.
+        Returns None if no manifest is configured or if it's outdated.
+        """
+        manifest_path = get_autodiscover_manifest_path()
+        if not manifest_path:
+            return None
+
+        manifest = load_manifest(path=manifest_path)
+        if manifest is None:
+            return None
+
+        # Scan all namespaces of the manifest to detect new or removed files in any of them
+        module_files = self._scan_modules(namespaces=sorted(set(namespaces).union(manifest["namespaces"])))
+
+        registry = get_registry_from_manifest(manifest=manifest, namespaces=namespaces, module_files=module_files)
+        if registry is None:
+            return None
+
+        return self._unpack_registry(data=registry)
 
     def get_registered_callables(self, *, registry_group: str) -> list[typing.Callable]:
         """
-        Returns a list of Callables (functions and classes)
+        Returns a list of Callables (functions and classes) registered for the given group.
+        The callables are resolved once per process and kept until the registry changes or "invalidate()" is called.
         """
-        self.autodiscover(namespaces=[registry_group])
+        callables = self._resolved_callables.get(registry_group)
+        if callables is not None:
+            return list(callables)
 
-        callables = []
-        callable_definition: dict[str:str]
-        for group in self.registry.keys():
-            for group_data in self.registry[group]:
-                callable_definition: CallableDefinition = CallableDefinition(**group_data)
+        with measure("autodiscover"):
+            self.autodiscover(namespaces=list(dict.fromkeys([*get_namespaces(), registry_group])))
+
+            callables = []
+            for callable_definition in self.registry.get(registry_group, {}).values():
                 module = importlib.import_module(callable_definition.module)
                 callables.append(getattr(module, callable_definition.name))
 
-        return callables
+        self._resolved_callables[registry_group] = callables
+
+        return list(callables)
+
+    def dispatch(
+        self,
+        *,
+        registry_group: str,
+        payload: typing.Any,  # noqa: ANN401
+        mode: str = HandlerDispatcher.MODE_SEQUENTIAL,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+    ) -> list[DispatchResult]:
+        """
+        Calls all callables registered for the given group with the payload.
+        Errors raised by a handler don't stop the other handlers, they are collected in the returned results.
+        """
+        dispatcher = HandlerDispatcher(
+            handlers=self.get_registered_callables(registry_group=registry_group),
+            mode=mode,
+            timeout=timeout,
+            max_workers=max_workers,
+        )
+        with measure("dispatch"):
+            return dispatcher.dispatch(payloads=[payload])
+
+    def dispatch_batch(  # noqa: PLR0913
+        self,
+        *,
+        registry_group: str,
+        payloads: list,
+        batch_size: int | None = None,
+        mode: str = HandlerDispatcher.MODE_SEQUENTIAL,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+    ) -> list[DispatchResult]:
+        """
+        Calls all callables registered for the given group with lists of payloads instead of a single one
+        """
+        dispatcher = HandlerDispatcher(
+            handlers=self.get_registered_callables(registry_group=registry_group),
+            mode=mode,
+            timeout=timeout,
+            max_workers=max_workers,
+        )
+        with measure("dispatch"):
+            return dispatcher.dispatch_batch(payloads=payloads, batch_size=batch_size)
+
+    async def adispatch(
+        self,
+        *,
+        registry_group: str,
+        payload: typing.Any,  # noqa: ANN401
+        timeout: float | None = None,
+    ) -> list[DispatchResult]:
+        """
+        Async variant of "dispatch()", running all handlers concurrently in the current event loop
+        """
+        dispatcher = HandlerDispatcher(
+            handlers=self.get_registered_callables(registry_group=registry_group),
+            mode=HandlerDispatcher.MODE_ASYNCIO,
+            timeout=timeout,
+        )
+        return await dispatcher.adispatch(payloads=[payload])
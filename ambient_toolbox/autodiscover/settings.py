@@ -11,6 +11,14 @@ def get_autodiscover_enabled() -> Path | str:
     return getattr(settings, "AMBIENT_TOOLBOX_AUTODISCOVER_ENABLED", False)
 
 
+def get_autodiscover_lazy() -> bool:
+    """
+    If enabled, autodiscovery doesn't run on startup but on the first access to the registered callables.
+    Keeps short-lived processes like management commands from scanning the namespaces.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_AUTODISCOVER_LAZY", False)
+
+
 def get_namespaces() -> list[str]:
     """
     Lists all namespaces groups which are valid for the given project.
@@ -37,3 +45,12 @@ def get_autodiscover_logger_name() -> str:
     Django logger name
     """
     return getattr(settings, "AMBIENT_TOOLBOX_AUTODISCOVER_LOGGER_NAME", "toolbox_autodiscover")
+
+
+def get_autodiscover_manifest_path() -> Path | str | None:
+    """
+    Path to the manifest file created by the "create_autodiscover_manifest" management command.
+    If set, autodiscovery reads the registered handlers from the manifest instead of importing every module, as long as
+    no source file has changed.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH", None)
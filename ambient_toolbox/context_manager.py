@@ -1,3 +1,12 @@
+import functools
+import threading
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.db.models import signals as model_signals
+from django.dispatch import Signal
+
+
 class TempDisconnectSignal:
     """
     Context manager to temporarily disconnect a model from a signal.
@@ -28,3 +37,113 @@ class TempDisconnectSignal:
             sender=self.sender,
             dispatch_uid=self.dispatch_uid,
         )
+
+
+# Rules of the active "SuppressSignals" blocks, each a tuple of signals and senders ("None" matches all)
+_suppressed_signals_cv: ContextVar[tuple] = ContextVar("ambient_toolbox_suppressed_signals", default=())
+_suppress_signals_lock = threading.Lock()
+_suppress_signals_installed = False
+
+
+def _is_signal_suppressed(signal: Signal, sender) -> bool:
+    for suppressed_signals, suppressed_senders in _suppressed_signals_cv.get():
+        if (suppressed_signals is None or signal in suppressed_signals) and (
+            suppressed_senders is None or sender in suppressed_senders
+        ):
+            return True
+    return False
+
+
+def _wrap_send(send):
+    @functools.wraps(send)
+    def _send(self, sender, **named):
+        if _suppressed_signals_cv.get() and _is_signal_suppressed(self, sender):
+            return []
+        return send(self, sender, **named)
+
+    return _send
+
+
+def _wrap_asend(asend):
+    @functools.wraps(asend)
+    async def _asend(self, sender, **named):
+        if _suppressed_signals_cv.get() and _is_signal_suppressed(self, sender):
+            return []
+        return await asend(self, sender, **named)
+
+    return _asend
+
+
+def _wrap_has_listeners(has_listeners):
+    @functools.wraps(has_listeners)
+    def _has_listeners(self, sender=None):
+        if _suppressed_signals_cv.get() and _is_signal_suppressed(self, sender):
+            return False
+        return has_listeners(self, sender=sender)
+
+    return _has_listeners
+
+
+def _install_suppress_signals_hooks() -> None:
+    """
+    Wraps the send methods of Django's "Signal" class once, so that they skip all receivers of suppressed signals.
+    "has_listeners()" is wrapped as well, since Django checks it to skip work, e.g. to fast-delete querysets.
+    Outside a "SuppressSignals" block, the wrappers only perform a context variable lookup.
+    """
+    global _suppress_signals_installed  # noqa: PLW0603
+
+    with _suppress_signals_lock:
+        if _suppress_signals_installed:
+            return
+
+        Signal.has_listeners = _wrap_has_listeners(Signal.has_listeners)
+        Signal.send = _wrap_send(Signal.send)
+        Signal.send_robust = _wrap_send(Signal.send_robust)
+        # Async dispatching was added in Django 5.0
+        if hasattr(Signal, "asend"):
+            Signal.asend = _wrap_asend(Signal.asend)
+            Signal.asend_robust = _wrap_asend(Signal.asend_robust)
+
+        _suppress_signals_installed = True
+
+
+class SuppressSignals(ContextDecorator):
+    """
+    Context manager (and decorator) to skip all receivers of the given signals within a block.
+    In contrast to disconnecting receivers, the suppression only applies to the current thread or asyncio task, so
+    other requests keep triggering their signals. The signals are restored when leaving the block, even on errors.
+    By default, the model signals are suppressed for all senders.
+    Use with a "with" tag like this:
+    ```
+    with SuppressSignals(signals=[post_save], senders=[MyModel]):
+        obj.save()
+    ```
+    """
+
+    DEFAULT_SIGNALS = (
+        model_signals.pre_init,
+        model_signals.post_init,
+        model_signals.pre_save,
+        model_signals.post_save,
+        model_signals.pre_delete,
+        model_signals.post_delete,
+        model_signals.m2m_changed,
+    )
+
+    def __init__(self, signals=None, senders=None):
+        self.signals = frozenset(signals if signals is not None else self.DEFAULT_SIGNALS)
+        self.senders = frozenset(senders) if senders is not None else None
+        self._token = None
+
+    def _recreate_cm(self):
+        # Decorated functions get a fresh instance per call to be safe for recursion and threads
+        return self.__class__(signals=self.signals, senders=self.senders)
+
+    def __enter__(self):
+        _install_suppress_signals_hooks()
+        self._token = _suppressed_signals_cv.set((*_suppressed_signals_cv.get(), (self.signals, self.senders)))
+        return self
+
+    def __exit__(self, *exc):
+        _suppressed_signals_cv.reset(self._token)
+        self._token = None
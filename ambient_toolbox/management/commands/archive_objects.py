@@ -0,0 +1,101 @@
+import datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import get_current_timezone, is_naive, make_aware, now
+
+from ambient_toolbox.services.archival import (
+    ArchivalError,
+    ArchivalService,
+    JsonLinesFileArchiveBackend,
+    ModelArchiveBackend,
+)
+
+
+class Command(BaseCommand):
+    """
+    Moves objects of a model derived from "CreatedAtInfo", which are older than a cutoff, into an archive model or a
+    gzip compressed JSON lines file and deletes them in batches.
+    """
+
+    help = "Archives and deletes objects created before a cutoff in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", type=str, help='Label of the model to archive, e.g. "my_app.MyModel".')
+
+        cutoff_group = parser.add_mutually_exclusive_group(required=True)
+        cutoff_group.add_argument("--before", type=str, help="Archives objects created before this date or datetime.")
+        cutoff_group.add_argument("--days", type=int, help="Archives objects older than this number of days.")
+
+        target_group = parser.add_mutually_exclusive_group(required=True)
+        target_group.add_argument(
+            "--archive-model", type=str, help='Label of the archive model, e.g. "my_app.Archive".'
+        )
+        target_group.add_argument("--file", type=str, help="Path of the gzip compressed JSON lines file.")
+
+        parser.add_argument(
+            "--exclude-field",
+            action="append",
+            dest="blacklisted_fields",
+            default=[],
+            help="Field which isn't archived. Can be passed multiple times.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of objects per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to wait between two batches.")
+        parser.add_argument("--max-batches", type=int, help="Stops after this number of batches.")
+        parser.add_argument("--database", type=str, help="Database alias to archive from.")
+        parser.add_argument(
+            "--allow-cascade",
+            action="store_true",
+            help="Archives models whose related objects are deleted by cascade, without archiving the related objects.",
+        )
+
+    def _get_model(self, label: str):
+        try:
+            return apps.get_model(label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(f'Model "{label}" not found.') from e
+
+    def _get_cutoff(self, options) -> datetime.datetime:
+        if options.get("days") is not None:
+            return now() - datetime.timedelta(days=options["days"])
+
+        cutoff = parse_datetime(options["before"])
+        if cutoff is None:
+            try:
+                cutoff = datetime.datetime.combine(datetime.date.fromisoformat(options["before"]), datetime.time())
+            except ValueError as e:
+                raise CommandError(f'Invalid date "{options["before"]}".') from e
+
+        if settings.USE_TZ and is_naive(cutoff):
+            cutoff = make_aware(cutoff, get_current_timezone())
+        return cutoff
+
+    def handle(self, *args, **options):
+        model = self._get_model(options["model"])
+
+        if options.get("archive_model"):
+            backend = ModelArchiveBackend(
+                self._get_model(options["archive_model"]), blacklisted_fields=options["blacklisted_fields"]
+            )
+        else:
+            backend = JsonLinesFileArchiveBackend(options["file"], blacklisted_fields=options["blacklisted_fields"])
+
+        try:
+            service = ArchivalService(
+                model=model,
+                backend=backend,
+                cutoff=self._get_cutoff(options),
+                batch_size=options["batch_size"],
+                sleep=options["sleep"],
+                using=options.get("database"),
+                allow_cascade=options["allow_cascade"],
+            )
+        except ArchivalError as e:
+            raise CommandError(str(e)) from e
+
+        archived = service.process(max_batches=options.get("max_batches"))
+
+        self.stdout.write(f"Archived {archived} objects of {model._meta.label} created before {service.cutoff}.")
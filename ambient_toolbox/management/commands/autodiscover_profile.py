@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ambient_toolbox.autodiscover import decorator_based_registry
+from ambient_toolbox.autodiscover.profiler import AutodiscoverProfiler
+from ambient_toolbox.autodiscover.settings import get_autodiscover_enabled, get_autodiscover_lazy, get_namespaces
+
+
+class Command(BaseCommand):
+    """
+    Runs the function autodiscovery and reports how much time is spent in the cache lookup, the directory scan, the
+    module imports and the cache write, as well as the time and number of registered callables per module.
+    Requires "AMBIENT_TOOLBOX_AUTODISCOVER_LAZY", otherwise all modules were already imported on startup.
+    """
+
+    help = "Profiles the function autodiscovery and reports the time spent per phase and module."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--namespace",
+            action="append",
+            dest="namespaces",
+            help="Namespace to scan. Can be passed multiple times. Defaults to AMBIENT_TOOLBOX_NAMESPACES.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Path of a JSON file to write the results to.",
+        )
+        parser.add_argument(
+            "--use-cache",
+            action="store_true",
+            help="Uses and updates the cached registry. Measures a warm start.",
+        )
+        parser.add_argument(
+            "--clear-cache",
+            action="store_true",
+            help="Clears the cached registry of all processes before profiling.",
+        )
+
+    def handle(self, *args, **options):
+        if get_autodiscover_enabled() and not get_autodiscover_lazy():
+            raise CommandError(
+                "The autodiscovery already imported all modules on startup. "
+                "Run this command with AMBIENT_TOOLBOX_AUTODISCOVER_LAZY enabled."
+            )
+
+        namespaces = options.get("namespaces") or get_namespaces()
+
+        if options.get("clear_cache"):
+            decorator_based_registry.clear_cache()
+
+        profiler = AutodiscoverProfiler()
+        decorator_based_registry.autodiscover(
+            namespaces=namespaces, profiler=profiler, use_cache=options.get("use_cache", False)
+        )
+
+        self.stdout.write(f"{'Module':<70} {'Time (ms)':>10} {'Callables':>10}  Status")
+        for module_profile in profiler.get_sorted_modules():
+            status = "imported" if module_profile.imported else "replayed"
+            self.stdout.write(
+                f"{module_profile.module:<70} {module_profile.duration * 1000:>10.2f} "
+                f"{module_profile.callables:>10}  {status}"
+            )
+
+        self.stdout.write("")
+        for phase, duration in profiler.phases.items():
+            self.stdout.write(f"{phase:<70} {duration * 1000:>10.2f}")
+        self.stdout.write(f"{'total':<70} {sum(profiler.phases.values()) * 1000:>10.2f}")
+
+        output_path = options.get("output")
+        if output_path:
+            with open(output_path, "w", encoding="utf-8") as output_file:
+                json.dump(profiler.as_dict(), output_file, indent=2)
+            self.stdout.write(f'\nResults written to "{output_path}".')
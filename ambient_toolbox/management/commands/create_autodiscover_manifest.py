@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ambient_toolbox.autodiscover import decorator_based_registry
+from ambient_toolbox.autodiscover.settings import get_autodiscover_manifest_path, get_namespaces
+
+
+class Command(BaseCommand):
+    """
+    Imports all modules of the configured autodiscovery namespaces and writes the registered handlers together with
+    fingerprints of their source files to a manifest file. Workers can then boot without importing every module.
+    """
+
+    help = "Creates the manifest file for the function autodiscovery."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Path of the manifest file. Defaults to AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH.",
+        )
+        parser.add_argument(
+            "--namespace",
+            action="append",
+            dest="namespaces",
+            help="Namespace to scan. Can be passed multiple times. Defaults to AMBIENT_TOOLBOX_NAMESPACES.",
+        )
+
+    def handle(self, *args, **options):
+        manifest_path = options.get("output") or get_autodiscover_manifest_path()
+        if not manifest_path:
+            raise CommandError(
+                'Please provide a path with the "--output" parameter or set AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH.'
+            )
+
+        namespaces = options.get("namespaces") or get_namespaces()
+
+        manifest = decorator_based_registry.create_manifest(namespaces=namespaces, path=manifest_path)
+
+        registration_counter = sum(len(definitions) for definitions in manifest["registry"].values())
+        self.stdout.write(
+            f'Manifest "{manifest_path}" created with {registration_counter} callables '
+            f"from {len(manifest['modules'])} modules."
+        )
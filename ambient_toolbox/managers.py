@@ -1,4 +1,22 @@
-from django.db import models
+import base64
+import binascii
+import json
+import typing
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
+from ambient_toolbox.utils.request_cache import get_request_cache
+
+# Namespace of the permission querysets in the request cache
+PERMISSION_CACHE_NAMESPACE = "ambient_toolbox.permissions"
 
 
 class AbstractPermissionMixin:
@@ -56,6 +74,75 @@ class AbstractUserSpecificManager(models.Manager, AbstractPermissionMixin):
         return self.get_queryset().deletable_for(user)
 
 
+def get_request_cached_permission_queryset(
+    *,
+    queryset: models.QuerySet,
+    owner: type,
+    method: str,
+    user_id,
+    build: typing.Callable[[], models.QuerySet],
+) -> models.QuerySet:
+    """
+    Fetches the primary keys of the objects matching "build()" once per request and returns the queryset filtered by
+    them, so the permission subqueries aren't executed again in follow-up queries. The key consists of the class
+    implementing the permission method, the method, the user, the database and the SQL and parameters of the queryset
+    the permission method is applied to.
+    Outside a request, or if the queryset can't be used as a key, nothing is cached.
+    """
+    if CurrentRequestMiddleware.get_current_request() is None:
+        return build()
+
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        key = (
+            PERMISSION_CACHE_NAMESPACE,
+            f"{owner.__module__}.{owner.__qualname__}",
+            method,
+            user_id,
+            queryset.db,
+            sql,
+            params,
+        )
+        hash(key)
+    except (EmptyResultSet, TypeError):
+        return build()
+
+    ids = get_request_cache().get_or_set(key, lambda: frozenset(build().values_list("pk", flat=True)))
+    return queryset.filter(pk__in=ids)
+
+
+def invalidate_permission_cache() -> None:
+    """
+    Drops all permission results cached in the current request, e.g. after changing permission-relevant data
+    """
+    get_request_cache().invalidate(PERMISSION_CACHE_NAMESPACE)
+
+
+class RequestCachedPermissionQuerySetMixin:
+    """
+    Caches the primary keys of the objects matching "visible_for()", "editable_for()" and "deletable_for()" for the
+    duration of the request. Put it in front of your user-specific queryset.
+    """
+
+    def visible_for(self, user):
+        return self._get_request_cached_permission_queryset("visible_for", super().visible_for, user)
+
+    def editable_for(self, user):
+        return self._get_request_cached_permission_queryset("editable_for", super().editable_for, user)
+
+    def deletable_for(self, user):
+        return self._get_request_cached_permission_queryset("deletable_for", super().deletable_for, user)
+
+    def _get_request_cached_permission_queryset(self, method: str, permission_method: typing.Callable, user):
+        return get_request_cached_permission_queryset(
+            queryset=self,
+            owner=type(self),
+            method=method,
+            user_id=getattr(user, "pk", None),
+            build=lambda: permission_method(user),
+        )
+
+
 class GloballyVisibleQuerySet(AbstractUserSpecificQuerySet):
     """
     Manager (QuerySet) for classes which do NOT have any visibility restrictions.
@@ -89,3 +176,196 @@ class GetOrNoneManagerMixin:
             return self.get(**kwargs)
         except self.model.DoesNotExist:
             return None
+
+    def get_many_or_none(self, field: str, values: Iterable) -> dict:
+        """
+        Batch variant of "get_or_none()": Fetches the objects matching the given values of a field with "__in" queries,
+        split into chunks according to the database's parameter limit.
+        Returns a dict mapping every given value to its object or None if it does not exist.
+        Attention: This will throw an "MultipleObjectsReturned" exception if more than one object matches a value.
+        """
+        model_field = self.model._meta.get_field(field)
+        python_values = {value: model_field.to_python(value) for value in values}
+
+        unique_values = list(dict.fromkeys(python_values.values()))
+        chunk_size = connections[self.db].features.max_query_params or len(unique_values) or 1
+
+        objects_by_value = {}
+        for index in range(0, len(unique_values), chunk_size):
+            for obj in self.filter(**{f"{field}__in": unique_values[index : index + chunk_size]}):
+                value = getattr(obj, model_field.attname)
+                if value in objects_by_value:
+                    raise self.model.MultipleObjectsReturned(
+                        f"get_many_or_none() returned more than one {self.model._meta.object_name} for "
+                        f"{field}={value!r}!"
+                    )
+                objects_by_value[value] = obj
+
+        return {value: objects_by_value.get(python_value) for value, python_value in python_values.items()}
+
+
+@dataclass(kw_only=True)
+class KeysetPage:
+    """
+    One page of a keyset pagination. "next_cursor" is None on the last page.
+    """
+
+    objects: list
+    next_cursor: str | None
+
+
+class CreatedAtInfoQuerySet(models.QuerySet):
+    """
+    QuerySet for models derived from "CreatedAtInfo".
+    Provides keyset pagination on "(created_at, pk)", which uses the index of "created_at" instead of scanning all
+    skipped rows like OFFSET pagination does. Filters of the queryset are kept, its ordering is replaced.
+    """
+
+    def _get_keyset_ordering(self, descending: bool) -> list[str]:
+        return ["-created_at", "-pk"] if descending else ["created_at", "pk"]
+
+    def _filter_after_keyset(self, created_at, pk, descending: bool):
+        if descending:
+            return self.filter(created_at__lte=created_at).filter(Q(created_at__lt=created_at) | Q(pk__lt=pk))
+        return self.filter(created_at__gte=created_at).filter(Q(created_at__gt=created_at) | Q(pk__gt=pk))
+
+    def _fetch_keyset_chunk(self, keyset: tuple | None, size: int, descending: bool) -> list:
+        queryset = self._filter_after_keyset(*keyset, descending=descending) if keyset else self
+        return list(queryset.order_by(*self._get_keyset_ordering(descending))[:size])
+
+    def keyset_chunks(self, *, chunk_size: int = 1000, descending: bool = False) -> Iterator[list]:
+        """
+        Yields all objects in lists of "chunk_size" objects, ordered by "(created_at, pk)".
+        Each chunk is fetched with its own query, starting after the last object of the previous chunk.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size has to be at least 1.")
+
+        keyset = None
+        while True:
+            chunk = self._fetch_keyset_chunk(keyset, chunk_size, descending)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            keyset = (chunk[-1].created_at, chunk[-1].pk)
+
+    def keyset_iterator(self, *, chunk_size: int = 1000, descending: bool = False) -> Iterator[models.Model]:
+        """
+        Yields all objects ordered by "(created_at, pk)", fetched in chunks of "chunk_size" objects.
+        """
+        for chunk in self.keyset_chunks(chunk_size=chunk_size, descending=descending):
+            yield from chunk
+
+    def keyset_page(self, *, cursor: str | None = None, page_size: int = 100, descending: bool = False) -> KeysetPage:
+        """
+        Returns the page after the given cursor, ordered by "(created_at, pk)". Without a cursor, the first page is
+        returned. Pass the "next_cursor" of the result to fetch the following page.
+        Raises a "ValueError" if the cursor is invalid.
+        """
+        if page_size < 1:
+            raise ValueError("Page size has to be at least 1.")
+
+        keyset = self._decode_keyset_cursor(cursor) if cursor else None
+        # Fetch one additional object to know if there is a next page
+        objects = self._fetch_keyset_chunk(keyset, page_size + 1, descending)
+
+        next_cursor = None
+        if len(objects) > page_size:
+            objects = objects[:page_size]
+            next_cursor = self.get_keyset_cursor(objects[-1])
+
+        return KeysetPage(objects=objects, next_cursor=next_cursor)
+
+    @staticmethod
+    def get_keyset_cursor(obj: models.Model) -> str:
+        """
+        Returns an opaque cursor token pointing behind the given object
+        """
+        # The JSON encoder of Django would cut off the microseconds
+        data = json.dumps([obj.created_at.isoformat(), obj.pk], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _decode_keyset_cursor(self, cursor: str) -> tuple:
+        try:
+            created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            created_at = parse_datetime(created_at)
+            pk = self.model._meta.pk.to_python(pk)
+        except (binascii.Error, TypeError, ValueError, ValidationError) as e:
+            raise ValueError(f'Invalid cursor "{cursor}".') from e
+
+        if created_at is None:
+            raise ValueError(f'Invalid cursor "{cursor}".')
+
+        return created_at, pk
+
+
+class CommonInfoQuerySet(CreatedAtInfoQuerySet):
+    """
+    QuerySet for models derived from "CommonInfo".
+    Bulk operations don't call "save()", so this queryset stamps the audit fields itself: the current timestamp is
+    set once per batch and the user is taken from the model's "get_current_user()" unless it's passed explicitly.
+    """
+
+    # Fields of the user model loaded by "with_audit_users()" besides the primary key and the username field
+    AUDIT_USER_FIELDS = ("first_name", "last_name", "email")
+
+    def with_audit_users(self, user_fields: Iterable[str] | None = None):
+        """
+        Loads "created_by" and "lastmodified_by" with the objects via a join, to avoid one query per object when
+        displaying them. Only the primary key, the username field and the given fields (defaulting to
+        "AUDIT_USER_FIELDS") of the users are loaded, all other user fields are deferred.
+        """
+        user_fields = self.AUDIT_USER_FIELDS if user_fields is None else user_fields
+
+        deferred_fields = []
+        for field_name in ("created_by", "lastmodified_by"):
+            user_model = self.model._meta.get_field(field_name).related_model
+            loaded_fields = {user_model._meta.pk.name, user_model.USERNAME_FIELD, *user_fields}
+            deferred_fields.extend(
+                f"{field_name}__{field.name}"
+                for field in user_model._meta.concrete_fields
+                if field.name not in loaded_fields and field.attname not in loaded_fields
+            )
+
+        return self.select_related("created_by", "lastmodified_by").defer(*deferred_fields)
+
+    def _get_audit_user(self, user):
+        return user if user is not None else self.model.get_current_user()
+
+    def _stamp_audit_fields(self, objs: list, user) -> None:
+        timestamp = now()
+        for obj in objs:
+            obj.lastmodified_at = timestamp
+            obj.set_user_fields(user)
+
+    def bulk_create(self, objs, *args, user=None, **kwargs):
+        objs = list(objs)
+        self._stamp_audit_fields(objs, self._get_audit_user(user))
+
+        # Upserts only update the given fields
+        if kwargs.get("update_fields") and self.model.ALWAYS_UPDATE_FIELDS:
+            kwargs["update_fields"] = list(
+                dict.fromkeys([*kwargs["update_fields"], "lastmodified_at", "lastmodified_by"])
+            )
+
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, user=None, **kwargs):
+        objs = list(objs)
+        self._stamp_audit_fields(objs, self._get_audit_user(user))
+
+        if self.model.ALWAYS_UPDATE_FIELDS:
+            fields = list(dict.fromkeys([*fields, "lastmodified_at", "lastmodified_by"]))
+
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if self.model.ALWAYS_UPDATE_FIELDS:
+            kwargs.setdefault("lastmodified_at", now())
+            if "lastmodified_by" not in kwargs and "lastmodified_by_id" not in kwargs:
+                user = self.model.get_current_user()
+                if user and user.pk:
+                    kwargs["lastmodified_by"] = user
+
+        return super().update(**kwargs)
@@ -2,6 +2,9 @@ from collections.abc import Callable
 from contextvars import ContextVar
 from typing import TYPE_CHECKING, Optional
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject, empty
+
 if TYPE_CHECKING:
     from django.http import HttpRequest, HttpResponse
 
@@ -11,18 +14,38 @@ _request_cv: ContextVar[Optional["HttpRequest"]] = ContextVar("request", default
 class CurrentRequestMiddleware:
     """
     Middleware which stores the current request in a thread-safe manner.
+    Supports both WSGI and ASGI, so Django doesn't have to switch between sync and async code for it.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response: Callable[["HttpRequest"], "HttpResponse"]):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: "HttpRequest") -> "HttpResponse":
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         token = _request_cv.set(request)
         try:
             return self.get_response(request)
         finally:
             _request_cv.reset(token)
 
+    async def __acall__(self, request: "HttpRequest") -> "HttpResponse":
+        token = _request_cv.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_cv.reset(token)
+
+    @staticmethod
+    def get_current_request() -> Optional["HttpRequest"]:
+        return _request_cv.get()
+
     @staticmethod
     def get_current_user():
         request = _request_cv.get()
@@ -30,3 +53,44 @@ class CurrentRequestMiddleware:
             return request.user
         except AttributeError:
             return None
+
+    @staticmethod
+    async def aget_current_user():
+        """
+        Async variant of "get_current_user()".
+        Django's lazy user object can't be evaluated in async code, so we use "request.auser()" if the user wasn't
+        loaded or replaced yet.
+        """
+        request = _request_cv.get()
+        try:
+            user = request.user
+        except AttributeError:
+            return None
+
+        if isinstance(user, SimpleLazyObject):
+            if user._wrapped is not empty:
+                return user._wrapped
+            if hasattr(request, "auser"):
+                return await request.auser()
+        return user
+
+    @staticmethod
+    def get_current_user_id():
+        """
+        Returns the primary key of the current user or None for anonymous users.
+        The key is cached on the request, so subsequent calls don't touch the (lazy) user object again. If the user of
+        the request is replaced, e.g. by DRF's authentication, the key is determined again.
+        """
+        user = CurrentRequestMiddleware.get_current_user()
+        if user is None:
+            return None
+
+        request = _request_cv.get()
+        cached_user, cached_user_id = getattr(request, "_current_user_id", (None, None))
+        if cached_user is user:
+            return cached_user_id
+
+        user_id = user.pk
+        if request is not None:
+            request._current_user_id = (user, user_id)
+        return user_id
@@ -0,0 +1,151 @@
+import contextlib
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+from django.db import connections
+
+from ambient_toolbox.middleware.settings import (
+    get_performance_latency_budget,
+    get_performance_logger_name,
+    get_performance_query_budget,
+    get_performance_server_timing_enabled,
+)
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest, HttpResponse
+
+
+class RequestMetrics:
+    """
+    Counters collected while a request is processed. No SQL is stored to keep the overhead low.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.hooks: dict[str, float] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # Called by Django's "execute_wrapper" for every query
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def get_exceeded_budgets(self) -> list[str]:
+        exceeded_budgets = []
+
+        query_budget = get_performance_query_budget()
+        if query_budget is not None and self.queries > query_budget:
+            exceeded_budgets.append("queries")
+
+        latency_budget = get_performance_latency_budget()
+        if latency_budget is not None and self.duration * 1000 > latency_budget:
+            exceeded_budgets.append("latency")
+
+        return exceeded_budgets
+
+    def get_server_timing(self) -> str:
+        metrics = [
+            f"total;dur={self.duration * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        metrics += [f"{name};dur={duration * 1000:.1f}" for name, duration in self.hooks.items()]
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict:
+        return {
+            "duration_ms": round(self.duration * 1000, 1),
+            "queries": self.queries,
+            "db_time_ms": round(self.db_time * 1000, 1),
+            "hooks_ms": {name: round(duration * 1000, 1) for name, duration in self.hooks.items()},
+        }
+
+
+_metrics_cv: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+@contextlib.contextmanager
+def measure(name: str) -> Iterator[None]:
+    """
+    Adds the time spent in the wrapped block to the metrics of the current request.
+    Outside a request measured by "PerformanceMiddleware", this is a no-op.
+    """
+    metrics = _metrics_cv.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.hooks[name] = metrics.hooks.get(name, 0.0) + time.perf_counter() - start
+
+
+class PerformanceMiddleware:
+    """
+    Middleware which measures the duration, number of database queries and database time of every request.
+    The results are added as "Server-Timing" header to the response and written to the log. Requests exceeding the
+    configured budgets are logged as warnings.
+    """
+
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response: Callable[["HttpRequest"], "HttpResponse"]):
+        self.get_response = get_response
+
+    def __call__(self, request: "HttpRequest") -> "HttpResponse":
+        metrics = RequestMetrics()
+        token = _metrics_cv.set(metrics)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _metrics_cv.reset(token)
+
+        metrics.duration = time.perf_counter() - metrics.start
+
+        if get_performance_server_timing_enabled():
+            response["Server-Timing"] = metrics.get_server_timing()
+
+        self.log(request=request, response=response, metrics=metrics)
+
+        return response
+
+    @staticmethod
+    def get_current_metrics() -> Optional[RequestMetrics]:
+        return _metrics_cv.get()
+
+    def log(self, *, request: "HttpRequest", response: "HttpResponse", metrics: RequestMetrics) -> None:
+        exceeded_budgets = metrics.get_exceeded_budgets()
+        logger = logging.getLogger(get_performance_logger_name())
+        logger.log(
+            logging.WARNING if exceeded_budgets else logging.INFO,
+            "%s %s %s duration=%.1fms queries=%d db=%.1fms",
+            request.method,
+            request.path,
+            response.status_code,
+            metrics.duration * 1000,
+            metrics.queries,
+            metrics.db_time * 1000,
+            extra={
+                "performance": {
+                    "method": request.method,
+                    "path": request.path,
+                    "status_code": response.status_code,
+                    "exceeded_budgets": exceeded_budgets,
+                    **metrics.as_dict(),
+                }
+            },
+        )
@@ -0,0 +1,29 @@
+from django.conf import settings
+
+
+def get_performance_query_budget() -> int | None:
+    """
+    Maximum number of database queries per request before the request is flagged as over budget.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_PERFORMANCE_QUERY_BUDGET", None)
+
+
+def get_performance_latency_budget() -> float | None:
+    """
+    Maximum duration of a request in milliseconds before the request is flagged as over budget.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_PERFORMANCE_LATENCY_BUDGET", None)
+
+
+def get_performance_server_timing_enabled() -> bool:
+    """
+    Switch to add the "Server-Timing" header to responses.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_PERFORMANCE_SERVER_TIMING", True)
+
+
+def get_performance_logger_name() -> str:
+    """
+    Django logger name
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_PERFORMANCE_LOGGER_NAME", "toolbox_performance")
@@ -1,7 +1,75 @@
+import hashlib
+import sys
+import threading
 import warnings
+from collections import OrderedDict
 
 import nh3
 
+from ambient_toolbox.mixins.settings import get_bleach_cache_max_bytes, get_bleach_cache_max_size
+
+
+class BleachCache:
+    """
+    Thread-safe LRU cache of sanitised HTML, shared by all models using the "BleacherMixin".
+    Entries are keyed by the allowlists and a SHA-256 hash of the content, so the raw content isn't kept in memory.
+    The cache is bounded by the number of entries and by the memory of the sanitised values. Limits which aren't passed
+    are read from the settings on every call.
+    """
+
+    def __init__(self, max_size: int | None = None, max_bytes: int | None = None):
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size if self._max_size is not None else get_bleach_cache_max_size()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else get_bleach_cache_max_bytes()
+
+    def clean(self, value: str, tags: frozenset[str], attributes: dict[str, frozenset[str]], config_key) -> str:
+        key = (config_key, hashlib.sha256(value.encode()).digest())
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+        cleaned_value = nh3.clean(value, tags=tags, attributes=attributes)
+        value_bytes = sys.getsizeof(cleaned_value)
+        max_size, max_bytes = self.max_size, self.max_bytes
+
+        with self._lock:
+            self.misses += 1
+            # Values exceeding the memory limit on their own would evict the whole cache
+            if value_bytes > max_bytes or key in self._data:
+                return cleaned_value
+            self._data[key] = cleaned_value
+            self.size_bytes += value_bytes
+            while len(self._data) > max_size or self.size_bytes > max_bytes:
+                _, evicted_value = self._data.popitem(last=False)
+                self.size_bytes -= sys.getsizeof(evicted_value)
+
+        return cleaned_value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+bleach_cache = BleachCache()
+
 
 class BleacherMixin:
     """
@@ -55,33 +123,87 @@ class BleacherMixin:
         "blockquote",
     ]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields_to_bleach = getattr(self, "BLEACH_FIELD_LIST", [])
-        self.allowed_tags = set(getattr(self, "ALLOWED_TAGS", self.DEFAULT_ALLOWED_TAGS))
-        self.allowed_attributes = getattr(self, "ALLOWED_ATTRIBUTES", self.DEFAULT_ALLOWED_ATTRIBUTES)
-
-        for tag, attribute_list in self.allowed_attributes.items():
-            if isinstance(attribute_list, (list, tuple)):
-                self.allowed_attributes[tag] = set(attribute_list)
-                warnings.warn(
-                    "Please use a set instead of a list or tuple for the BleacherMixin.ALLOWED_ATTRIBUTES attribute.",
-                    category=DeprecationWarning,
-                    stacklevel=1,
-                )
+    @classmethod
+    def get_bleacher_config(cls) -> tuple[frozenset[str], dict[str, frozenset[str]]]:
+        """
+        Returns the allowed tags and attributes of the model class. They are compiled once per class and shared by all
+        instances, so they must not be changed. The configuration is compiled again if "ALLOWED_TAGS" or
+        "ALLOWED_ATTRIBUTES" (or their defaults) are replaced.
+        """
+        return cls._get_compiled_bleacher_config()[2:4]
+
+    @classmethod
+    def _get_compiled_bleacher_config(cls) -> tuple:
+        tags_source = getattr(cls, "ALLOWED_TAGS", cls.DEFAULT_ALLOWED_TAGS)
+        attributes_source = getattr(cls, "ALLOWED_ATTRIBUTES", cls.DEFAULT_ALLOWED_ATTRIBUTES)
+
+        # Look up the class' own cache only, subclasses might use different settings
+        config = cls.__dict__.get("_bleacher_config")
+        if config is None or config[0] is not tags_source or config[1] is not attributes_source:
+            allowed_tags = frozenset(tags_source)
+            allowed_attributes = cls._compile_allowed_attributes(attributes_source)
+            # Hashable representation of the allowlists to share cached results between classes
+            cache_key = (allowed_tags, frozenset(allowed_attributes.items()))
+            config = (tags_source, attributes_source, allowed_tags, allowed_attributes, cache_key)
+            cls._bleacher_config = config
+
+        return config
+
+    @classmethod
+    def _compile_allowed_attributes(cls, allowed_attributes: dict) -> dict[str, frozenset[str]]:
+        if any(isinstance(attribute_list, (list, tuple)) for attribute_list in allowed_attributes.values()):
+            warnings.warn(
+                f"Please use a set instead of a list or tuple for the {cls.__name__}.ALLOWED_ATTRIBUTES attribute.",
+                category=DeprecationWarning,
+                stacklevel=3,
+            )
+
+        return {tag: frozenset(attribute_list) for tag, attribute_list in allowed_attributes.items()}
+
+    @property
+    def fields_to_bleach(self) -> list[str]:
+        return self.BLEACH_FIELD_LIST
+
+    @property
+    def allowed_tags(self) -> frozenset[str]:
+        return self.get_bleacher_config()[0]
+
+    @property
+    def allowed_attributes(self) -> dict[str, frozenset[str]]:
+        return self.get_bleacher_config()[1]
 
     def _bleach_field(self, field_name):
         str_to_bleach = getattr(self, field_name, "")
         if str_to_bleach:
-            cleaned_value = nh3.clean(
-                str_to_bleach,
-                tags=self.allowed_tags,
-                attributes=self.allowed_attributes,
-            )
+            # Values which were bleached by this instance before and didn't change since then are skipped
+            bleached_values = self.__dict__.setdefault("_bleached_values", {})
+            if bleached_values.get(field_name) == str_to_bleach:
+                return
+
+            _, _, allowed_tags, allowed_attributes, cache_key = self._get_compiled_bleacher_config()
+            cleaned_value = bleach_cache.clean(str_to_bleach, allowed_tags, allowed_attributes, cache_key)
             setattr(self, field_name, cleaned_value)
+            bleached_values[field_name] = cleaned_value
 
-    def save(self, *args, **kwargs):
+    def bleach_fields(self) -> None:
+        """
+        Bleaches all fields of "BLEACH_FIELD_LIST". Called on "save()".
+        """
         for field in self.fields_to_bleach:
             self._bleach_field(field)
 
+    @classmethod
+    def bleach_many(cls, objs) -> list:
+        """
+        Bleaches the fields of the given objects, which is skipped by "bulk_create()" and "bulk_update()".
+        Returns the objects as list, e.g. "MyModel.objects.bulk_create(MyModel.bleach_many(objs))".
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.bleach_fields()
+        return objs
+
+    def save(self, *args, **kwargs):
+        self.bleach_fields()
+
         super().save(*args, **kwargs)
@@ -1,5 +1,7 @@
 from django.db.models.signals import post_save, pre_save
 
+from ambient_toolbox.context_manager import SuppressSignals
+
 
 class PermissionModelMixin:
     """
@@ -16,23 +18,11 @@ class PermissionModelMixin:
 
 class SaveWithoutSignalsMixin:
     """
-    Mixin to provide a save method that temporarily unhooks all signals and restores them after save/error
+    Mixin to provide a save method that suppresses the "pre_save" and "post_save" signals in the current context only
+    and restores them after save/error
     """
 
     def save_without_signals(self, *args, **kwargs):
-        # Temporarily store signal receivers to restore them later
-        pre_save_receivers = pre_save.receivers
-        post_save_receivers = post_save.receivers
-
-        # Clear signal receivers to make sure, that no signal is triggered when .save() is called
-        pre_save.receivers = []
-        post_save.receivers = []
-
-        # Save without any signals
-        instance = self.save(*args, **kwargs)
-
-        # Restore signal receivers
-        pre_save.receivers = pre_save_receivers
-        post_save.receivers = post_save_receivers
-
-        return instance
+        # Save without any signals, other threads are not affected
+        with SuppressSignals(signals=[pre_save, post_save]):
+            return self.save(*args, **kwargs)
@@ -0,0 +1,15 @@
+from django.conf import settings
+
+
+def get_bleach_cache_max_size() -> int:
+    """
+    Maximum number of sanitised HTML bodies kept in the shared bleach cache.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_BLEACH_CACHE_MAX_SIZE", 1024)
+
+
+def get_bleach_cache_max_bytes() -> int:
+    """
+    Maximum memory in bytes occupied by the sanitised HTML bodies kept in the shared bleach cache.
+    """
+    return getattr(settings, "AMBIENT_TOOLBOX_BLEACH_CACHE_MAX_BYTES", 16 * 1024 * 1024)
@@ -1,14 +1,19 @@
+import copy
+
 from django.conf import settings
 from django.db import models
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+from ambient_toolbox.managers import CommonInfoQuerySet, CreatedAtInfoQuerySet
 from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
 
 
 class CreatedAtInfo(models.Model):
     created_at = models.DateTimeField(_("Created at"), default=now, db_index=True)
 
+    objects = CreatedAtInfoQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
@@ -28,6 +33,8 @@ class CreatedAtInfo(models.Model):
 class CommonInfo(CreatedAtInfo):
     # Automatically add the model's fields to the 'update_fields' list if specified on save()
     ALWAYS_UPDATE_FIELDS = True
+    # Only write changed fields on save() and skip saving if nothing changed since the object was loaded
+    TRACK_FIELD_CHANGES = False
 
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -47,13 +54,21 @@ class CommonInfo(CreatedAtInfo):
         on_delete=models.SET_NULL,
     )
 
+    # Stamps the fields above in bulk operations, derive custom querysets from "CommonInfoQuerySet" to keep this
+    objects = CommonInfoQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None, **kwargs):
+        if self._can_skip_unchanged_fields(force_insert=force_insert, using=using, update_fields=update_fields):
+            changed_fields = self.get_changed_fields()
+            if not changed_fields:
+                return
+            update_fields = {"lastmodified_at", "lastmodified_by"}.union(changed_fields, self._get_auto_now_fields())
+
         self.lastmodified_at = now()
-        current_user = self.get_current_user()
-        self.set_user_fields(current_user)
+        self._stamp_user_fields()
 
         # Handle case that somebody only wants to update some fields
         if update_fields is not None and self.ALWAYS_UPDATE_FIELDS:
@@ -67,6 +82,71 @@ class CommonInfo(CreatedAtInfo):
             **kwargs,
         )
 
+        if self.TRACK_FIELD_CHANGES:
+            self._loaded_values = self._get_field_values()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.TRACK_FIELD_CHANGES:
+            instance._loaded_values = instance._get_field_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if self.TRACK_FIELD_CHANGES:
+            self._loaded_values = {**getattr(self, "_loaded_values", {}), **self._get_field_values(field_names=fields)}
+
+    def _can_skip_unchanged_fields(self, *, force_insert, using, update_fields) -> bool:
+        """
+        Change tracking only applies to plain updates of objects which were loaded from or saved to the same database
+        """
+        return (
+            self.TRACK_FIELD_CHANGES
+            and update_fields is None
+            and not force_insert
+            and not self._state.adding
+            and hasattr(self, "_loaded_values")
+            and (using is None or using == self._state.db)
+        )
+
+    def _get_auto_now_fields(self) -> set[str]:
+        """
+        Returns the names of the fields which are set on every save, e.g. "DateTimeField(auto_now=True)". They never
+        show up as changed, but have to be written with the changed fields.
+        """
+        return {field.name for field in self._meta.concrete_fields if getattr(field, "auto_now", False)}
+
+    def _get_field_values(self, *, field_names=None) -> dict:
+        """
+        Returns a snapshot of the loaded (non-deferred) concrete field values.
+        Mutable values like JSON data are copied, otherwise in-place changes wouldn't be detected.
+        """
+        field_values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if field_names is not None and field.name not in field_names and field.attname not in field_names:
+                continue
+            value = self.__dict__[field.attname]
+            field_values[field.attname] = copy.deepcopy(value) if isinstance(value, dict | list) else value
+        return field_values
+
+    def get_changed_fields(self) -> set[str]:
+        """
+        Returns the names of all fields which changed since the object was loaded or saved.
+        Fields without a snapshot - for example deferred ones - are considered as changed.
+        Requires "TRACK_FIELD_CHANGES" to be set.
+        """
+        loaded_values = getattr(self, "_loaded_values", {})
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (field.attname not in loaded_values or loaded_values[field.attname] != self.__dict__[field.attname])
+        }
+
     @staticmethod
     def get_current_user():
         """
@@ -76,6 +156,39 @@ class CommonInfo(CreatedAtInfo):
         """
         return CurrentRequestMiddleware.get_current_user()
 
+    @staticmethod
+    def get_current_user_id():
+        """
+        Get the primary key of the currently logged-in user over middleware without loading the user again.
+        :return: primary key of the user or None
+        """
+        return CurrentRequestMiddleware.get_current_user_id()
+
+    def _stamp_user_fields(self) -> None:
+        """
+        Sets the user fields by id, unless the user-related hooks are overwritten. In this case, we have to pass the
+        user instance to keep custom implementations working.
+        """
+        model = type(self)
+        if (
+            model.get_current_user is CommonInfo.get_current_user
+            and model.set_user_fields is CommonInfo.set_user_fields
+        ):
+            self.set_user_id_fields(self.get_current_user_id())
+        else:
+            self.set_user_fields(self.get_current_user())
+
+    def set_user_id_fields(self, user_id):
+        """
+        Set user-related fields by primary key before saving the instance.
+        If no primary key is given the fields are not set.
+        :param user_id: primary key of current user
+        """
+        if user_id is not None:
+            if not self.pk:
+                self.created_by_id = user_id
+            self.lastmodified_by_id = user_id
+
     def set_user_fields(self, user):
         """
         Set user-related fields before saving the instance.
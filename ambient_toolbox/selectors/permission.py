@@ -1,5 +1,11 @@
-from django.db.models import QuerySet
+import itertools
+import typing
+from collections.abc import Iterable, Iterator
 
+from django.db.models import QuerySet, Value
+from django.db.models.query import EmptyQuerySet
+
+from ambient_toolbox.managers import get_request_cached_permission_queryset
 from ambient_toolbox.selectors.base import Selector
 
 
@@ -18,6 +24,66 @@ class AbstractUserSpecificSelectorMixin:
     def deletable_for(self, user_id: int) -> QuerySet:
         raise NotImplementedError
 
+    def visible_ids_for_users(self, user_ids: Iterable[int], *, chunk_size: int = 100) -> dict[int, frozenset]:
+        """
+        Returns the primary keys of all objects visible for the given users, keyed by user id.
+        Use "iter_visible_ids_for_users()" if you process lots of users to keep the memory usage bounded.
+        """
+        return dict(self.iter_visible_ids_for_users(user_ids, chunk_size=chunk_size))
+
+    def iter_visible_ids_for_users(
+        self, user_ids: Iterable[int], *, chunk_size: int = 100
+    ) -> Iterator[tuple[int, frozenset]]:
+        """
+        Yields tuples of user id and the primary keys of all objects visible for this user.
+        The "visible_for()" querysets of "chunk_size" users are combined into a single UNION query.
+        """
+        user_id_iterator = iter(user_ids)
+        while chunk := list(itertools.islice(user_id_iterator, chunk_size)):
+            visible_ids = {user_id: set() for user_id in chunk}
+
+            querysets = [
+                self.visible_for(user_id=user_id)
+                .order_by()
+                .annotate(_visible_for_user_id=Value(user_id))
+                .values_list("_visible_for_user_id", "pk")
+                for user_id in chunk
+            ]
+            querysets = [queryset for queryset in querysets if not isinstance(queryset, EmptyQuerySet)]
+            if querysets:
+                for user_id, pk in querysets[0].union(*querysets[1:], all=True).iterator():
+                    visible_ids[user_id].add(pk)
+
+            for user_id in chunk:
+                yield user_id, frozenset(visible_ids[user_id])
+
+
+class RequestCachedPermissionSelectorMixin:
+    """
+    Caches the primary keys of the objects matching "visible_for()", "editable_for()" and "deletable_for()" for the
+    duration of the request. Put it in front of your user-specific selector.
+    """
+
+    def visible_for(self, user_id: int) -> QuerySet:
+        return self._get_request_cached_permission_queryset("visible_for", super().visible_for, user_id)
+
+    def editable_for(self, user_id: int) -> QuerySet:
+        return self._get_request_cached_permission_queryset("editable_for", super().editable_for, user_id)
+
+    def deletable_for(self, user_id: int) -> QuerySet:
+        return self._get_request_cached_permission_queryset("deletable_for", super().deletable_for, user_id)
+
+    def _get_request_cached_permission_queryset(
+        self, method: str, permission_method: typing.Callable, user_id: int
+    ) -> QuerySet:
+        return get_request_cached_permission_queryset(
+            queryset=self.get_queryset(),
+            owner=type(self),
+            method=method,
+            user_id=user_id,
+            build=lambda: permission_method(user_id=user_id),
+        )
+
 
 class GloballyVisibleSelector(AbstractUserSpecificSelectorMixin, Selector):
     """
@@ -32,3 +98,13 @@ class GloballyVisibleSelector(AbstractUserSpecificSelectorMixin, Selector):
 
     def deletable_for(self, user_id: int) -> QuerySet:
         return self.visible_for(user_id=user_id)
+
+    def iter_visible_ids_for_users(
+        self, user_ids: Iterable[int], *, chunk_size: int = 100
+    ) -> Iterator[tuple[int, frozenset]]:
+        # All users see the same objects, so we only need one query and share its result
+        visible_ids = None
+        for user_id in user_ids:
+            if visible_ids is None:
+                visible_ids = frozenset(self.all().values_list("pk", flat=True).iterator())
+            yield user_id, visible_ids
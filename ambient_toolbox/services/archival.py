@@ -0,0 +1,228 @@
+import datetime
+import gzip
+import json
+import time
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils.dateparse import parse_datetime
+
+from ambient_toolbox.models import CreatedAtInfo
+from ambient_toolbox.utils.model import object_to_dict
+
+
+class ArchivalError(RuntimeError):
+    pass
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """
+    Keeps the microseconds of datetimes, which the JSON encoder of Django cuts off
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class AbstractArchiveBackend:
+    """
+    Target of the archived objects. "write()" is called within the transaction which deletes the written objects.
+    Backends which can't take part in the database transaction store a checkpoint of the last written object, so that
+    objects which are still in the database after a crash aren't written twice. Once the deletion of the batch is
+    committed, "clear_checkpoint()" is called.
+    """
+
+    def prepare(self) -> None:
+        pass
+
+    def get_checkpoint(self) -> tuple | None:
+        """
+        Returns the "(created_at, pk)" of the last written object, if its batch wasn't deleted yet
+        """
+        return None
+
+    def clear_checkpoint(self) -> None:
+        pass
+
+    def write(self, objs: list[models.Model]) -> None:
+        raise NotImplementedError
+
+
+class ModelArchiveBackend(AbstractArchiveBackend):
+    """
+    Copies the objects into an archive model in the same database. The archive model needs a field for every field of
+    the archived model, foreign keys included, unless they are blacklisted. Primary keys are kept, so objects which
+    already exist in the archive are skipped.
+    """
+
+    def __init__(self, archive_model: type[models.Model], blacklisted_fields: list | None = None):
+        self.archive_model = archive_model
+        self.blacklisted_fields = blacklisted_fields or []
+
+    def write(self, objs: list[models.Model]) -> None:
+        self.archive_model._default_manager.using(objs[0]._state.db).bulk_create(
+            [
+                self.archive_model(
+                    **object_to_dict(obj, blacklisted_fields=list(self.blacklisted_fields), include_id=True)
+                )
+                for obj in objs
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class JsonLinesFileArchiveBackend(AbstractArchiveBackend):
+    """
+    Appends the objects to a gzip compressed file with one JSON object per line. Every batch is written as a separate
+    gzip member, which is valid for all gzip readers. The size of the file and the last written object are stored in a
+    checkpoint file next to it. When resuming, the file is truncated to the last checkpoint, which drops partially
+    written batches. The last written object is dropped from the checkpoint once its batch is deleted, otherwise
+    objects created later with an older "created_at" would be considered as written.
+    """
+
+    def __init__(self, path: str | Path, blacklisted_fields: list | None = None):
+        self.path = Path(path)
+        self.checkpoint_path = self.path.with_name(f"{self.path.name}.checkpoint")
+        self.blacklisted_fields = blacklisted_fields or []
+        self._checkpoint = None
+
+    def _save_checkpoint(self, checkpoint: dict) -> None:
+        data = json.dumps(checkpoint, cls=ArchiveJSONEncoder)
+        temp_path = self.checkpoint_path.with_name(f"{self.checkpoint_path.name}.tmp")
+        temp_path.write_text(data, encoding="utf-8")
+        temp_path.replace(self.checkpoint_path)
+        self._checkpoint = json.loads(data)
+
+    def prepare(self) -> None:
+        if self.checkpoint_path.exists():
+            self._checkpoint = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+            if self.path.exists() and self.path.stat().st_size > self._checkpoint["offset"]:
+                with open(self.path, "r+b") as archive_file:
+                    archive_file.truncate(self._checkpoint["offset"])
+        else:
+            self._save_checkpoint(
+                {"offset": self.path.stat().st_size if self.path.exists() else 0, "created_at": None, "pk": None}
+            )
+
+    def get_checkpoint(self) -> tuple | None:
+        if not self._checkpoint or self._checkpoint["created_at"] is None:
+            return None
+        return parse_datetime(self._checkpoint["created_at"]), self._checkpoint["pk"]
+
+    def clear_checkpoint(self) -> None:
+        self._save_checkpoint({"offset": self._checkpoint["offset"], "created_at": None, "pk": None})
+
+    def write(self, objs: list[models.Model]) -> None:
+        with gzip.open(self.path, "at", encoding="utf-8") as archive_file:
+            for obj in objs:
+                data = object_to_dict(obj, blacklisted_fields=list(self.blacklisted_fields), include_id=True)
+                archive_file.write(json.dumps(data, cls=ArchiveJSONEncoder) + "\n")
+
+        self._save_checkpoint(
+            {"offset": self.path.stat().st_size, "created_at": objs[-1].created_at, "pk": objs[-1].pk}
+        )
+
+
+class ArchivalService:
+    """
+    Moves all objects of a model derived from "CreatedAtInfo", which were created before the cutoff, to an archive
+    backend and deletes them. The objects are processed in the order of "(created_at, pk)" in batches, each in its own
+    transaction, to avoid long locks. Pass "sleep" to throttle the load on the database between the batches.
+    Deleting the objects would silently delete related objects with "on_delete=CASCADE" as well, without archiving
+    them. Therefore, such models are rejected, unless "allow_cascade" is set.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        model: type[models.Model],
+        backend: AbstractArchiveBackend,
+        cutoff: datetime.datetime,
+        batch_size: int = 1000,
+        sleep: float = 0.0,
+        using: str | None = None,
+        allow_cascade: bool = False,
+    ):
+        if not issubclass(model, CreatedAtInfo):
+            raise ArchivalError(f"Model {model._meta.label} has to be derived from CreatedAtInfo.")
+        if batch_size < 1:
+            raise ArchivalError("Batch size has to be at least 1.")
+
+        cascading_relations = self.get_cascading_relations(model)
+        if cascading_relations and not allow_cascade:
+            raise ArchivalError(
+                f"Deleting objects of {model._meta.label} deletes the related objects of "
+                f"{', '.join(cascading_relations)} as well, which aren't archived. Allow cascading deletes to "
+                f"archive the model anyway."
+            )
+
+        self.model = model
+        self.backend = backend
+        self.cutoff = cutoff
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.using = using or model._default_manager.db
+
+    @staticmethod
+    def get_cascading_relations(model: type[models.Model]) -> list[str]:
+        """
+        Returns the labels of the relations whose objects are deleted with the objects of the given model
+        """
+        return [
+            f"{relation.related_model._meta.label}.{relation.field.name}"
+            for relation in model._meta.related_objects
+            if relation.on_delete is models.CASCADE
+        ]
+
+    def _is_written(self, obj: models.Model, checkpoint: tuple | None) -> bool:
+        if checkpoint is None:
+            return False
+        created_at, pk = checkpoint
+        return (obj.created_at, obj.pk) <= (created_at, self.model._meta.pk.to_python(pk))
+
+    def process_batch(self) -> int:
+        """
+        Archives and deletes the next batch of objects. Returns the number of objects in the batch.
+        """
+        with transaction.atomic(using=self.using):
+            objs = list(
+                self.model._base_manager.using(self.using)
+                .filter(created_at__lt=self.cutoff)
+                .order_by("created_at", "pk")[: self.batch_size]
+            )
+            if not objs:
+                return 0
+
+            # Objects up to the checkpoint were written, but deleting them failed
+            checkpoint = self.backend.get_checkpoint()
+            unwritten_objs = [obj for obj in objs if not self._is_written(obj, checkpoint)]
+            if unwritten_objs:
+                self.backend.write(unwritten_objs)
+
+            self.model._base_manager.using(self.using).filter(pk__in=[obj.pk for obj in objs]).delete()
+            transaction.on_commit(self.backend.clear_checkpoint, using=self.using)
+
+        return len(objs)
+
+    def process(self, max_batches: int | None = None) -> int:
+        """
+        Archives all objects older than the cutoff, or the given number of batches. Returns the number of archived
+        objects. If the process is interrupted, it can be started again and continues where it stopped.
+        """
+        self.backend.prepare()
+
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batch_count = self.process_batch()
+            archived += batch_count
+            batches += 1
+            if batch_count < self.batch_size:
+                break
+            if self.sleep:
+                time.sleep(self.sleep)
+
+        return archived
@@ -1,3 +1,5 @@
+import typing
+
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.messages import get_messages
@@ -5,10 +7,12 @@ from django.contrib.messages.middleware import MessageMiddleware
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import HttpResponse
+from django.http import HttpRequest, HttpResponse
 from django.test import RequestFactory
 from django.utils.translation import gettext_lazy as _
 
+from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
+
 
 class ClassBasedViewTestMixin:
     """
@@ -104,6 +108,21 @@ class RequestProviderMixin:
         return request
 
 
+def run_in_request(func: typing.Callable, request: HttpRequest | None = None) -> typing.Any:  # noqa: ANN401
+    """
+    Executes the given function while the "CurrentRequestMiddleware" provides a request and returns its result.
+    Supposed to be used in unittests of code relying on the current request, like the request cache.
+    """
+    result = {}
+
+    def get_response(current_request):
+        result["value"] = func()
+        return HttpResponse()
+
+    CurrentRequestMiddleware(get_response)(request or RequestFactory().get("/"))
+    return result["value"]
+
+
 class DjangoMessagingFrameworkTestMixin:
     """
     Mixin to enable test cases to easily check for messages in the request.
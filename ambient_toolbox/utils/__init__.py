@@ -4,3 +4,4 @@ from .log_whodid import *  # noqa: F403
 from .math import *  # noqa: F403
 from .model import *  # noqa: F403
 from .named_tuple import *  # noqa: F403
+from .request_cache import *  # noqa: F403
@@ -3,10 +3,18 @@ from django.db import models
 
 def log_whodid(obj: models.Model, user) -> None:
     """
-    Stores the given user as creator or editor of the given object
+    Stores the given user as creator or editor of the given object.
+    Foreign keys are set via their id, so neither the current creator nor the given user have to be fetched.
     """
-    if hasattr(obj, "created_by") and obj.created_by is None:
+    user_id = user.pk if user is not None else None
+
+    if hasattr(obj, "created_by_id"):
+        if obj.created_by_id is None:
+            obj.created_by_id = user_id
+    elif hasattr(obj, "created_by") and obj.created_by is None:
         obj.created_by = user
 
-    if hasattr(obj, "lastmodified_by"):
+    if hasattr(obj, "lastmodified_by_id"):
+        obj.lastmodified_by_id = user_id
+    elif hasattr(obj, "lastmodified_by"):
         obj.lastmodified_by = user
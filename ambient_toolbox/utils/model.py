@@ -1,4 +1,20 @@
-from django.db.models import ForeignKey, Model
+import functools
+import logging
+import random
+import threading
+import traceback
+import typing
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.db.models import ForeignKey, Model, QuerySet, query
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor,
+    ManyToManyDescriptor,
+    ReverseManyToOneDescriptor,
+    ReverseOneToOneDescriptor,
+)
 
 
 def object_to_dict(obj, blacklisted_fields: list | None = None, include_id: bool = False) -> dict:
@@ -27,11 +43,46 @@ def object_to_dict(obj, blacklisted_fields: list | None = None, include_id: bool
     return valid_data
 
 
+def _split_related_path(related_path: str) -> list[str]:
+    return related_path.replace(".", LOOKUP_SEP).split(LOOKUP_SEP)
+
+
+def _get_cached_relation(obj: Model, related_field_name: str) -> tuple[bool, typing.Any]:
+    """
+    Looks up the given relation in the caches filled by `select_related()` and `prefetch_related()`.
+    Returns a tuple of a flag if the relation is cached and the cached value.
+    """
+    # warning: these are undocumented features of django
+    fields_cache = obj._state.fields_cache
+    if related_field_name in fields_cache:
+        return True, fields_cache[related_field_name]
+
+    prefetched_objects_cache = getattr(obj, "_prefetched_objects_cache", {})
+    prefetch_cache_name = _get_prefetch_cache_name(obj, related_field_name)
+    if prefetch_cache_name in prefetched_objects_cache:
+        return True, prefetched_objects_cache[prefetch_cache_name]
+
+    return False, None
+
+
+def _get_prefetch_cache_name(obj: Model, related_field_name: str) -> str:
+    """
+    Returns the key of the given relation in the prefetched objects cache. It differs from the accessor name for reverse
+    many-to-many relations, which are cached by their related query name, e.g. "pizza" instead of "pizza_set".
+    """
+    descriptor = getattr(obj.__class__, related_field_name, None)
+    if isinstance(descriptor, ManyToManyDescriptor):
+        return descriptor.rel.field.related_query_name() if descriptor.reverse else descriptor.rel.field.name
+    return related_field_name
+
+
 def get_cached_related_obj(obj: Model, related_field_name: str, silently_return_none: bool = False):
     """
     This function helps to avoid silent sub-queries, due to missing `select_related()` or `prefetch_related()`.
 
-    This function performs a lookup in the fields_cache of the given object.
+    This function performs a lookup in the fields_cache and the prefetched objects cache of the given object.
+    Nested relations can be passed as path, separated by dots or double underscores. Prefetched to-many relations
+    are returned as the prefetched queryset and have to be the last part of the path.
     If silently_return_none is True, this function will return None if the field is not cached.
     Otherwise, an AttributeError will be raised.
 
@@ -47,20 +98,262 @@ def get_cached_related_obj(obj: Model, related_field_name: str, silently_return_
 
     Usage:
     get_cached_related_obj(foo, 'bar')
+    get_cached_related_obj(foo, 'bar__baz')
 
     This will result in a KeyError instead of a silent sub-query if the field is not cached
     via `select_related()` or `prefetch_related()`.
     """
-    # warning: this is an undocumented feature of django
-    fields_cache = obj._state.fields_cache
+    related_obj = obj
+    for related_field_name_part in _split_related_path(related_field_name):
+        # Nullable relations are cached as "None"
+        if related_obj is None:
+            return None
 
-    if related_field_name in fields_cache:
-        return fields_cache[related_field_name]
+        if isinstance(related_obj, QuerySet):
+            raise TypeError(
+                f'Path "{related_field_name}" contains a to-many relation before "{related_field_name_part}". '
+                "To-many relations can only be the last part of the path."
+            )
+
+        is_cached, cached_value = _get_cached_relation(related_obj, related_field_name_part)
+        if not is_cached:
+            if silently_return_none:
+                return None
+
+            raise AttributeError(
+                f'Field "{related_field_name_part}" not found in `fields_cache` of {related_obj.__class__.__name__} '
+                "object. Did you forget to use `select_related()` or `prefetch_related()`?"
+            )
+
+        related_obj = cached_value
+
+    return related_obj
+
+
+def _get_uncached_related_path(obj: Model, path_parts: list[str]) -> str | None:
+    for index, related_field_name in enumerate(path_parts):
+        is_cached, obj = _get_cached_relation(obj, related_field_name)
+        if not is_cached:
+            return LOOKUP_SEP.join(path_parts[: index + 1])
+
+        if obj is None:
+            return None
+
+        if isinstance(obj, QuerySet):
+            # The prefetched objects have to provide the remaining path as well
+            for related_obj in obj:
+                uncached_path = _get_uncached_related_path(related_obj, path_parts[index + 1 :])
+                if uncached_path is not None:
+                    return LOOKUP_SEP.join([*path_parts[: index + 1], uncached_path])
+            return None
+
+    return None
+
+
+def get_uncached_related_paths(objs: typing.Iterable[Model], related_paths: list[str]) -> dict[str, list[Model]]:
+    """
+    Checks for the given objects, which of the given relations would cause sub-queries when being accessed.
+    Returns the uncached paths, separated by double underscores, mapped to the affected objects. Paths through
+    prefetched to-many relations are checked for every prefetched object.
+
+    Usage:
+    get_uncached_related_paths(foo_list, ['bar', 'bar__baz', 'tags'])
+    # {'bar__baz': [<Foo: 1>, <Foo: 3>]}
+    """
+    uncached_paths: dict[str, list[Model]] = {}
+    split_paths = [_split_related_path(related_path) for related_path in related_paths]
+
+    for obj in objs:
+        for path_parts in split_paths:
+            uncached_path = _get_uncached_related_path(obj, path_parts)
+            if uncached_path is not None:
+                uncached_paths.setdefault(uncached_path, []).append(obj)
+
+    return uncached_paths
+
+
+class LazyRelatedAccessError(RuntimeError):
+    """
+    Raised by `StrictRelatedAccess` if a relation is loaded lazily
+    """
+
+
+class StrictRelatedAccess(ContextDecorator):
+    """
+    Context manager (and decorator) which detects silent sub-queries due to missing `select_related()` or
+    `prefetch_related()` within a whole block. Covered are forward foreign keys and one-to-one relations, reverse
+    one-to-one relations and related managers (reverse foreign keys and many-to-many relations) which are not
+    prefetched.
+
+    In "raise" mode, a `LazyRelatedAccessError` is raised on the first lazy access. In "log" mode, every lazy access
+    path is logged once when leaving the block, including the number of accesses and the stack of the first one.
+    Pass a `sample_rate` below 1.0 to only check a share of the blocks, e.g. in production.
+
+    Usage:
+    with StrictRelatedAccess():
+        for foo in Foo.objects.all():
+            foo.bar  # <-- raises LazyRelatedAccessError
+    """
+
+    MODE_RAISE = "raise"
+    MODE_LOG = "log"
+
+    def __init__(self, mode: str = MODE_RAISE, sample_rate: float = 1.0, logger_name: str = "toolbox_strict_mode"):
+        if mode not in (self.MODE_RAISE, self.MODE_LOG):
+            raise ValueError(f'Invalid mode "{mode}". Use "{self.MODE_RAISE}" or "{self.MODE_LOG}".')
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Sample rate has to be between 0.0 and 1.0.")
+
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.logger_name = logger_name
+        self.violations: dict[str, list] = {}
+        self._token = None
+
+    def _recreate_cm(self):
+        # Decorated functions get a fresh instance per call to be safe for recursion and threads
+        return self.__class__(mode=self.mode, sample_rate=self.sample_rate, logger_name=self.logger_name)
+
+    def __enter__(self):
+        _install_strict_related_access_hooks()
+        self.violations = {}
+        is_sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        self._token = _strict_related_access_cv.set(self if is_sampled else None)
+        return self
+
+    def __exit__(self, *exc):
+        _strict_related_access_cv.reset(self._token)
+        self._token = None
+
+        logger = logging.getLogger(self.logger_name)
+        for access_path, (count, stack) in self.violations.items():
+            logger.warning(
+                'Lazy access of "%s" (%d times). Did you forget to use `select_related()` or `prefetch_related()`?\n%s',
+                access_path,
+                count,
+                "".join(stack),
+            )
+
+    def report(self, access_path: str) -> None:
+        """
+        Registers a lazy access of the given relation, e.g. "Foo.bar"
+        """
+        if self.mode == self.MODE_RAISE:
+            raise LazyRelatedAccessError(
+                f'Lazy access of "{access_path}" in strict mode. '
+                "Did you forget to use `select_related()` or `prefetch_related()`?"
+            )
+
+        if access_path in self.violations:
+            self.violations[access_path][0] += 1
+        else:
+            # Drop the frames of the toolbox
+            self.violations[access_path] = [1, traceback.format_stack()[:-3]]
+
+
+_strict_related_access_cv: ContextVar[StrictRelatedAccess | None] = ContextVar(
+    "ambient_toolbox_strict_related_access", default=None
+)
+_strict_related_access_lock = threading.Lock()
+_strict_related_access_installed = False
+
+
+def _report_lazy_access(access_path: str) -> None:
+    strict_related_access = _strict_related_access_cv.get()
+    if strict_related_access is not None:
+        strict_related_access.report(access_path)
+
+
+# Methods of related managers which call "get_queryset()" to write, which is no lazy access
+_RELATED_MANAGER_WRITE_METHODS = ("create", "get_or_create", "update_or_create", "add", "remove", "clear", "set")
+
+
+def _wrap_related_manager_write_method(method: typing.Callable) -> typing.Callable:
+    @functools.wraps(method)
+    def _write_method(*args, **kwargs):
+        token = _strict_related_access_cv.set(None)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _strict_related_access_cv.reset(token)
+
+    return _write_method
+
+
+def _patch_related_manager_cls(manager_cls: type) -> None:
+    if "_strict_related_access_patched" in manager_cls.__dict__:
+        return
+
+    for method_name in _RELATED_MANAGER_WRITE_METHODS:
+        if hasattr(manager_cls, method_name):
+            setattr(manager_cls, method_name, _wrap_related_manager_write_method(getattr(manager_cls, method_name)))
+
+    get_queryset = manager_cls.get_queryset
+
+    @functools.wraps(get_queryset)
+    def _get_queryset(self):
+        queryset = get_queryset(self)
+        # Prefetched querysets are already evaluated
+        if queryset._result_cache is None and _strict_related_access_cv.get() is not None:
+            name = getattr(self, "prefetch_cache_name", None) or self.field.remote_field.get_accessor_name()
+            _report_lazy_access(f"{self.instance.__class__.__name__}.{name}")
+        return queryset
+
+    manager_cls.get_queryset = _get_queryset
+    manager_cls._strict_related_access_patched = True
+
+
+def _install_strict_related_access_hooks() -> None:
+    """
+    Wraps Django's related descriptors once, so that lazy loads can be detected in strict mode.
+    Outside a `StrictRelatedAccess` block, the wrappers only perform a context variable lookup.
+    """
+    global _strict_related_access_installed  # noqa: PLW0603
+
+    with _strict_related_access_lock:
+        if _strict_related_access_installed:
+            return
+
+        forward_get_object = ForwardManyToOneDescriptor.get_object
+
+        @functools.wraps(forward_get_object)
+        def _forward_get_object(self, instance):
+            _report_lazy_access(f"{instance.__class__.__name__}.{self.field.name}")
+            return forward_get_object(self, instance)
+
+        reverse_one_to_one_get_queryset = ReverseOneToOneDescriptor.get_queryset
+
+        @functools.wraps(reverse_one_to_one_get_queryset)
+        def _reverse_one_to_one_get_queryset(self, **hints):
+            # Only the lazy load passes the instance, prefetching doesn't
+            if "instance" in hints:
+                _report_lazy_access(f"{hints['instance'].__class__.__name__}.{self.related.get_accessor_name()}")
+            return reverse_one_to_one_get_queryset(self, **hints)
+
+        reverse_many_to_one_get = ReverseManyToOneDescriptor.__get__
+
+        @functools.wraps(reverse_many_to_one_get)
+        def _reverse_many_to_one_get(self, instance, cls=None):
+            manager = reverse_many_to_one_get(self, instance, cls)
+            if instance is not None and _strict_related_access_cv.get() is not None:
+                _patch_related_manager_cls(manager.__class__)
+            return manager
+
+        prefetch_one_level = query.prefetch_one_level
+
+        @functools.wraps(prefetch_one_level)
+        def _prefetch_one_level(*args, **kwargs):
+            # Prefetching fetches the related managers' querysets to fill their cache, which is no lazy access
+            token = _strict_related_access_cv.set(None)
+            try:
+                return prefetch_one_level(*args, **kwargs)
+            finally:
+                _strict_related_access_cv.reset(token)
 
-    if silently_return_none:
-        return None
+        ForwardManyToOneDescriptor.get_object = _forward_get_object
+        ReverseOneToOneDescriptor.get_queryset = _reverse_one_to_one_get_queryset
+        # Covers the "ManyToManyDescriptor" as well
+        ReverseManyToOneDescriptor.__get__ = _reverse_many_to_one_get
+        query.prefetch_one_level = _prefetch_one_level
 
-    raise AttributeError(
-        f'Field "{related_field_name}" not found in `fields_cache` of {obj.__class__.__name__} object. '
-        "Did you forget to use `select_related()` or `prefetch_related()`?"
-    )
+        _strict_related_access_installed = True
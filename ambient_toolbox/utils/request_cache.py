@@ -0,0 +1,117 @@
+import functools
+import typing
+
+from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
+
+_REQUEST_ATTRIBUTE = "_ambient_toolbox_request_cache"
+
+
+class RequestCache:
+    """
+    Dict-like store which lives as long as the current request.
+    Keys are arbitrary hashable objects. Tuple keys are grouped by their first element, the "namespace", which can be
+    invalidated at once. "get()" and "get_or_set()" count hits and misses.
+    """
+
+    def __init__(self):
+        self._data: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value) -> None:
+        self._data[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value) -> None:
+        self._data[key] = value
+
+    def get_or_set(self, key, default: typing.Callable):
+        """
+        Returns the cached value for the given key. On a miss, the callable is executed and its result is stored.
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = self._data[key] = default()
+            return value
+
+        self.hits += 1
+        return value
+
+    def invalidate(self, namespace=None) -> None:
+        """
+        Drops all tuple keys starting with the given namespace. Without a namespace, the whole cache is cleared.
+        """
+        if namespace is None:
+            self._data.clear()
+            return
+
+        for key in [key for key in self._data if isinstance(key, tuple) and key and key[0] == namespace]:
+            del self._data[key]
+
+
+def get_request_cache() -> RequestCache:
+    """
+    Returns the cache of the current request.
+    Outside a request - for example in management commands or celery tasks - a new, empty cache is returned every time,
+    so nothing is cached there.
+    """
+    request = CurrentRequestMiddleware.get_current_request()
+    if request is None:
+        return RequestCache()
+
+    request_cache = getattr(request, _REQUEST_ATTRIBUTE, None)
+    if request_cache is None:
+        request_cache = RequestCache()
+        setattr(request, _REQUEST_ATTRIBUTE, request_cache)
+    return request_cache
+
+
+def request_memoize(func: typing.Callable | None = None, *, namespace: str | None = None) -> typing.Callable:
+    """
+    Decorator to execute a function at most once per request and set of arguments.
+    The results are stored in the request cache under the given namespace, defaulting to the path of the function.
+    Calls with unhashable arguments aren't cached.
+    """
+
+    def decorator(decoratee: typing.Callable) -> typing.Callable:
+        cache_namespace = namespace or f"{decoratee.__module__}.{decoratee.__qualname__}"
+
+        @functools.wraps(decoratee)
+        def wrapper(*args, **kwargs):
+            key = (cache_namespace, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return decoratee(*args, **kwargs)
+
+            return get_request_cache().get_or_set(key, lambda: decoratee(*args, **kwargs))
+
+        wrapper.namespace = cache_namespace
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
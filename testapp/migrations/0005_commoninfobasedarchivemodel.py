@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0004_modelwithm2mtouser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommonInfoBasedArchiveModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('lastmodified_at', models.DateTimeField()),
+                ('value', models.PositiveIntegerField(default=0)),
+                ('value_b', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0006_commoninfobasedautonowmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreatedAtInfoBasedModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Created at')),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CreatedAtInfoBasedChildModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='children', to='testapp.createdatinfobasedmodel')),
+            ],
+        ),
+    ]
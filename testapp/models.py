@@ -7,7 +7,7 @@ from ambient_toolbox.managers import GloballyVisibleQuerySet
 from ambient_toolbox.mixins.bleacher import BleacherMixin
 from ambient_toolbox.mixins.models import PermissionModelMixin, SaveWithoutSignalsMixin
 from ambient_toolbox.mixins.validation import CleanOnSaveMixin
-from ambient_toolbox.models import CommonInfo
+from ambient_toolbox.models import CommonInfo, CreatedAtInfo
 from testapp.managers import ModelWithGetOrNoneManager, ModelWithSelectorQuerySet
 from testapp.selectors import ModelWithSelectorGloballyVisibleSelector
 
@@ -65,6 +65,30 @@ class CommonInfoBasedModel(CommonInfo):
         return str(self.value)
 
 
+class CommonInfoBasedAutoNowModel(CommonInfo):
+    TRACK_FIELD_CHANGES = True
+
+    value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class CreatedAtInfoBasedModel(CreatedAtInfo):
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class CreatedAtInfoBasedChildModel(models.Model):
+    parent = models.ForeignKey(CreatedAtInfoBasedModel, related_name="children", on_delete=models.CASCADE)
+
+    def __str__(self):
+        return str(self.parent_id)
+
+
 class ModelWithSelector(models.Model):
     value = models.PositiveIntegerField(default=0)
 
@@ -164,3 +188,13 @@ class ModelWithGetOrNoneManagerModel(models.Model):
 
     def __str__(self):
         return self.id
+
+
+class CommonInfoBasedArchiveModel(models.Model):
+    created_at = models.DateTimeField()
+    lastmodified_at = models.DateTimeField()
+    value = models.PositiveIntegerField(default=0)
+    value_b = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.value)
@@ -3,9 +3,12 @@ from unittest import mock
 from django import forms
 from django.contrib import admin
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from ambient_toolbox.admin.model_admins.mixins import CommonInfoAdminMixin
+from ambient_toolbox.admin.utils import get_user_display_label
 from ambient_toolbox.tests.mixins import RequestProviderMixin
 from testapp.models import CommonInfoBasedModel
 
@@ -17,7 +20,12 @@ class CommonInfoBasedModelForm(forms.ModelForm):
 
 
 class CommonInfoTestAdminMixinAdmin(CommonInfoAdminMixin, admin.ModelAdmin):
-    pass
+    list_display = ("value", "get_created_by_label")
+
+    @admin.display(description="Created by")
+    def get_created_by_label(self, obj):
+        # Django doesn't apply "select_related()" for relations used in methods
+        return get_user_display_label(obj.created_by)
 
 
 class CommonInfoAdminMixinTest(RequestProviderMixin, TestCase):
@@ -96,3 +104,49 @@ class CommonInfoAdminMixinTest(RequestProviderMixin, TestCase):
         # When request.user is None, created_by and lastmodified_by should not be set
         self.assertIsNone(obj.created_by)
         self.assertIsNone(obj.lastmodified_by)
+
+    def _get_changelist_query_count(self, page_size: int) -> int:
+        superuser = User.objects.create(username=f"superuser-{page_size}", is_superuser=True, is_staff=True)
+        CommonInfoBasedModel.objects.all().delete()
+        for index in range(page_size):
+            user = User.objects.create(username=f"user-{page_size}-{index}")
+            CommonInfoBasedModel.objects.create(value=index, created_by=user, lastmodified_by=user)
+
+        model_admin = CommonInfoTestAdminMixinAdmin(model=CommonInfoBasedModel, admin_site=admin.site)
+        request = self.get_request(superuser, url="/admin/testapp/commoninfobasedmodel/")
+
+        with CaptureQueriesContext(connection) as context:
+            changelist = model_admin.get_changelist_instance(request)
+            for obj in changelist.result_list:
+                model_admin.get_created_by_label(obj)
+                str(obj.lastmodified_by)
+
+        return len(context.captured_queries)
+
+    def test_changelist_query_count_independent_of_page_size(self):
+        self.assertEqual(self._get_changelist_query_count(2), self._get_changelist_query_count(10))
+
+    def test_get_queryset_loads_audit_users(self):
+        model_admin = CommonInfoTestAdminMixinAdmin(model=CommonInfoBasedModel, admin_site=admin.site)
+        CommonInfoBasedModel.objects.create(value=1, created_by=self.user, lastmodified_by=self.user)
+
+        obj = model_admin.get_queryset(self.request).get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obj.created_by.username, "my_user")
+            self.assertEqual(obj.lastmodified_by.username, "my_user")
+
+    def test_get_queryset_audit_user_fields(self):
+        model_admin = CommonInfoTestAdminMixinAdmin(model=CommonInfoBasedModel, admin_site=admin.site)
+        model_admin.audit_user_fields = ["email"]
+        CommonInfoBasedModel.objects.create(value=1, created_by=self.user, lastmodified_by=self.user)
+
+        obj = model_admin.get_queryset(self.request).get()
+
+        self.assertIn("first_name", obj.created_by.get_deferred_fields())
+        self.assertNotIn("email", obj.created_by.get_deferred_fields())
+
+    def test_get_queryset_without_common_info_queryset(self):
+        model_admin = CommonInfoTestAdminMixinAdmin(model=User, admin_site=admin.site)
+
+        self.assertEqual(model_admin.get_queryset(self.request).query.select_related, False)
@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from ambient_toolbox.autodiscover.dispatch import DispatchResult, HandlerDispatcher
+
+
+def double(payload):
+    return payload * 2
+
+
+def fail(payload):
+    raise ValueError(payload)
+
+
+def slow(payload):
+    time.sleep(0.5)
+    return payload
+
+
+def current_thread_name(payload):
+    return threading.current_thread().name
+
+
+async def async_double(payload):
+    return payload * 2
+
+
+async def async_slow(payload):
+    await asyncio.sleep(0.5)
+    return payload
+
+
+def test_dispatch_result_succeeded_regular():
+    assert DispatchResult(handler=double, payload=1, result=2).succeeded is True
+
+
+def test_dispatch_result_succeeded_with_error():
+    assert DispatchResult(handler=double, payload=1, error=ValueError()).succeeded is False
+
+
+def test_handler_dispatcher_init_invalid_mode():
+    with pytest.raises(ValueError, match='Invalid dispatch mode "processes"'):
+        HandlerDispatcher(handlers=[double], mode="processes")
+
+
+def test_handler_dispatcher_init_timeout_in_sequential_mode():
+    with pytest.raises(ValueError, match="Timeouts are only supported"):
+        HandlerDispatcher(handlers=[double], timeout=1)
+
+
+def test_handler_dispatcher_dispatch_sequential_regular():
+    results = HandlerDispatcher(handlers=[double, async_double]).dispatch(payloads=[1, 2])
+
+    assert [(result.handler, result.payload, result.result) for result in results] == [
+        (double, 1, 2),
+        (double, 2, 4),
+        (async_double, 1, 2),
+        (async_double, 2, 4),
+    ]
+
+
+def test_handler_dispatcher_dispatch_sequential_collects_errors():
+    results = HandlerDispatcher(handlers=[fail, double]).dispatch(payloads=[1])
+
+    assert isinstance(results[0].error, ValueError)
+    assert results[0].result is None
+    assert results[1].result == 2  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_sequential_logs_errors():
+    with mock.patch("ambient_toolbox.autodiscover.dispatch.get_logger") as mocked_get_logger:
+        HandlerDispatcher(handlers=[fail]).dispatch(payloads=[1])
+
+    mocked_get_logger.return_value.exception.assert_called_once_with("Handler '%s' failed.", "fail")
+
+
+def test_handler_dispatcher_dispatch_threads_regular():
+    results = HandlerDispatcher(handlers=[double, fail, async_double], mode=HandlerDispatcher.MODE_THREADS).dispatch(
+        payloads=[3]
+    )
+
+    assert results[0].result == 6  # noqa: PLR2004
+    assert isinstance(results[1].error, ValueError)
+    assert results[2].result == 6  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_threads_runs_in_worker_threads():
+    results = HandlerDispatcher(handlers=[current_thread_name], mode=HandlerDispatcher.MODE_THREADS).dispatch(
+        payloads=[1]
+    )
+
+    assert results[0].result != threading.current_thread().name
+
+
+def test_handler_dispatcher_dispatch_threads_runs_in_parallel():
+    start = time.monotonic()
+    HandlerDispatcher(handlers=[slow, slow, slow], mode=HandlerDispatcher.MODE_THREADS).dispatch(payloads=[1])
+
+    assert time.monotonic() - start < 1.2  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_threads_timeout():
+    results = HandlerDispatcher(handlers=[slow, double], mode=HandlerDispatcher.MODE_THREADS, timeout=0.1).dispatch(
+        payloads=[1]
+    )
+
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].result == 2  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_threads_timeout_per_handler():
+    results = HandlerDispatcher(
+        handlers=[slow, slow, slow], mode=HandlerDispatcher.MODE_THREADS, timeout=1.0, max_workers=1
+    ).dispatch(payloads=[1])
+
+    assert [result.result for result in results] == [1, 1, 1]
+
+
+def test_handler_dispatcher_dispatch_threads_timeout_frees_worker():
+    results = HandlerDispatcher(
+        handlers=[slow, double], mode=HandlerDispatcher.MODE_THREADS, timeout=0.1, max_workers=1
+    ).dispatch(payloads=[1])
+
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].result == 2  # noqa: PLR2004
+
+
+@mock.patch("ambient_toolbox.autodiscover.dispatch.ThreadPoolExecutor", wraps=ThreadPoolExecutor)
+def test_handler_dispatcher_dispatch_threads_default_max_workers(mocked_executor):
+    HandlerDispatcher(handlers=[double], mode=HandlerDispatcher.MODE_THREADS).dispatch_batch(
+        payloads=list(range(100)), batch_size=1
+    )
+
+    mocked_executor.assert_called_once_with(max_workers=HandlerDispatcher.DEFAULT_MAX_WORKERS)
+
+
+@mock.patch("ambient_toolbox.autodiscover.dispatch.ThreadPoolExecutor", wraps=ThreadPoolExecutor)
+def test_handler_dispatcher_dispatch_threads_max_workers_limited_to_calls(mocked_executor):
+    HandlerDispatcher(handlers=[double], mode=HandlerDispatcher.MODE_THREADS, max_workers=10).dispatch(payloads=[1])
+
+    mocked_executor.assert_called_once_with(max_workers=1)
+
+
+@mock.patch("ambient_toolbox.autodiscover.dispatch.connections.close_all")
+def test_handler_dispatcher_dispatch_threads_closes_db_connections(mocked_close_all):
+    HandlerDispatcher(handlers=[fail], mode=HandlerDispatcher.MODE_THREADS).dispatch(payloads=[1])
+
+    mocked_close_all.assert_called_once_with()
+
+
+def test_handler_dispatcher_dispatch_threads_no_handlers():
+    assert HandlerDispatcher(handlers=[], mode=HandlerDispatcher.MODE_THREADS).dispatch(payloads=[1]) == []
+
+
+def test_handler_dispatcher_dispatch_asyncio_regular():
+    results = HandlerDispatcher(handlers=[double, async_double, fail], mode=HandlerDispatcher.MODE_ASYNCIO).dispatch(
+        payloads=[4]
+    )
+
+    assert results[0].result == 8  # noqa: PLR2004
+    assert results[1].result == 8  # noqa: PLR2004
+    assert isinstance(results[2].error, ValueError)
+
+
+def test_handler_dispatcher_dispatch_asyncio_runs_concurrently():
+    start = time.monotonic()
+    HandlerDispatcher(handlers=[async_slow, async_slow, slow], mode=HandlerDispatcher.MODE_ASYNCIO).dispatch(
+        payloads=[1]
+    )
+
+    assert time.monotonic() - start < 1.2  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_asyncio_timeout():
+    results = HandlerDispatcher(
+        handlers=[async_slow, async_double], mode=HandlerDispatcher.MODE_ASYNCIO, timeout=0.1
+    ).dispatch(payloads=[1])
+
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].result == 2  # noqa: PLR2004
+
+
+def test_handler_dispatcher_dispatch_asyncio_async_handler_error():
+    async def async_fail(payload):
+        raise ValueError(payload)
+
+    results = HandlerDispatcher(handlers=[async_fail], mode=HandlerDispatcher.MODE_ASYNCIO).dispatch(payloads=[1])
+
+    assert isinstance(results[0].error, ValueError)
+
+
+def test_handler_dispatcher_adispatch_regular():
+    dispatcher = HandlerDispatcher(handlers=[double, async_double], mode=HandlerDispatcher.MODE_ASYNCIO)
+
+    results = asyncio.run(dispatcher.adispatch(payloads=[5]))
+
+    assert [result.result for result in results] == [10, 10]
+
+
+def test_handler_dispatcher_dispatch_batch_regular():
+    handler = mock.Mock(return_value="done")
+
+    results = HandlerDispatcher(handlers=[handler]).dispatch_batch(payloads=[1, 2, 3], batch_size=2)
+
+    assert handler.call_args_list == [mock.call([1, 2]), mock.call([3])]
+    assert [result.payload for result in results] == [[1, 2], [3]]
+
+
+def test_handler_dispatcher_dispatch_batch_without_batch_size():
+    handler = mock.Mock()
+
+    HandlerDispatcher(handlers=[handler]).dispatch_batch(payloads=[1, 2, 3])
+
+    handler.assert_called_once_with([1, 2, 3])
+
+
+def test_handler_dispatcher_dispatch_batch_no_payloads():
+    handler = mock.Mock()
+
+    assert HandlerDispatcher(handlers=[handler]).dispatch_batch(payloads=[]) == []
+    handler.assert_not_called()
@@ -0,0 +1,157 @@
+import json
+import os
+from pathlib import Path
+
+from ambient_toolbox.autodiscover.manifest import (
+    MANIFEST_VERSION,
+    build_manifest,
+    get_file_fingerprint,
+    get_registry_from_manifest,
+    is_file_unchanged,
+    load_manifest,
+    write_manifest,
+)
+
+REGISTRY = {"my_group": ["my_app.my_group:my_function"]}
+
+
+def create_source_file(tmp_path: Path, content: str = "x = 1\n") -> Path:
+    file_path = tmp_path / "my_group.py"
+    file_path.write_text(content)
+    return file_path
+
+
+def test_get_file_fingerprint_regular(tmp_path):
+    file_path = create_source_file(tmp_path)
+
+    fingerprint = get_file_fingerprint(file_path=file_path)
+
+    assert fingerprint["size"] == len("x = 1\n")
+    assert fingerprint["mtime"] == os.stat(file_path).st_mtime_ns
+    assert len(fingerprint["checksum"]) == 32  # noqa: PLR2004
+
+
+def test_is_file_unchanged_same_file(tmp_path):
+    file_path = create_source_file(tmp_path)
+    fingerprint = get_file_fingerprint(file_path=file_path)
+
+    assert is_file_unchanged(file_path=file_path, fingerprint=fingerprint) is True
+
+
+def test_is_file_unchanged_only_mtime_changed(tmp_path):
+    file_path = create_source_file(tmp_path)
+    fingerprint = get_file_fingerprint(file_path=file_path)
+    os.utime(file_path, ns=(0, 0))
+
+    assert is_file_unchanged(file_path=file_path, fingerprint=fingerprint) is True
+
+
+def test_is_file_unchanged_content_changed(tmp_path):
+    file_path = create_source_file(tmp_path)
+    fingerprint = get_file_fingerprint(file_path=file_path)
+    file_path.write_text("x = 2\n")
+    os.utime(file_path, ns=(0, 0))
+
+    assert is_file_unchanged(file_path=file_path, fingerprint=fingerprint) is False
+
+
+def test_is_file_unchanged_size_changed(tmp_path):
+    file_path = create_source_file(tmp_path)
+    fingerprint = get_file_fingerprint(file_path=file_path)
+    file_path.write_text("x = 12\n")
+
+    assert is_file_unchanged(file_path=file_path, fingerprint=fingerprint) is False
+
+
+def test_is_file_unchanged_file_removed(tmp_path):
+    file_path = create_source_file(tmp_path)
+    fingerprint = get_file_fingerprint(file_path=file_path)
+    file_path.unlink()
+
+    assert is_file_unchanged(file_path=file_path, fingerprint=fingerprint) is False
+
+
+def test_build_manifest_regular(tmp_path):
+    file_path = create_source_file(tmp_path)
+
+    manifest = build_manifest(
+        namespaces=["my_group", "my_group"], module_files={"my_app.my_group": file_path}, registry=REGISTRY
+    )
+
+    assert manifest["version"] == MANIFEST_VERSION
+    assert manifest["namespaces"] == ["my_group"]
+    assert list(manifest["modules"].keys()) == ["my_app.my_group"]
+    assert manifest["registry"] == REGISTRY
+
+
+def test_write_and_load_manifest_regular(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest = build_manifest(
+        namespaces=["my_group"], module_files={"my_app.my_group": create_source_file(tmp_path)}, registry=REGISTRY
+    )
+
+    write_manifest(path=manifest_path, manifest=manifest)
+
+    assert load_manifest(path=manifest_path) == manifest
+    assert not (tmp_path / "manifest.json.tmp").exists()
+
+
+def test_load_manifest_file_missing(tmp_path):
+    assert load_manifest(path=tmp_path / "manifest.json") is None
+
+
+def test_load_manifest_invalid_json(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{invalid")
+
+    assert load_manifest(path=manifest_path) is None
+
+
+def test_load_manifest_outdated_version(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({"version": MANIFEST_VERSION - 1}))
+
+    assert load_manifest(path=manifest_path) is None
+
+
+def test_get_registry_from_manifest_up_to_date(tmp_path):
+    module_files = {"my_app.my_group": create_source_file(tmp_path)}
+    manifest = build_manifest(namespaces=["my_group"], module_files=module_files, registry=REGISTRY)
+
+    registry = get_registry_from_manifest(manifest=manifest, namespaces=["my_group"], module_files=module_files)
+
+    assert registry == REGISTRY
+
+
+def test_get_registry_from_manifest_namespace_missing(tmp_path):
+    module_files = {"my_app.my_group": create_source_file(tmp_path)}
+    manifest = build_manifest(namespaces=["my_group"], module_files=module_files, registry=REGISTRY)
+
+    registry = get_registry_from_manifest(
+        manifest=manifest, namespaces=["my_group", "other_group"], module_files=module_files
+    )
+
+    assert registry is None
+
+
+def test_get_registry_from_manifest_new_module(tmp_path):
+    module_files = {"my_app.my_group": create_source_file(tmp_path)}
+    manifest = build_manifest(namespaces=["my_group"], module_files=module_files, registry=REGISTRY)
+    new_file = tmp_path / "new.py"
+    new_file.write_text("y = 1\n")
+
+    registry = get_registry_from_manifest(
+        manifest=manifest, namespaces=["my_group"], module_files={**module_files, "my_app.new": new_file}
+    )
+
+    assert registry is None
+
+
+def test_get_registry_from_manifest_changed_module(tmp_path):
+    module_files = {"my_app.my_group": create_source_file(tmp_path)}
+    manifest = build_manifest(namespaces=["my_group"], module_files=module_files, registry=REGISTRY)
+    module_files["my_app.my_group"].write_text("x = 22\n")
+
+    registry = get_registry_from_manifest(manifest=manifest, namespaces=["my_group"], module_files=module_files)
+
+    assert registry is None
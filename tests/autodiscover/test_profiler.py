@@ -0,0 +1,62 @@
+from unittest import mock
+
+import pytest
+
+from ambient_toolbox.autodiscover.profiler import AutodiscoverProfiler, ModuleImportProfile
+
+
+def test_autodiscover_profiler_init_regular():
+    profiler = AutodiscoverProfiler()
+
+    assert profiler.phases == {}
+    assert profiler.modules == []
+
+
+@mock.patch("ambient_toolbox.autodiscover.profiler.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 2.25])
+def test_autodiscover_profiler_measure_sums_up_phase(*args):
+    profiler = AutodiscoverProfiler()
+
+    with profiler.measure(AutodiscoverProfiler.PHASE_IMPORTS):
+        pass
+    with profiler.measure(AutodiscoverProfiler.PHASE_IMPORTS):
+        pass
+
+    assert profiler.phases == {AutodiscoverProfiler.PHASE_IMPORTS: 0.75}
+
+
+def test_autodiscover_profiler_measure_records_on_exception():
+    profiler = AutodiscoverProfiler()
+
+    with pytest.raises(RuntimeError):
+        with profiler.measure(AutodiscoverProfiler.PHASE_IMPORTS):
+            raise RuntimeError
+
+    assert AutodiscoverProfiler.PHASE_IMPORTS in profiler.phases
+
+
+def test_autodiscover_profiler_get_sorted_modules_slowest_first():
+    profiler = AutodiscoverProfiler()
+    profiler.add_module(module="fast", duration=0.1, callables=1, imported=True)
+    profiler.add_module(module="slow", duration=0.5, callables=2, imported=False)
+
+    assert [module_profile.module for module_profile in profiler.get_sorted_modules()] == ["slow", "fast"]
+
+
+def test_autodiscover_profiler_as_dict_regular():
+    profiler = AutodiscoverProfiler()
+    profiler.phases = {"imports": 0.5, "cache_write": 0.25}
+    profiler.add_module(module="my.module", duration=0.5, callables=2, imported=True)
+
+    assert profiler.as_dict() == {
+        "total": 0.75,
+        "phases": {"imports": 0.5, "cache_write": 0.25},
+        "modules": [{"module": "my.module", "duration": 0.5, "callables": 2, "imported": True}],
+    }
+
+
+def test_module_import_profile_init_regular():
+    module_profile = ModuleImportProfile(module="my.module", duration=0.1, callables=3, imported=False)
+
+    assert module_profile.module == "my.module"
+    assert module_profile.callables == 3  # noqa: PLR2004
+    assert module_profile.imported is False
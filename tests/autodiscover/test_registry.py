@@ -1,14 +1,17 @@
+import asyncio
 import importlib
 import json
 from pathlib import Path
 from unittest import mock
 
+import pytest
 from django.core.cache import cache
 from django.test import override_settings
 
 from ambient_toolbox.apps import AmbientToolboxConfig
 from ambient_toolbox.autodiscover import decorator_based_registry
-from ambient_toolbox.autodiscover.registry import DecoratorBasedRegistry
+from ambient_toolbox.autodiscover.profiler import AutodiscoverProfiler
+from ambient_toolbox.autodiscover.registry import CallableDefinition, DecoratorBasedRegistry
 from ambient_toolbox.autodiscover.settings import get_autodiscover_cache_key
 
 
@@ -71,6 +74,52 @@ def test_app_enable_flag_disabled():
     mocked_autodiscover.assert_not_called()
 
 
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_ENABLED=True)
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_LAZY=True)
+def test_app_lazy_flag_enabled():
+    app_config = AmbientToolboxConfig(app_name="ambient_toolbox", app_module=importlib.import_module("ambient_toolbox"))
+
+    with mock.patch.object(DecoratorBasedRegistry, "autodiscover") as mocked_autodiscover:
+        app_config.ready()
+
+    mocked_autodiscover.assert_not_called()
+
+
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_ENABLED=True)
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_LAZY=True)
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_app_lazy_flag_autodiscovers_on_first_access():
+    cache.clear()
+
+    app_config = AmbientToolboxConfig(app_name="ambient_toolbox", app_module=importlib.import_module("ambient_toolbox"))
+    app_config.ready()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    callables = decorator_based_registry.get_registered_callables(registry_group="testapp")
+
+    assert len(callables) == 1
+    assert callables[0]() == "testapp"
+
+
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+@mock.patch("ambient_toolbox.autodiscover.registry.connections.close_all")
+@mock.patch("ambient_toolbox.autodiscover.registry.caches.close_all")
+def test_decorator_based_registry_preload_regular(mocked_close_caches, mocked_close_connections):
+    cache.clear()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    with mock.patch.object(
+        DecoratorBasedRegistry, "autodiscover", wraps=decorator_based_registry.autodiscover
+    ) as mocked_autodiscover:
+        decorator_based_registry.preload()
+
+    mocked_autodiscover.assert_any_call(namespaces=["autodiscover"])
+    assert "testapp" in decorator_based_registry._resolved_callables
+    assert "other" in decorator_based_registry._resolved_callables
+    mocked_close_caches.assert_called_once_with()
+    mocked_close_connections.assert_called_once_with()
+
+
 def test_decorator_based_registry_init_regular():
     decorator_based_registry = DecoratorBasedRegistry()
 
@@ -92,7 +141,9 @@ def test_decorator_based_registry_register_regular():
     decorator(dummy_function)
 
     assert len(decorator_based_registry.registry) == 1
-    assert "dummy_function" in str(decorator_based_registry.registry["test"][0])
+    assert list(decorator_based_registry.registry["test"].values()) == [
+        CallableDefinition(module=__name__, name="dummy_function")
+    ]
 
 
 def test_decorator_based_registry_register_second_function():
@@ -102,8 +153,10 @@ def test_decorator_based_registry_register_second_function():
     decorator(dummy_function_2)
 
     assert len(decorator_based_registry.registry) == 1
-    assert "dummy_function" in str(decorator_based_registry.registry["test"][0])
-    assert "dummy_function_2" in str(decorator_based_registry.registry["test"][1])
+    assert list(decorator_based_registry.registry["test"].values()) == [
+        CallableDefinition(module=__name__, name="dummy_function"),
+        CallableDefinition(module=__name__, name="dummy_function_2"),
+    ]
 
 
 def test_decorator_based_registry_register_two_groups():
@@ -114,8 +167,8 @@ def test_decorator_based_registry_register_two_groups():
     decorator(dummy_function_2)
 
     assert len(decorator_based_registry.registry) == 2  # noqa: PLR2004
-    assert "dummy_function" in str(decorator_based_registry.registry["one"][0])
-    assert "dummy_function_2" in str(decorator_based_registry.registry["two"][0])
+    assert (__name__, "dummy_function") in decorator_based_registry.registry["one"]
+    assert (__name__, "dummy_function_2") in decorator_based_registry.registry["two"]
 
 
 def test_decorator_based_registry_autodiscover_target_is_python_module():
@@ -131,21 +184,19 @@ def test_decorator_based_registry_autodiscover_target_is_python_module():
 
     # Assert one function registered for "testapp"
     assert len(decorator_based_registry.registry["testapp"]) == 1
-    assert {
-        "module": "testapp.autodiscover.registered_functions",
-        "name": "registered_dummy_function_testapp",
-    } == decorator_based_registry.registry["testapp"][0]
+    assert [
+        CallableDefinition(
+            module="testapp.autodiscover.registered_functions",
+            name="registered_dummy_function_testapp",
+        )
+    ] == list(decorator_based_registry.registry["testapp"].values())
 
     # Assert one function registered for "other"
     assert len(decorator_based_registry.registry["other"]) == 2  # noqa: PLR2004
-    assert {
-        "module": "testapp.autodiscover.registered_functions",
-        "name": "registered_dummy_function_other",
-    } == decorator_based_registry.registry["other"][0]
-    assert {
-        "module": "testapp.autodiscover.registered_functions",
-        "name": "DummyClass",
-    } == decorator_based_registry.registry["other"][1]
+    assert [
+        CallableDefinition(module="testapp.autodiscover.registered_functions", name="registered_dummy_function_other"),
+        CallableDefinition(module="testapp.autodiscover.registered_functions", name="DummyClass"),
+    ] == list(decorator_based_registry.registry["other"].values())
 
 
 def test_decorator_based_registry_autodiscover_target_is_python_file():
@@ -160,10 +211,12 @@ def test_decorator_based_registry_autodiscover_target_is_python_file():
 
     # Assert one function registered for "testapp"
     assert len(decorator_based_registry.registry["no_module"]) == 1
-    assert {
-        "module": "testapp.more_registered_functions",
-        "name": "even_more_registered_function",
-    } == decorator_based_registry.registry["no_module"][0]
+    assert [
+        CallableDefinition(
+            module="testapp.more_registered_functions",
+            name="even_more_registered_function",
+        )
+    ] == list(decorator_based_registry.registry["no_module"].values())
 
 
 def test_decorator_based_registry_autodiscover_registry_group_contains_subpackages():
@@ -178,10 +231,12 @@ def test_decorator_based_registry_autodiscover_registry_group_contains_subpackag
 
     # Assert one function registered for "testapp"
     assert len(decorator_based_registry.registry["commands"]) == 1
-    assert {
-        "module": "testapp.handlers.commands.test_commands",
-        "name": "my_command_handler",
-    } == decorator_based_registry.registry["commands"][0]
+    assert [
+        CallableDefinition(
+            module="testapp.handlers.commands.test_commands",
+            name="my_command_handler",
+        )
+    ] == list(decorator_based_registry.registry["commands"].values())
 
 
 @mock.patch("ambient_toolbox.autodiscover.registry.get_autodiscover_app_base_path", return_value=Path("/some/path"))
@@ -201,7 +256,7 @@ def test_decorator_based_registry_autodiscover_caching_avoid_importing_again(
 ):
     cache.set(
         get_autodiscover_cache_key(),
-        json.dumps({"testapp": ["dummy_function_testapp"], "other": ["dummy_function_other"]}),
+        json.dumps({"testapp": ["my.module:dummy_function_testapp"], "other": ["my.module:dummy_function_other"]}),
     )
 
     decorator_based_registry = DecoratorBasedRegistry()
@@ -214,7 +269,7 @@ def test_decorator_based_registry_autodiscover_caching_avoid_importing_again(
 def test_decorator_based_registry_autodiscover_load_handlers_from_cache_regular(*args):
     cache.set(
         get_autodiscover_cache_key(),
-        json.dumps({"testapp": ["dummy_function_testapp"], "other": ["dummy_function_other"]}),
+        json.dumps({"testapp": ["my.module:dummy_function_testapp"], "other": ["my.module:dummy_function_other"]}),
     )
 
     decorator_based_registry = DecoratorBasedRegistry()
@@ -232,11 +287,510 @@ def test_decorator_based_registry_autodiscover_load_handlers_from_cache_dummy_ca
 
 
 @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
 def test_get_registered_callables_found_and_executable():
     decorator_based_registry = DecoratorBasedRegistry()
-    callables = decorator_based_registry.get_registered_callables(registry_group="autodiscover")
+    callables = decorator_based_registry.get_registered_callables(registry_group="other")
+
+    assert len(callables) == 2  # noqa: PLR2004
+    assert callables[0]() == "other"
+    assert str(callables[1]()) == "DummyClass"
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_get_registered_callables_only_requested_group_returned():
+    decorator_based_registry = DecoratorBasedRegistry()
+    callables = decorator_based_registry.get_registered_callables(registry_group="testapp")
 
-    assert len(callables) == 3  # noqa: PLR2004
+    assert len(callables) == 1
     assert callables[0]() == "testapp"
-    assert callables[1]() == "other"
-    assert str(callables[2]()) == "DummyClass"
+
+
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover", "my_group"])
+def test_get_registered_callables_registry_group_used_as_namespace():
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    with mock.patch.object(DecoratorBasedRegistry, "autodiscover") as mocked_autodiscover:
+        decorator_based_registry.get_registered_callables(registry_group="my_group")
+        decorator_based_registry.get_registered_callables(registry_group="other_group")
+
+    assert mocked_autodiscover.call_args_list == [
+        mock.call(namespaces=["autodiscover", "my_group"]),
+        mock.call(namespaces=["autodiscover", "my_group", "other_group"]),
+    ]
+
+
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_get_registered_callables_unknown_group():
+    cache.clear()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    assert decorator_based_registry.get_registered_callables(registry_group="unknown") == []
+
+
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_get_registered_callables_resolved_once_per_group():
+    cache.clear()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.get_registered_callables(registry_group="other")
+
+    with mock.patch.object(DecoratorBasedRegistry, "autodiscover") as mocked_autodiscover:
+        with mock.patch("importlib.import_module") as mocked_import_module:
+            callables = decorator_based_registry.get_registered_callables(registry_group="other")
+
+    mocked_autodiscover.assert_not_called()
+    mocked_import_module.assert_not_called()
+    assert len(callables) == 2  # noqa: PLR2004
+
+
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_get_registered_callables_returns_copy():
+    cache.clear()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.get_registered_callables(registry_group="other").clear()
+
+    assert len(decorator_based_registry.get_registered_callables(registry_group="other")) == 2  # noqa: PLR2004
+
+
+def test_get_registered_callables_lookup_cost_independent_of_registry_size():
+    decorator_based_registry = DecoratorBasedRegistry()
+    for group_index in range(100):
+        decorator = decorator_based_registry.register(registry_group=f"group_{group_index}")
+        for handler_index in range(10):
+            handler = mock.Mock(__module__=__name__, __name__=f"handler_{group_index}_{handler_index}")
+            decorator(handler)
+
+    with mock.patch.object(DecoratorBasedRegistry, "autodiscover"):
+        with mock.patch("importlib.import_module") as mocked_import_module:
+            for _ in range(10):
+                for group_index in range(100):
+                    callables = decorator_based_registry.get_registered_callables(registry_group=f"group_{group_index}")
+                    assert len(callables) == 10  # noqa: PLR2004
+
+    # Every handler is only resolved once, no matter how many groups exist or how often they are requested
+    assert mocked_import_module.call_count == 1_000  # noqa: PLR2004
+
+
+def test_decorator_based_registry_register_invalidates_group():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._resolved_callables = {"test": [dummy_function], "other": [dummy_function]}
+
+    decorator_based_registry.register(registry_group="test")(dummy_function_2)
+
+    assert "test" not in decorator_based_registry._resolved_callables
+    assert "other" in decorator_based_registry._resolved_callables
+
+
+def test_decorator_based_registry_invalidate_single_group():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._resolved_callables = {"test": [dummy_function], "other": [dummy_function]}
+
+    decorator_based_registry.invalidate(registry_group="test")
+
+    assert decorator_based_registry._resolved_callables == {"other": [dummy_function]}
+
+
+def test_decorator_based_registry_invalidate_all_groups():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._resolved_callables = {"test": [dummy_function], "other": [dummy_function]}
+
+    decorator_based_registry.invalidate()
+
+    assert decorator_based_registry._resolved_callables == {}
+
+
+def test_decorator_based_registry_autodiscover_changed_registry_invalidates():
+    cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": ["my.module:my_function"]}))
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._resolved_callables = {"test": [dummy_function]}
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    assert decorator_based_registry._resolved_callables == {}
+
+
+def test_decorator_based_registry_autodiscover_unchanged_registry_keeps_resolved_callables():
+    cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": ["my.module:my_function"]}))
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.registry = {
+        "testapp": {("my.module", "my_function"): CallableDefinition(module="my.module", name="my_function")}
+    }
+    decorator_based_registry._resolved_callables = {"testapp": [dummy_function]}
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    assert decorator_based_registry._resolved_callables == {"testapp": [dummy_function]}
+
+
+def test_decorator_based_registry_scan_modules_regular():
+    decorator_based_registry = DecoratorBasedRegistry()
+    module_files = decorator_based_registry._scan_modules(namespaces=["autodiscover", "more_registered_functions"])
+
+    assert "testapp.autodiscover.registered_functions" in module_files
+    assert "testapp.more_registered_functions" in module_files
+    assert module_files["testapp.more_registered_functions"].name == "more_registered_functions.py"
+
+
+def test_decorator_based_registry_create_manifest_regular(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    manifest = decorator_based_registry.create_manifest(namespaces=["autodiscover"], path=manifest_path)
+
+    assert manifest_path.exists()
+    assert manifest["namespaces"] == ["autodiscover"]
+    assert "testapp.autodiscover.registered_functions" in manifest["modules"]
+    assert manifest["registry"] == decorator_based_registry._pack_registry(registry=decorator_based_registry.registry)
+    assert manifest["registry"]["other"] == [
+        "testapp.autodiscover.registered_functions:registered_dummy_function_other",
+        "testapp.autodiscover.registered_functions:DummyClass",
+    ]
+
+
+def test_decorator_based_registry_autodiscover_uses_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    decorator_based_registry = DecoratorBasedRegistry()
+    manifest = decorator_based_registry.create_manifest(namespaces=["autodiscover"], path=manifest_path)
+    cache.clear()
+
+    with override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH=manifest_path):
+        with mock.patch.object(DecoratorBasedRegistry, "_force_import") as mocked_force_import:
+            decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    mocked_force_import.assert_not_called()
+    assert decorator_based_registry._pack_registry(registry=decorator_based_registry.registry) == manifest["registry"]
+
+
+def test_decorator_based_registry_autodiscover_outdated_manifest_is_ignored(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.create_manifest(namespaces=["autodiscover"], path=manifest_path)
+    cache.clear()
+
+    with override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH=manifest_path):
+        with mock.patch("ambient_toolbox.autodiscover.registry.get_registry_from_manifest", return_value=None):
+            with mock.patch.object(DecoratorBasedRegistry, "_force_import") as mocked_force_import:
+                decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    mocked_force_import.assert_called()
+
+
+def test_decorator_based_registry_load_handlers_from_manifest_no_path_set():
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    assert decorator_based_registry._load_handlers_from_manifest(namespaces=["autodiscover"]) is None
+
+
+def test_decorator_based_registry_load_handlers_from_manifest_file_missing(tmp_path):
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    with override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH=tmp_path / "manifest.json"):
+        assert decorator_based_registry._load_handlers_from_manifest(namespaces=["autodiscover"]) is None
+
+
+def test_decorator_based_registry_register_records_module_registration():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator = decorator_based_registry.register(registry_group="test")
+    decorator(dummy_function)
+    decorator(dummy_function)
+
+    assert decorator_based_registry._module_registrations[__name__][("test", "dummy_function")] == CallableDefinition(
+        module=__name__, name="dummy_function"
+    )
+
+
+def test_decorator_based_registry_module_registrations_survive_reinitialisation():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.register(registry_group="test")(dummy_function)
+
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    assert decorator_based_registry.registry == {}
+    assert ("test", "dummy_function") in decorator_based_registry._module_registrations[__name__]
+
+
+@mock.patch("importlib.reload")
+def test_decorator_based_registry_autodiscover_replays_imported_modules(mocked_reload_module):
+    cache.clear()
+    importlib.import_module("testapp.autodiscover.registered_functions")
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    with mock.patch("importlib.import_module") as mocked_import_module:
+        decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    mocked_reload_module.assert_not_called()
+    assert mock.call("testapp.autodiscover.registered_functions") not in mocked_import_module.call_args_list
+    assert len(decorator_based_registry.registry["testapp"]) == 1
+    assert len(decorator_based_registry.registry["other"]) == 2  # noqa: PLR2004
+
+
+@mock.patch("importlib.import_module")
+def test_decorator_based_registry_force_import_new_module(mocked_import_module):
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._force_import(module_path="testapp.not_imported_yet")
+
+    mocked_import_module.assert_called_once_with("testapp.not_imported_yet")
+
+
+def test_decorator_based_registry_force_import_module_without_registrations():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._force_import(module_path="testapp.models")
+
+    assert decorator_based_registry.registry == {}
+
+
+def test_decorator_based_registry_scan_modules_package_init():
+    decorator_based_registry = DecoratorBasedRegistry()
+    module_files = decorator_based_registry._scan_modules(namespaces=["autodiscover"])
+
+    assert "testapp.autodiscover" in module_files
+    assert "testapp.autodiscover.__init__" not in module_files
+
+
+def test_decorator_based_registry_autodiscover_with_profiler():
+    cache.clear()
+    profiler = AutodiscoverProfiler()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"], profiler=profiler)
+
+    assert set(profiler.phases.keys()) == {
+        AutodiscoverProfiler.PHASE_CACHE_LOOKUP,
+        AutodiscoverProfiler.PHASE_MANIFEST_LOOKUP,
+        AutodiscoverProfiler.PHASE_DIRECTORY_SCAN,
+        AutodiscoverProfiler.PHASE_IMPORTS,
+        AutodiscoverProfiler.PHASE_CACHE_WRITE,
+    }
+    module_profiles = {module_profile.module: module_profile for module_profile in profiler.modules}
+    assert module_profiles["testapp.autodiscover.registered_functions"].callables == 3  # noqa: PLR2004
+    assert decorator_based_registry._profiler is None
+
+
+def test_decorator_based_registry_autodiscover_with_profiler_cache_hit():
+    cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": ["my.module:my_function"]}))
+    profiler = AutodiscoverProfiler()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"], profiler=profiler)
+
+    assert list(profiler.phases.keys()) == [AutodiscoverProfiler.PHASE_CACHE_LOOKUP]
+    assert profiler.modules == []
+
+
+@mock.patch.object(DecoratorBasedRegistry, "_force_import")
+def test_decorator_based_registry_import_modules_profiles_new_module(*args):
+    profiler = AutodiscoverProfiler()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._profiler = profiler
+    decorator_based_registry._import_modules(module_paths=["testapp.not_imported_yet"])
+    decorator_based_registry._profiler = None
+
+    assert profiler.modules[0].module == "testapp.not_imported_yet"
+    assert profiler.modules[0].imported is True
+    assert profiler.modules[0].callables == 0
+
+
+def test_callable_definition_key():
+    assert CallableDefinition(module="my.module", name="my_function").key == ("my.module", "my_function")
+
+
+def test_callable_definition_to_path():
+    assert CallableDefinition(module="my.module", name="my_function").to_path() == "my.module:my_function"
+
+
+def test_callable_definition_from_path():
+    assert CallableDefinition.from_path("my.module:my_function") == CallableDefinition(
+        module="my.module", name="my_function"
+    )
+
+
+def test_callable_definition_uses_slots():
+    callable_definition = CallableDefinition(module="my.module", name="my_function")
+
+    assert not hasattr(callable_definition, "__dict__")
+
+
+def test_decorator_based_registry_pack_and_unpack_registry():
+    registry = {
+        "one": {
+            ("my.module", "a"): CallableDefinition(module="my.module", name="a"),
+            ("my.module", "b"): CallableDefinition(module="my.module", name="b"),
+        },
+        "two": {("other.module", "c"): CallableDefinition(module="other.module", name="c")},
+    }
+
+    packed_registry = DecoratorBasedRegistry._pack_registry(registry=registry)
+
+    assert packed_registry == {"one": ["my.module:a", "my.module:b"], "two": ["other.module:c"]}
+    assert DecoratorBasedRegistry._unpack_registry(data=packed_registry) == registry
+
+
+def test_decorator_based_registry_unpack_registry_invalid_data():
+    with pytest.raises(ValueError, match="Invalid registry data"):
+        DecoratorBasedRegistry._unpack_registry(data={"testapp": [{"module": "my.module", "name": "my_function"}]})
+
+
+def test_decorator_based_registry_load_handlers_from_cache_outdated_format():
+    cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": [{"module": "my.module", "name": "my_function"}]}))
+
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    assert decorator_based_registry._load_handlers_from_cache() == {}
+
+
+def test_decorator_based_registry_register_many_callables():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator = decorator_based_registry.register(registry_group="test")
+    handlers = [mock.Mock(__module__=__name__, __name__=f"handler_{index}") for index in range(10_000)]
+
+    # Registering is O(1) per callable, so registering twice doesn't create duplicates or take quadratic time
+    for handler in [*handlers, *handlers]:
+        decorator(handler)
+
+    assert len(decorator_based_registry.registry["test"]) == 10_000  # noqa: PLR2004
+    assert next(iter(decorator_based_registry.registry["test"].values())).name == "handler_0"
+
+
+def test_decorator_based_registry_autodiscover_writes_version_stamp():
+    cache.clear()
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    version = cache.get(f"{get_autodiscover_cache_key()}_version")
+    assert version is not None
+    assert version == decorator_based_registry._cache_version
+
+
+def test_decorator_based_registry_load_handlers_from_cache_same_version_uses_process_copy():
+    cache.clear()
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+    registry = decorator_based_registry.registry
+
+    with mock.patch("ambient_toolbox.autodiscover.registry.json.loads") as mocked_loads:
+        with mock.patch.object(cache, "get", wraps=cache.get) as mocked_get:
+            loaded_registry = decorator_based_registry._load_handlers_from_cache()
+
+    assert loaded_registry is registry
+    mocked_get.assert_called_once_with(f"{get_autodiscover_cache_key()}_version")
+    mocked_loads.assert_not_called()
+
+
+def test_decorator_based_registry_load_handlers_from_cache_changed_version_fetches_registry():
+    cache.clear()
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    cache.set_many(
+        {
+            get_autodiscover_cache_key(): json.dumps({"testapp": ["my.module:my_function"]}),
+            f"{get_autodiscover_cache_key()}_version": "new-version",
+        }
+    )
+    registry = decorator_based_registry._load_handlers_from_cache()
+
+    assert list(registry.keys()) == ["testapp"]
+    assert decorator_based_registry._cache_version == "new-version"
+
+
+def test_decorator_based_registry_load_handlers_from_cache_version_missing_fetches_registry():
+    cache.clear()
+    cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": ["my.module:my_function"]}))
+
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._cache_version = None
+    registry = decorator_based_registry._load_handlers_from_cache()
+
+    assert list(registry.keys()) == ["testapp"]
+
+
+def test_decorator_based_registry_init_resets_cache_version():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry._cache_version = "some-version"
+
+    decorator_based_registry = DecoratorBasedRegistry()
+
+    assert decorator_based_registry._cache_version is None
+
+
+def test_decorator_based_registry_clear_cache():
+    decorator_based_registry = DecoratorBasedRegistry()
+    decorator_based_registry.autodiscover(namespaces=["autodiscover"])
+
+    decorator_based_registry.clear_cache()
+
+    assert cache.get(get_autodiscover_cache_key()) is None
+    assert cache.get(f"{get_autodiscover_cache_key()}_version") is None
+    assert decorator_based_registry._cache_version is None
+
+
+@mock.patch.object(DecoratorBasedRegistry, "get_registered_callables", return_value=[dummy_function])
+def test_decorator_based_registry_dispatch_regular(mocked_get_registered_callables):
+    decorator_based_registry = DecoratorBasedRegistry()
+    results = decorator_based_registry.dispatch(registry_group="testapp", payload="my-payload")
+
+    mocked_get_registered_callables.assert_called_once_with(registry_group="testapp")
+    assert [(result.handler, result.payload) for result in results] == [(dummy_function, "my-payload")]
+
+
+@mock.patch.object(DecoratorBasedRegistry, "get_registered_callables", return_value=[dummy_function])
+def test_decorator_based_registry_dispatch_passes_options(*args):
+    decorator_based_registry = DecoratorBasedRegistry()
+    with mock.patch("ambient_toolbox.autodiscover.registry.HandlerDispatcher") as mocked_dispatcher:
+        decorator_based_registry.dispatch(registry_group="testapp", payload=1, mode="threads", timeout=2, max_workers=3)
+
+    mocked_dispatcher.assert_called_once_with(handlers=[dummy_function], mode="threads", timeout=2, max_workers=3)
+    mocked_dispatcher.return_value.dispatch.assert_called_once_with(payloads=[1])
+
+
+@mock.patch.object(DecoratorBasedRegistry, "get_registered_callables", return_value=[dummy_function])
+def test_decorator_based_registry_dispatch_batch_regular(*args):
+    decorator_based_registry = DecoratorBasedRegistry()
+    results = decorator_based_registry.dispatch_batch(registry_group="testapp", payloads=[1, 2, 3], batch_size=2)
+
+    assert [result.payload for result in results] == [[1, 2], [3]]
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_decorator_based_registry_dispatch_collects_errors():
+    decorator_based_registry = DecoratorBasedRegistry()
+    results = decorator_based_registry.dispatch(registry_group="testapp", payload="my-payload")
+
+    # The registered test function doesn't take any arguments
+    assert isinstance(results[0].error, TypeError)
+
+
+@mock.patch.object(DecoratorBasedRegistry, "get_registered_callables", return_value=[dummy_function])
+def test_decorator_based_registry_adispatch_regular(*args):
+    decorator_based_registry = DecoratorBasedRegistry()
+    results = asyncio.run(decorator_based_registry.adispatch(registry_group="testapp", payload="my-payload"))
+
+    assert [(result.handler, result.payload) for result in results] == [(dummy_function, "my-payload")]
+
+
+@mock.patch.object(DecoratorBasedRegistry, "get_registered_callables", return_value=[dummy_function])
+def test_decorator_based_registry_dispatch_measured(*args):
+    decorator_based_registry = DecoratorBasedRegistry()
+    with mock.patch("ambient_toolbox.autodiscover.registry.measure") as mocked_measure:
+        decorator_based_registry.dispatch(registry_group="testapp", payload=1)
+        decorator_based_registry.dispatch_batch(registry_group="testapp", payloads=[1])
+
+    assert mocked_measure.call_args_list == [mock.call("dispatch"), mock.call("dispatch")]
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+@override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover"])
+def test_get_registered_callables_measured():
+    decorator_based_registry = DecoratorBasedRegistry()
+    with mock.patch("ambient_toolbox.autodiscover.registry.measure") as mocked_measure:
+        decorator_based_registry.get_registered_callables(registry_group="testapp")
+        decorator_based_registry.get_registered_callables(registry_group="testapp")
+
+    mocked_measure.assert_called_once_with("autodiscover")
@@ -5,7 +5,9 @@ from ambient_toolbox.autodiscover.settings import (
     get_autodiscover_app_base_path,
     get_autodiscover_cache_key,
     get_autodiscover_enabled,
+    get_autodiscover_lazy,
     get_autodiscover_logger_name,
+    get_autodiscover_manifest_path,
 )
 
 
@@ -18,6 +20,15 @@ def test_get_autodiscover_enabled_default_used():
     assert get_autodiscover_enabled() is False
 
 
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_LAZY=True)
+def test_get_autodiscover_lazy_is_set():
+    assert get_autodiscover_lazy() is True
+
+
+def test_get_autodiscover_lazy_default_used():
+    assert get_autodiscover_lazy() is False
+
+
 @override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_APP_BASE_PATH="/path/to/autodiscover")
 def test_get_autodiscover_app_base_path_is_set():
     assert get_autodiscover_app_base_path() == "/path/to/autodiscover"
@@ -43,3 +54,12 @@ def test_get_autodiscover_logger_name_is_set():
 
 def test_get_autodiscover_logger_name_default_used():
     assert get_autodiscover_logger_name() == "toolbox_autodiscover"
+
+
+@override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH="/path/to/manifest.json")
+def test_get_autodiscover_manifest_path_is_set():
+    assert get_autodiscover_manifest_path() == "/path/to/manifest.json"
+
+
+def test_get_autodiscover_manifest_path_default_used():
+    assert get_autodiscover_manifest_path() is None
@@ -0,0 +1,132 @@
+import datetime
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from testapp.models import CommonInfoBasedArchiveModel, CommonInfoBasedModel, CreatedAtInfoBasedModel
+
+
+class ArchiveObjectsCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        with freeze_time("2024-01-01"):
+            cls.old_obj = CommonInfoBasedModel.objects.create(created_at=timezone.now() - datetime.timedelta(minutes=1))
+            cls.new_obj = CommonInfoBasedModel.objects.create(created_at=timezone.now())
+
+    def test_command_archive_model_before_date(self):
+        stdout = StringIO()
+        call_command(
+            "archive_objects",
+            "testapp.CommonInfoBasedModel",
+            "--before",
+            "2024-01-01",
+            "--archive-model",
+            "testapp.CommonInfoBasedArchiveModel",
+            "--exclude-field",
+            "created_by_id",
+            "--exclude-field",
+            "lastmodified_by_id",
+            stdout=stdout,
+        )
+
+        self.assertIn("Archived 1 objects of testapp.CommonInfoBasedModel", stdout.getvalue())
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+        self.assertTrue(CommonInfoBasedArchiveModel.objects.filter(pk=self.old_obj.pk).exists())
+
+    @freeze_time("2024-01-10 23:59:30")
+    def test_command_file_days(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "archive.jsonl.gz"
+            call_command(
+                "archive_objects",
+                "testapp.CommonInfoBasedModel",
+                "--days",
+                "10",
+                "--file",
+                str(path),
+                "--batch-size",
+                "1",
+                stdout=StringIO(),
+            )
+
+            with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+                self.assertEqual(len(archive_file.readlines()), 1)
+
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+
+    def test_command_before_datetime(self):
+        call_command(
+            "archive_objects",
+            "testapp.CommonInfoBasedModel",
+            "--before",
+            "2024-01-01T00:00:01",
+            "--archive-model",
+            "testapp.CommonInfoBasedArchiveModel",
+            "--exclude-field",
+            "created_by_id",
+            "--exclude-field",
+            "lastmodified_by_id",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(CommonInfoBasedModel.objects.count(), 0)
+
+    @override_settings(USE_TZ=False)
+    def test_command_before_date_without_timezone_support(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            call_command(
+                "archive_objects",
+                "testapp.CommonInfoBasedModel",
+                "--before",
+                "2024-01-01",
+                "--file",
+                str(Path(temp_dir) / "archive.jsonl.gz"),
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+
+    def test_command_invalid_date(self):
+        with self.assertRaisesMessage(CommandError, 'Invalid date "yesterday".'):
+            call_command(
+                "archive_objects", "testapp.CommonInfoBasedModel", "--before", "yesterday", "--file", "archive.jsonl.gz"
+            )
+
+    def test_command_unknown_model(self):
+        with self.assertRaisesMessage(CommandError, 'Model "testapp.Unknown" not found.'):
+            call_command("archive_objects", "testapp.Unknown", "--days", "1", "--file", "archive.jsonl.gz")
+
+    def test_command_model_not_created_at_info(self):
+        with self.assertRaisesMessage(CommandError, "has to be derived from CreatedAtInfo"):
+            call_command("archive_objects", "testapp.MySingleSignalModel", "--days", "1", "--file", "archive.jsonl.gz")
+
+    def test_command_model_with_cascading_relations(self):
+        with self.assertRaisesMessage(CommandError, "testapp.CreatedAtInfoBasedChildModel.parent"):
+            call_command(
+                "archive_objects", "testapp.CreatedAtInfoBasedModel", "--days", "1", "--file", "archive.jsonl.gz"
+            )
+
+    def test_command_allow_cascade(self):
+        CreatedAtInfoBasedModel.objects.create(created_at=self.old_obj.created_at)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            call_command(
+                "archive_objects",
+                "testapp.CreatedAtInfoBasedModel",
+                "--before",
+                "2024-01-01",
+                "--file",
+                str(Path(temp_dir) / "archive.jsonl.gz"),
+                "--allow-cascade",
+                stdout=StringIO(),
+            )
+
+        self.assertFalse(CreatedAtInfoBasedModel.objects.exists())
@@ -0,0 +1,82 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from ambient_toolbox.autodiscover.registry import DecoratorBasedRegistry
+from ambient_toolbox.autodiscover.settings import get_autodiscover_cache_key
+
+
+class AutodiscoverProfileCommandTest(SimpleTestCase):
+    def test_command_prints_table(self):
+        stdout = StringIO()
+        call_command("autodiscover_profile", "--namespace", "autodiscover", stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn("testapp.autodiscover.registered_functions", output)
+        self.assertIn("directory_scan", output)
+        self.assertIn("imports", output)
+        self.assertIn("total", output)
+
+    def test_command_writes_json_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "profile.json"
+            call_command(
+                "autodiscover_profile", "--namespace", "autodiscover", "--output", str(output_path), stdout=StringIO()
+            )
+
+            data = json.loads(output_path.read_text())
+
+        self.assertIn("imports", data["phases"])
+        module_data = {module["module"]: module for module in data["modules"]}
+        self.assertEqual(module_data["testapp.autodiscover.registered_functions"]["callables"], 3)
+
+    @override_settings(AMBIENT_TOOLBOX_NAMESPACES=["more_registered_functions"])
+    def test_command_uses_namespace_setting(self):
+        stdout = StringIO()
+        call_command("autodiscover_profile", stdout=stdout)
+
+        self.assertIn("testapp.more_registered_functions", stdout.getvalue())
+
+    @override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_ENABLED=True)
+    def test_command_autodiscovery_on_startup(self):
+        with self.assertRaisesMessage(CommandError, "AMBIENT_TOOLBOX_AUTODISCOVER_LAZY"):
+            call_command("autodiscover_profile", "--namespace", "autodiscover", stdout=StringIO())
+
+    @override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_ENABLED=True, AMBIENT_TOOLBOX_AUTODISCOVER_LAZY=True)
+    def test_command_lazy_autodiscovery(self):
+        stdout = StringIO()
+        call_command("autodiscover_profile", "--namespace", "autodiscover", stdout=stdout)
+
+        self.assertIn("testapp.autodiscover.registered_functions", stdout.getvalue())
+
+    def test_command_does_not_touch_cache(self):
+        cached_data = json.dumps({"testapp": ["my.module:my_function"]})
+        cache.set(get_autodiscover_cache_key(), cached_data)
+        self.addCleanup(cache.clear)
+
+        stdout = StringIO()
+        call_command("autodiscover_profile", "--namespace", "autodiscover", stdout=stdout)
+
+        self.assertIn("testapp.autodiscover.registered_functions", stdout.getvalue())
+        self.assertEqual(cache.get(get_autodiscover_cache_key()), cached_data)
+
+    def test_command_use_cache(self):
+        cache.set(get_autodiscover_cache_key(), json.dumps({"testapp": ["my.module:my_function"]}))
+        self.addCleanup(cache.clear)
+
+        stdout = StringIO()
+        call_command("autodiscover_profile", "--namespace", "autodiscover", "--use-cache", stdout=stdout)
+
+        self.assertNotIn("testapp.autodiscover.registered_functions", stdout.getvalue())
+
+    def test_command_clear_cache(self):
+        with mock.patch.object(DecoratorBasedRegistry, "clear_cache") as mocked_clear_cache:
+            call_command("autodiscover_profile", "--namespace", "autodiscover", "--clear-cache", stdout=StringIO())
+
+        mocked_clear_cache.assert_called_once_with()
@@ -0,0 +1,44 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class CreateAutodiscoverManifestCommandTest(SimpleTestCase):
+    def test_command_with_output_parameter(self):
+        stdout = StringIO()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = Path(temp_dir) / "manifest.json"
+            call_command(
+                "create_autodiscover_manifest",
+                "--output",
+                str(manifest_path),
+                "--namespace",
+                "autodiscover",
+                stdout=stdout,
+            )
+
+            manifest = json.loads(manifest_path.read_text())
+
+        self.assertEqual(manifest["namespaces"], ["autodiscover"])
+        self.assertIn("testapp", manifest["registry"])
+        self.assertIn("created with 3 callables", stdout.getvalue())
+
+    @override_settings(AMBIENT_TOOLBOX_NAMESPACES=["autodiscover", "more_registered_functions"])
+    def test_command_uses_settings(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = Path(temp_dir) / "manifest.json"
+            with override_settings(AMBIENT_TOOLBOX_AUTODISCOVER_MANIFEST_PATH=manifest_path):
+                call_command("create_autodiscover_manifest", stdout=StringIO())
+
+            manifest = json.loads(manifest_path.read_text())
+
+        self.assertEqual(manifest["namespaces"], ["autodiscover", "more_registered_functions"])
+        self.assertIn("no_module", manifest["registry"])
+
+    def test_command_path_missing(self):
+        with self.assertRaisesMessage(CommandError, 'Please provide a path with the "--output" parameter'):
+            call_command("create_autodiscover_manifest")
@@ -1,11 +1,12 @@
+import sys
 import warnings
 from unittest import mock
 
 import pytest
 from django.db import models
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from ambient_toolbox.mixins.bleacher import BleacherMixin
+from ambient_toolbox.mixins.bleacher import BleachCache, BleacherMixin, bleach_cache
 from testapp.models import BleacherMixinModel
 
 
@@ -20,17 +21,17 @@ class BleacherMixinTest(TestCase):
     @mock.patch.object(BleacherMixin, "DEFAULT_ALLOWED_TAGS", ["a", "b", "p"])
     @pytest.mark.filterwarnings("ignore:Please use a set instead of a list or tuple")
     def test_init_allowed_tags_casted_to_set(self, *args):
-        """Test that ALLOWED_TAGS are properly converted to a set."""
+        """Test that ALLOWED_TAGS are properly converted to a frozen set."""
         obj = BleacherMixinModel()
         self.assertEqual({"a", "b", "p"}, obj.allowed_tags)
-        self.assertIs(True, isinstance(obj.allowed_tags, set))
+        self.assertIs(True, isinstance(obj.allowed_tags, frozenset))
 
     @mock.patch.object(BleacherMixin, "DEFAULT_ALLOWED_ATTRIBUTES", {"img": {"alt"}})
     def test_init_allowed_attributes_casted_to_set(self):
-        """Test that ALLOWED_ATTRIBUTES values are properly stored as sets."""
+        """Test that ALLOWED_ATTRIBUTES values are properly stored as frozen sets."""
         obj = BleacherMixinModel()
         self.assertEqual({"img": {"alt"}}, obj.allowed_attributes)
-        self.assertIs(True, isinstance(obj.allowed_attributes["img"], set))
+        self.assertIs(True, isinstance(obj.allowed_attributes["img"], frozenset))
 
     def test_init_allowed_attributes_list_converted_to_set(self):
         """Test that list attributes are converted to sets with deprecation warning."""
@@ -46,13 +47,16 @@ class BleacherMixinTest(TestCase):
         with warnings.catch_warnings(record=True) as w:
             warnings.simplefilter("always")
             obj = BleacherTestModel1()
-            # Verify warning was raised
+            # The configuration is compiled on first usage
+            allowed_attributes = obj.allowed_attributes
+            BleacherTestModel1().allowed_attributes  # noqa: B018
+            # Verify warning was raised once per class
             self.assertEqual(len(w), 1)
             self.assertIn("Please use a set instead of a list or tuple", str(w[0].message))
             self.assertEqual(w[0].category, DeprecationWarning)
             # Verify conversion happened
-            self.assertEqual({"alt", "src"}, obj.allowed_attributes["img"])
-            self.assertIsInstance(obj.allowed_attributes["img"], set)
+            self.assertEqual({"alt", "src"}, allowed_attributes["img"])
+            self.assertIsInstance(allowed_attributes["img"], frozenset)
 
     def test_init_allowed_attributes_tuple_converted_to_set(self):
         """Test that tuple attributes are converted to sets with deprecation warning."""
@@ -68,13 +72,16 @@ class BleacherMixinTest(TestCase):
         with warnings.catch_warnings(record=True) as w:
             warnings.simplefilter("always")
             obj = BleacherTestModel2()
-            # Verify warning was raised
+            # The configuration is compiled on first usage
+            allowed_attributes = obj.allowed_attributes
+            BleacherTestModel2().allowed_attributes  # noqa: B018
+            # Verify warning was raised once per class
             self.assertEqual(len(w), 1)
             self.assertIn("Please use a set instead of a list or tuple", str(w[0].message))
             self.assertEqual(w[0].category, DeprecationWarning)
             # Verify conversion happened
-            self.assertEqual({"href", "rel"}, obj.allowed_attributes["a"])
-            self.assertIsInstance(obj.allowed_attributes["a"], set)
+            self.assertEqual({"href", "rel"}, allowed_attributes["a"])
+            self.assertIsInstance(allowed_attributes["a"], frozenset)
 
     def test_init_custom_allowed_tags(self):
         """Test initialization with custom ALLOWED_TAGS on model."""
@@ -169,7 +176,209 @@ class BleacherMixinTest(TestCase):
         self.assertEqual("Good1", obj.field1)
         self.assertEqual("Good2", obj.field2)
 
+    def test_init_does_not_compile_config(self):
+        """Test that instantiating a model doesn't compile the configuration."""
+        with mock.patch.object(BleacherMixinModel, "get_bleacher_config") as mocked_get_config:
+            BleacherMixinModel(content="<p>Test</p>")
+
+        mocked_get_config.assert_not_called()
+
+    def test_get_bleacher_config_compiled_once_per_class(self):
+        """Test that all instances share the compiled configuration."""
+        with mock.patch.object(
+            BleacherMixinModel, "_compile_allowed_attributes", wraps=BleacherMixinModel._compile_allowed_attributes
+        ) as mocked_compile:
+            BleacherMixinModel._bleacher_config = None
+            objs = [BleacherMixinModel(content="<p>Test</p>") for _ in range(3)]
+            for obj in objs:
+                obj._bleach_field("content")
+
+        mocked_compile.assert_called_once()
+        self.assertIs(objs[0].allowed_attributes, objs[2].allowed_attributes)
+
+    def test_get_bleacher_config_does_not_mutate_defaults(self):
+        """Test that compiling the configuration doesn't change the shared defaults."""
+
+        class BleacherTestModel5(BleacherMixin, models.Model):  # noqa: DJ008
+            BLEACH_FIELD_LIST = ["content"]
+            content = models.CharField(max_length=50)
+
+            class Meta:
+                app_label = "testapp"
+
+        BleacherTestModel5.get_bleacher_config()
+
+        self.assertIsInstance(BleacherMixin.DEFAULT_ALLOWED_ATTRIBUTES["*"], set)
+        self.assertNotIn("_bleacher_config", BleacherMixin.__dict__)
+
+    def test_get_bleacher_config_recompiled_if_replaced(self):
+        """Test that replacing the allowed tags on the class is respected."""
+
+        class BleacherTestModel6(BleacherMixin, models.Model):  # noqa: DJ008
+            BLEACH_FIELD_LIST = ["content"]
+            ALLOWED_TAGS = {"p"}
+            content = models.CharField(max_length=50)
+
+            class Meta:
+                app_label = "testapp"
+
+        self.assertEqual(BleacherTestModel6.get_bleacher_config()[0], {"p"})
+
+        BleacherTestModel6.ALLOWED_TAGS = {"div"}
+
+        self.assertEqual(BleacherTestModel6.get_bleacher_config()[0], {"div"})
+
     def test_init_fields_to_bleach_from_class_attribute(self):
         """Test that BLEACH_FIELD_LIST is properly loaded."""
         obj = BleacherMixinModel()
         self.assertEqual(["content"], obj.fields_to_bleach)
+
+
+class BleachCacheTest(TestCase):
+    """Test suite for the shared cache of sanitised HTML."""
+
+    def setUp(self):
+        super().setUp()
+        bleach_cache.clear()
+
+    def test_clean_cached(self):
+        """Test that the same content is only sanitised once."""
+        cache = BleachCache()
+        tags, attributes = BleacherMixinModel.get_bleacher_config()
+
+        with mock.patch("ambient_toolbox.mixins.bleacher.nh3.clean", return_value="Test") as mocked_clean:
+            self.assertEqual(cache.clean("<script>x</script>Test", tags, attributes, "key"), "Test")
+            self.assertEqual(cache.clean("<script>x</script>Test", tags, attributes, "key"), "Test")
+
+        mocked_clean.assert_called_once()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_clean_different_config(self):
+        """Test that results are cached per configuration."""
+        cache = BleachCache()
+
+        self.assertEqual(cache.clean("<p>Test</p>", frozenset({"p"}), {}, "with-p"), "<p>Test</p>")
+        self.assertEqual(cache.clean("<p>Test</p>", frozenset(), {}, "without-p"), "Test")
+
+    def test_clean_evicts_least_recently_used(self):
+        """Test that the cache is bounded."""
+        cache = BleachCache(max_size=2)
+
+        cache.clean("a", frozenset(), {}, "key")
+        cache.clean("b", frozenset(), {}, "key")
+        cache.clean("a", frozenset(), {}, "key")
+        cache.clean("c", frozenset(), {}, "key")
+        cache.clean("a", frozenset(), {}, "key")
+
+        self.assertEqual(len(cache._data), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_clean_evicts_by_memory(self):
+        """Test that the cache is bounded by the memory of the sanitised values."""
+        cache = BleachCache(max_bytes=2 * sys.getsizeof("a" * 100))
+
+        cache.clean("a" * 100, frozenset(), {}, "key")
+        cache.clean("b" * 100, frozenset(), {}, "key")
+        cache.clean("c" * 100, frozenset(), {}, "key")
+
+        self.assertEqual(list(cache._data.values()), ["b" * 100, "c" * 100])
+        self.assertEqual(cache.size_bytes, 2 * sys.getsizeof("a" * 100))
+
+    def test_clean_skips_values_exceeding_memory_limit(self):
+        """Test that a single oversized value doesn't evict the whole cache."""
+        cache = BleachCache(max_bytes=sys.getsizeof("a" * 100))
+        cache.clean("a" * 100, frozenset(), {}, "key")
+
+        self.assertEqual(cache.clean("b" * 1000, frozenset(), {}, "key"), "b" * 1000)
+
+        self.assertEqual(list(cache._data.values()), ["a" * 100])
+        self.assertEqual(cache.size_bytes, sys.getsizeof("a" * 100))
+
+    @override_settings(AMBIENT_TOOLBOX_BLEACH_CACHE_MAX_SIZE=1)
+    def test_max_size_from_settings(self):
+        """Test that the entry limit is read from the settings."""
+        cache = BleachCache()
+
+        cache.clean("a", frozenset(), {}, "key")
+        cache.clean("b", frozenset(), {}, "key")
+
+        self.assertEqual(cache.max_size, 1)
+        self.assertEqual(list(cache._data.values()), ["b"])
+
+    @override_settings(AMBIENT_TOOLBOX_BLEACH_CACHE_MAX_BYTES=0)
+    def test_max_bytes_from_settings(self):
+        """Test that the memory limit is read from the settings and zero disables caching."""
+        cache = BleachCache()
+
+        cache.clean("a", frozenset(), {}, "key")
+
+        self.assertEqual(cache.max_bytes, 0)
+        self.assertEqual(len(cache._data), 0)
+
+    def test_default_limits(self):
+        """Test the default limits."""
+        cache = BleachCache()
+
+        self.assertEqual(cache.max_size, 1024)
+        self.assertEqual(cache.max_bytes, 16 * 1024 * 1024)
+
+    def test_clear(self):
+        """Test that clearing the cache resets the statistics."""
+        cache = BleachCache()
+        cache.clean("a", frozenset(), {}, "key")
+
+        cache.clear()
+
+        self.assertEqual(len(cache._data), 0)
+        self.assertEqual(cache.size_bytes, 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_save_skips_unchanged_field(self):
+        """Test that saving an instance again doesn't bleach unchanged content."""
+        obj = BleacherMixinModel.objects.create(content="<script>Evil</script>Test")
+
+        with mock.patch.object(bleach_cache, "clean") as mocked_clean:
+            obj.save()
+
+        mocked_clean.assert_not_called()
+        self.assertEqual("Test", obj.content)
+
+    def test_save_bleaches_changed_field(self):
+        """Test that changed content is bleached again."""
+        obj = BleacherMixinModel.objects.create(content="<p>Test</p>")
+
+        obj.content = "<script>Evil</script>Changed"
+        obj.save()
+
+        self.assertEqual("Changed", obj.content)
+
+    def test_save_shares_cache_between_instances(self):
+        """Test that instances with the same content reuse the sanitised result."""
+        BleacherMixinModel.objects.create(content="<script>Evil</script>Test")
+
+        with mock.patch("ambient_toolbox.mixins.bleacher.nh3.clean") as mocked_clean:
+            obj = BleacherMixinModel.objects.create(content="<script>Evil</script>Test")
+
+        mocked_clean.assert_not_called()
+        self.assertEqual("Test", obj.content)
+
+    def test_bleach_many_bulk_create(self):
+        """Test that bleach_many() prepares objects for bulk operations."""
+        objs = BleacherMixinModel.bleach_many(
+            BleacherMixinModel(content=content) for content in ("<script>Evil</script>A", "<p>B</p>")
+        )
+        BleacherMixinModel.objects.bulk_create(objs)
+
+        self.assertEqual(
+            list(BleacherMixinModel.objects.order_by("content").values_list("content", flat=True)), ["<p>B</p>", "A"]
+        )
+
+    def test_bleach_many_bulk_update(self):
+        """Test that bleach_many() works for bulk updates."""
+        obj = BleacherMixinModel.objects.create(content="A")
+        obj.content = "<script>Evil</script>B"
+
+        BleacherMixinModel.objects.bulk_update(BleacherMixinModel.bleach_many([obj]), ["content"])
+
+        obj.refresh_from_db()
+        self.assertEqual("B", obj.content)
@@ -1,3 +1,6 @@
+from unittest import mock
+
+from django.db.models.signals import pre_save
 from django.test import TestCase
 
 from testapp.models import ModelWithSaveWithoutSignalsMixin
@@ -35,3 +38,23 @@ class SaveWithoutSignalsTestCase(TestCase):
         self.instance.save()
 
         self.assertEqual(value_before + 1, self.instance.value)
+
+    def test_signals_are_restored_if_save_raises(self):
+        value_before = self.instance.value
+
+        with mock.patch("django.db.models.Model.save_base", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.instance.save_without_signals()
+
+        self.instance.save()
+
+        self.assertEqual(value_before + 1, self.instance.value)
+
+    def test_receivers_are_not_disconnected(self):
+        receivers = pre_save.receivers
+
+        with mock.patch.object(ModelWithSaveWithoutSignalsMixin, "save_base") as mocked_save_base:
+            mocked_save_base.side_effect = lambda *args, **kwargs: self.assertIs(pre_save.receivers, receivers)
+            self.instance.save_without_signals()
+
+        mocked_save_base.assert_called_once()
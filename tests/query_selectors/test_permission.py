@@ -1,7 +1,16 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-from ambient_toolbox.selectors.permission import AbstractUserSpecificSelectorMixin
-from testapp.models import ModelWithSelector
+from ambient_toolbox.selectors.base import Selector
+from ambient_toolbox.selectors.permission import (
+    AbstractUserSpecificSelectorMixin,
+    GloballyVisibleSelector,
+    RequestCachedPermissionSelectorMixin,
+)
+from ambient_toolbox.tests.mixins import run_in_request
+from testapp.models import CommonInfoBasedModel, ModelWithSelector
 
 
 class AbstractUserSpecificSelectorMixinTest(TestCase):
@@ -48,3 +57,151 @@ class GloballyVisibleSelectorMixinTest(TestCase):
 
         self.assertEqual(qs.count(), 1)
         self.assertIn(self.obj, qs)
+
+
+class RequestCachedGloballyVisibleSelector(RequestCachedPermissionSelectorMixin, GloballyVisibleSelector):
+    pass
+
+
+class RequestCachedEmptySelector(RequestCachedPermissionSelectorMixin, GloballyVisibleSelector):
+    def visible_for(self, user_id: int):
+        return self.get_queryset().none()
+
+
+class RequestCachedPermissionSelectorMixinTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.obj = ModelWithSelector.objects.create(value=1)
+
+    def setUp(self):
+        super().setUp()
+        self.selector = RequestCachedGloballyVisibleSelector()
+        self.selector.model = ModelWithSelector
+
+    def test_visible_for_cached_within_request(self):
+        def run():
+            with self.assertNumQueries(1):
+                self.selector.visible_for(user_id=1)
+
+            with mock.patch.object(GloballyVisibleSelector, "visible_for") as mocked_visible_for:
+                with self.assertNumQueries(0):
+                    qs = self.selector.visible_for(user_id=1)
+
+            mocked_visible_for.assert_not_called()
+            self.assertEqual(list(qs), [self.obj])
+
+        run_in_request(run)
+
+    def test_editable_for_and_deletable_for_return_copies(self):
+        def run():
+            self.assertIsNot(self.selector.editable_for(user_id=1), self.selector.editable_for(user_id=1))
+            self.assertIsNot(self.selector.deletable_for(user_id=1), self.selector.deletable_for(user_id=1))
+
+        run_in_request(run)
+
+    def test_different_users_cached_separately(self):
+        def run():
+            self.selector.visible_for(user_id=1)
+            with self.assertNumQueries(1):
+                self.selector.visible_for(user_id=2)
+
+        run_in_request(run)
+
+    def test_different_selectors_cached_separately(self):
+        empty_selector = RequestCachedEmptySelector()
+        empty_selector.model = ModelWithSelector
+
+        def run():
+            self.assertEqual(list(self.selector.visible_for(user_id=1)), [self.obj])
+            self.assertEqual(list(empty_selector.visible_for(user_id=1)), [])
+
+        run_in_request(run)
+
+    def test_not_cached_outside_request(self):
+        self.assertIsNot(self.selector.visible_for(user_id=1), self.selector.visible_for(user_id=1))
+
+
+class CreatedBySelector(AbstractUserSpecificSelectorMixin, Selector):
+    def visible_for(self, user_id: int):
+        if user_id is None:
+            return self.none()
+        return self.get_queryset().filter(created_by_id=user_id)
+
+
+class VisibleIdsForUsersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user_1 = User.objects.create(username="user-1")
+        cls.user_2 = User.objects.create(username="user-2")
+        cls.user_3 = User.objects.create(username="user-3")
+        cls.obj_1 = CommonInfoBasedModel.objects.create(value=1, created_by=cls.user_1)
+        cls.obj_2 = CommonInfoBasedModel.objects.create(value=2, created_by=cls.user_1)
+        cls.obj_3 = CommonInfoBasedModel.objects.create(value=3, created_by=cls.user_2)
+
+    def setUp(self):
+        super().setUp()
+        self.selector = CreatedBySelector()
+        self.selector.model = CommonInfoBasedModel
+
+    def test_visible_ids_for_users_regular(self):
+        visible_ids = self.selector.visible_ids_for_users([self.user_1.pk, self.user_2.pk, self.user_3.pk])
+
+        self.assertEqual(
+            visible_ids,
+            {
+                self.user_1.pk: frozenset({self.obj_1.pk, self.obj_2.pk}),
+                self.user_2.pk: frozenset({self.obj_3.pk}),
+                self.user_3.pk: frozenset(),
+            },
+        )
+
+    def test_visible_ids_for_users_one_query_per_chunk(self):
+        with self.assertNumQueries(2):
+            self.selector.visible_ids_for_users([self.user_1.pk, self.user_2.pk, self.user_3.pk], chunk_size=2)
+
+    def test_iter_visible_ids_for_users_streams_chunks(self):
+        iterator = self.selector.iter_visible_ids_for_users(
+            (user_id for user_id in [self.user_1.pk, self.user_2.pk, self.user_3.pk]), chunk_size=1
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(next(iterator), (self.user_1.pk, frozenset({self.obj_1.pk, self.obj_2.pk})))
+
+    def test_iter_visible_ids_for_users_empty_querysets(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.selector.visible_ids_for_users([None]), {None: frozenset()})
+
+    def test_iter_visible_ids_for_users_no_users(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.selector.visible_ids_for_users([]), {})
+
+    def test_visible_ids_for_users_matches_visible_for(self):
+        visible_ids = self.selector.visible_ids_for_users([self.user_1.pk, self.user_2.pk])
+
+        for user_id, ids in visible_ids.items():
+            self.assertEqual(ids, frozenset(self.selector.visible_for(user_id=user_id).values_list("pk", flat=True)))
+
+
+class GloballyVisibleSelectorVisibleIdsForUsersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.obj_1 = ModelWithSelector.objects.create(value=1)
+        cls.obj_2 = ModelWithSelector.objects.create(value=2)
+
+    def test_visible_ids_for_users_single_query(self):
+        with self.assertNumQueries(1):
+            visible_ids = ModelWithSelector.selectors.visible_ids_for_users(range(1, 500))
+
+        self.assertEqual(len(visible_ids), 499)
+        self.assertEqual(visible_ids[1], frozenset({self.obj_1.pk, self.obj_2.pk}))
+        self.assertIs(visible_ids[1], visible_ids[2])
+
+    def test_visible_ids_for_users_no_users(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithSelector.selectors.visible_ids_for_users([]), {})
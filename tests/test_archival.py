@@ -0,0 +1,242 @@
+import datetime
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ambient_toolbox.services.archival import (
+    AbstractArchiveBackend,
+    ArchivalError,
+    ArchivalService,
+    JsonLinesFileArchiveBackend,
+    ModelArchiveBackend,
+)
+from testapp.models import (
+    CommonInfoBasedArchiveModel,
+    CommonInfoBasedModel,
+    CreatedAtInfoBasedChildModel,
+    CreatedAtInfoBasedModel,
+    MySingleSignalModel,
+)
+
+BLACKLISTED_FIELDS = ["created_by_id", "lastmodified_by_id"]
+
+
+class ArchivalServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.cutoff = timezone.now()
+        cls.old_objs = [
+            CommonInfoBasedModel.objects.create(
+                created_at=cls.cutoff - datetime.timedelta(days=days, microseconds=1), value=days
+            )
+            for days in (3, 2, 1, 0)
+        ]
+        cls.new_obj = CommonInfoBasedModel.objects.create(created_at=cls.cutoff, value=99)
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "archive.jsonl.gz"
+
+    def _read_archive(self) -> list[dict]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as archive_file:
+            return [json.loads(line) for line in archive_file]
+
+    def test_init_model_not_created_at_info(self):
+        with self.assertRaises(ArchivalError):
+            ArchivalService(model=MySingleSignalModel, backend=AbstractArchiveBackend(), cutoff=self.cutoff)
+
+    def test_init_invalid_batch_size(self):
+        with self.assertRaises(ArchivalError):
+            ArchivalService(
+                model=CommonInfoBasedModel, backend=AbstractArchiveBackend(), cutoff=self.cutoff, batch_size=0
+            )
+
+    def test_init_model_with_cascading_relations(self):
+        with self.assertRaisesMessage(ArchivalError, "testapp.CreatedAtInfoBasedChildModel.parent"):
+            ArchivalService(model=CreatedAtInfoBasedModel, backend=AbstractArchiveBackend(), cutoff=self.cutoff)
+
+    def test_process_allow_cascade(self):
+        obj = CreatedAtInfoBasedModel.objects.create(created_at=self.cutoff - datetime.timedelta(days=1))
+        CreatedAtInfoBasedChildModel.objects.create(parent=obj)
+        service = ArchivalService(
+            model=CreatedAtInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            allow_cascade=True,
+        )
+
+        self.assertEqual(service.process(), 1)
+        self.assertFalse(CreatedAtInfoBasedChildModel.objects.exists())
+
+    def test_get_cascading_relations(self):
+        self.assertEqual(
+            ArchivalService.get_cascading_relations(CreatedAtInfoBasedModel),
+            ["testapp.CreatedAtInfoBasedChildModel.parent"],
+        )
+        self.assertEqual(ArchivalService.get_cascading_relations(CommonInfoBasedModel), [])
+
+    def test_abstract_backend_write(self):
+        with self.assertRaises(NotImplementedError):
+            AbstractArchiveBackend().write([])
+
+    def test_process_model_backend(self):
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=ModelArchiveBackend(CommonInfoBasedArchiveModel, blacklisted_fields=BLACKLISTED_FIELDS),
+            cutoff=self.cutoff,
+            batch_size=3,
+        )
+
+        self.assertEqual(service.process(), 4)
+
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+        archived_objs = list(CommonInfoBasedArchiveModel.objects.order_by("created_at"))
+        self.assertEqual([obj.pk for obj in archived_objs], [obj.pk for obj in self.old_objs])
+        self.assertEqual([obj.created_at for obj in archived_objs], [obj.created_at for obj in self.old_objs])
+
+    def test_process_model_backend_skips_archived_objects(self):
+        CommonInfoBasedArchiveModel.objects.create(
+            id=self.old_objs[0].pk, created_at=self.cutoff, lastmodified_at=self.cutoff, value=1000
+        )
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=ModelArchiveBackend(CommonInfoBasedArchiveModel, blacklisted_fields=BLACKLISTED_FIELDS),
+            cutoff=self.cutoff,
+        )
+
+        self.assertEqual(service.process(), 4)
+        self.assertEqual(CommonInfoBasedArchiveModel.objects.get(pk=self.old_objs[0].pk).value, 1000)
+        self.assertEqual(CommonInfoBasedArchiveModel.objects.count(), 4)
+
+    def test_process_file_backend(self):
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            batch_size=2,
+        )
+
+        self.assertEqual(service.process(), 4)
+
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+        archived_data = self._read_archive()
+        self.assertEqual([data["id"] for data in archived_data], [obj.pk for obj in self.old_objs])
+        self.assertEqual(archived_data[0]["created_at"], self.old_objs[0].created_at.isoformat())
+
+    def test_process_max_batches(self):
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            batch_size=1,
+        )
+
+        self.assertEqual(service.process(max_batches=2), 2)
+        self.assertEqual(CommonInfoBasedModel.objects.count(), 3)
+
+    @mock.patch("ambient_toolbox.services.archival.time.sleep")
+    def test_process_sleeps_between_batches(self, mocked_sleep):
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            batch_size=2,
+            sleep=0.5,
+        )
+
+        service.process()
+
+        self.assertEqual(mocked_sleep.call_count, 2)
+        mocked_sleep.assert_called_with(0.5)
+
+    def test_process_file_backend_resumes_after_failed_delete(self):
+        service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            batch_size=2,
+        )
+
+        with mock.patch("django.db.models.query.QuerySet.delete", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                service.process()
+
+        # The first batch was written, but not deleted
+        self.assertEqual(CommonInfoBasedModel.objects.count(), 5)
+        self.assertEqual(len(self._read_archive()), 2)
+
+        resumed_service = ArchivalService(
+            model=CommonInfoBasedModel,
+            backend=JsonLinesFileArchiveBackend(self.path),
+            cutoff=self.cutoff,
+            batch_size=2,
+        )
+        self.assertEqual(resumed_service.process(), 4)
+
+        self.assertEqual([data["id"] for data in self._read_archive()], [obj.pk for obj in self.old_objs])
+
+    def test_process_file_backend_archives_backdated_objects(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ArchivalService(
+                model=CommonInfoBasedModel, backend=JsonLinesFileArchiveBackend(self.path), cutoff=self.cutoff
+            ).process()
+        backdated_obj = CommonInfoBasedModel.objects.create(
+            created_at=self.cutoff - datetime.timedelta(days=20), value=20
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            archived = ArchivalService(
+                model=CommonInfoBasedModel, backend=JsonLinesFileArchiveBackend(self.path), cutoff=self.cutoff
+            ).process()
+
+        self.assertEqual(archived, 1)
+        self.assertEqual(list(CommonInfoBasedModel.objects.all()), [self.new_obj])
+        self.assertEqual(
+            [data["id"] for data in self._read_archive()], [*[obj.pk for obj in self.old_objs], backdated_obj.pk]
+        )
+
+    def test_file_backend_truncates_partially_written_batch(self):
+        backend = JsonLinesFileArchiveBackend(self.path)
+        backend.prepare()
+        backend.write(self.old_objs[:1])
+        with open(self.path, "ab") as archive_file:
+            archive_file.write(b"partial batch")
+
+        JsonLinesFileArchiveBackend(self.path).prepare()
+
+        self.assertEqual([data["id"] for data in self._read_archive()], [self.old_objs[0].pk])
+
+    def test_file_backend_appends_to_existing_file(self):
+        with gzip.open(self.path, "wt", encoding="utf-8") as archive_file:
+            archive_file.write('{"id": -1}\n')
+
+        ArchivalService(
+            model=CommonInfoBasedModel, backend=JsonLinesFileArchiveBackend(self.path), cutoff=self.cutoff
+        ).process()
+
+        self.assertEqual([data["id"] for data in self._read_archive()], [-1, *[obj.pk for obj in self.old_objs]])
+
+    def test_file_backend_checkpoint(self):
+        backend = JsonLinesFileArchiveBackend(self.path)
+        backend.prepare()
+        self.assertIsNone(backend.get_checkpoint())
+
+        backend.write(self.old_objs[:2])
+
+        self.assertEqual(backend.get_checkpoint(), (self.old_objs[1].created_at, self.old_objs[1].pk))
+
+        backend.clear_checkpoint()
+
+        self.assertIsNone(backend.get_checkpoint())
+        resumed_backend = JsonLinesFileArchiveBackend(self.path)
+        resumed_backend.prepare()
+        self.assertIsNone(resumed_backend.get_checkpoint())
@@ -1,9 +1,16 @@
+import threading
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync
 from django.core import mail
 from django.db.models import signals
+from django.dispatch import Signal
 from django.test import TestCase
 
-from ambient_toolbox.context_manager import TempDisconnectSignal
+from ambient_toolbox.context_manager import SuppressSignals, TempDisconnectSignal
 from testapp.models import (
+    ForeignKeyRelatedModel,
+    ModelWithSelector,
     MyMultipleSignalModel,
     MySingleSignalModel,
     increase_value_no_dispatch_uid,
@@ -66,3 +73,148 @@ class TempDisconnectSignalTest(TestCase):
 
         self.assertEqual(obj.value, 0)
         self.assertEqual(outbox, 1)
+
+
+class SuppressSignalsTest(TestCase):
+    def test_model_signals_suppressed(self):
+        with SuppressSignals():
+            obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 0)
+
+    def test_signals_restored_after_block(self):
+        with SuppressSignals():
+            MySingleSignalModel.objects.create()
+
+        obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 1)
+
+    def test_signals_restored_on_error(self):
+        with self.assertRaises(RuntimeError), SuppressSignals():
+            raise RuntimeError
+
+        obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 1)
+
+    def test_only_given_signals_suppressed(self):
+        with SuppressSignals(signals=[signals.post_save]):
+            obj = MyMultipleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_only_given_senders_suppressed(self):
+        with SuppressSignals(senders=[MyMultipleSignalModel]):
+            obj = MySingleSignalModel.objects.create()
+            other_obj = MyMultipleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 1)
+        self.assertEqual(other_obj.value, 0)
+
+    def test_nested_blocks(self):
+        with SuppressSignals(senders=[MyMultipleSignalModel]):
+            with SuppressSignals(senders=[MySingleSignalModel]):
+                obj = MySingleSignalModel.objects.create()
+            other_obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 0)
+        self.assertEqual(other_obj.value, 1)
+
+    def test_other_threads_not_affected(self):
+        entered = threading.Event()
+        saved = threading.Event()
+        result = {}
+
+        def save_in_thread():
+            entered.wait()
+            result["value"] = MySingleSignalModel(value=0)
+            signals.pre_save.send(sender=MySingleSignalModel, instance=result["value"])
+            saved.set()
+
+        thread = threading.Thread(target=save_in_thread)
+        thread.start()
+        with SuppressSignals():
+            entered.set()
+            saved.wait()
+        thread.join()
+
+        self.assertEqual(result["value"].value, 1)
+
+    def test_bulk_delete_signals_suppressed(self):
+        receiver = mock.Mock()
+        signals.post_delete.connect(receiver, sender=ForeignKeyRelatedModel)
+        self.addCleanup(signals.post_delete.disconnect, receiver, sender=ForeignKeyRelatedModel)
+        obj = MySingleSignalModel.objects.create()
+        ForeignKeyRelatedModel.objects.create(single_signal=obj)
+
+        with SuppressSignals():
+            MySingleSignalModel.objects.all().delete()
+
+        receiver.assert_not_called()
+        self.assertEqual(ForeignKeyRelatedModel.objects.count(), 0)
+
+    def test_send_robust_suppressed(self):
+        with SuppressSignals():
+            responses = signals.pre_save.send_robust(sender=MySingleSignalModel, instance=MySingleSignalModel())
+
+        self.assertEqual(responses, [])
+
+    def test_custom_signal_not_suppressed_by_default(self):
+        signal = Signal()
+        receiver = mock.Mock(return_value=None)
+        signal.connect(receiver, weak=False)
+
+        with SuppressSignals():
+            signal.send(sender=None)
+
+        receiver.assert_called_once()
+
+    def test_has_listeners_suppressed(self):
+        receiver = mock.Mock(return_value=None)
+        signals.post_delete.connect(receiver, sender=MySingleSignalModel, weak=False)
+        self.addCleanup(signals.post_delete.disconnect, receiver, sender=MySingleSignalModel)
+
+        with SuppressSignals(signals=[signals.post_delete], senders=[MySingleSignalModel]):
+            self.assertFalse(signals.post_delete.has_listeners(MySingleSignalModel))
+        self.assertTrue(signals.post_delete.has_listeners(MySingleSignalModel))
+
+    def test_delete_fast_deletes_queryset(self):
+        receiver = mock.Mock(return_value=None)
+        signals.post_delete.connect(receiver, sender=ModelWithSelector, weak=False)
+        self.addCleanup(signals.post_delete.disconnect, receiver, sender=ModelWithSelector)
+        ModelWithSelector.objects.create(value=1)
+        ModelWithSelector.objects.create(value=2)
+
+        # Without receivers, Django deletes the queryset without fetching the objects first
+        with SuppressSignals(), self.assertNumQueries(1):
+            ModelWithSelector.objects.all().delete()
+
+        self.assertFalse(ModelWithSelector.objects.exists())
+        receiver.assert_not_called()
+
+    @skipUnless(hasattr(Signal, "asend"), "Async signals were added in Django 5.0")
+    def test_async_send_suppressed(self):
+        signal = Signal()
+        receiver = mock.Mock(return_value=None)
+        signal.connect(receiver, weak=False)
+
+        @async_to_sync
+        async def send():
+            with SuppressSignals(signals=[signal]):
+                await signal.asend(sender=None)
+                await signal.asend_robust(sender=None)
+            return await signal.asend(sender=None)
+
+        send()
+
+        receiver.assert_called_once()
+
+    def test_decorator(self):
+        @SuppressSignals(senders=[MySingleSignalModel])
+        def create():
+            return MySingleSignalModel.objects.create()
+
+        self.assertEqual(create().value, 0)
+        self.assertEqual(MySingleSignalModel.objects.create().value, 1)
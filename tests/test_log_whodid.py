@@ -1,4 +1,8 @@
+import pytest
+from django.contrib.auth.models import User
+
 from ambient_toolbox.utils import log_whodid
+from testapp.models import CommonInfoBasedModel
 
 
 def test_log_who_did_new_object(mocker):
@@ -8,6 +12,8 @@ def test_log_who_did_new_object(mocker):
     """
     user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     obj.created_by = None
     log_whodid(obj, user)
     assert obj.created_by == user
@@ -20,6 +26,8 @@ def test_log_who_did_existing_values(mocker):
     """
     user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     old_user = obj.created_by
     log_whodid(obj, user)
     assert obj.created_by == old_user
@@ -33,6 +41,8 @@ def test_log_who_did_no_created_by_attribute(mocker):
     """
     user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     # Remove the created_by attribute
     del obj.created_by
     log_whodid(obj, user)
@@ -49,6 +59,8 @@ def test_log_who_did_no_lastmodified_by_attribute(mocker):
     """
     user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     obj.created_by = None
     # Remove the lastmodified_by attribute
     del obj.lastmodified_by
@@ -66,6 +78,8 @@ def test_log_who_did_no_attributes(mocker):
     """
     user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     # Remove both attributes
     del obj.created_by
     del obj.lastmodified_by
@@ -83,6 +97,8 @@ def test_log_who_did_with_created_by_but_no_lastmodified_by(mocker):
     user = mocker.MagicMock()
     old_user = mocker.MagicMock()
     obj = mocker.MagicMock()
+    del obj.created_by_id
+    del obj.lastmodified_by_id
     obj.created_by = old_user
     # Remove the lastmodified_by attribute
     del obj.lastmodified_by
@@ -91,3 +107,46 @@ def test_log_who_did_with_created_by_but_no_lastmodified_by(mocker):
     assert obj.created_by == old_user
     # lastmodified_by should not exist
     assert not hasattr(obj, "lastmodified_by")
+
+
+@pytest.mark.django_db
+def test_log_who_did_model_sets_ids():
+    """
+    Tests if the foreign keys of a model are set via their ids.
+    """
+    user = User.objects.create(username="my-user")
+    obj = CommonInfoBasedModel(value=1)
+
+    log_whodid(obj, user)
+
+    assert obj.created_by_id == user.pk
+    assert obj.lastmodified_by_id == user.pk
+
+
+@pytest.mark.django_db
+def test_log_who_did_model_existing_creator_not_fetched(django_assert_num_queries):
+    """
+    Tests if an existing creator is kept without fetching it from the database.
+    """
+    creator = User.objects.create(username="creator")
+    user = User.objects.create(username="my-user")
+    CommonInfoBasedModel.objects.create(value=1, created_by=creator)
+    obj = CommonInfoBasedModel.objects.get()
+
+    with django_assert_num_queries(0):
+        log_whodid(obj, user)
+
+    assert obj.created_by_id == creator.pk
+    assert obj.lastmodified_by_id == user.pk
+
+
+def test_log_who_did_model_no_user():
+    """
+    Tests if the editor is reset if no user is given.
+    """
+    obj = CommonInfoBasedModel(value=1, lastmodified_by_id=1)
+
+    log_whodid(obj, None)
+
+    assert obj.created_by_id is None
+    assert obj.lastmodified_by_id is None
@@ -1,11 +1,26 @@
+import datetime
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
 
 from ambient_toolbox.managers import (
+    PERMISSION_CACHE_NAMESPACE,
     AbstractUserSpecificManager,
     AbstractUserSpecificQuerySet,
+    CreatedAtInfoQuerySet,
+    GetOrNoneManagerMixin,
+    GloballyVisibleQuerySet,
+    RequestCachedPermissionQuerySetMixin,
+    invalidate_permission_cache,
 )
-from testapp.models import ModelWithGetOrNoneManagerModel, MySingleSignalModel
+from ambient_toolbox.tests.mixins import run_in_request
+from ambient_toolbox.utils import get_request_cache
+from testapp.models import CommonInfoBasedModel, ModelWithGetOrNoneManagerModel, MySingleSignalModel
 
 
 class AbstractUserSpecificQuerySetTest(TestCase):
@@ -128,3 +143,446 @@ class GetOrNoneMixinTest(TestCase):
             "get() returned more than one ModelWithGetOrNoneManagerModel -- it returned 2!",
         ):
             ModelWithGetOrNoneManagerModel.objects.get_or_none(my_field=True)
+
+
+class GetManyOrNoneMixinTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.obj_1 = ModelWithGetOrNoneManagerModel.objects.create(my_field=True)
+        cls.obj_2 = ModelWithGetOrNoneManagerModel.objects.create(my_field=False)
+
+    def test_get_many_or_none_regular(self):
+        with self.assertNumQueries(1):
+            result = ModelWithGetOrNoneManagerModel.objects.get_many_or_none("id", [self.obj_1.pk, self.obj_2.pk, -1])
+
+        self.assertEqual(result, {self.obj_1.pk: self.obj_1, self.obj_2.pk: self.obj_2, -1: None})
+
+    def test_get_many_or_none_values_normalised(self):
+        result = ModelWithGetOrNoneManagerModel.objects.get_many_or_none("id", [str(self.obj_1.pk), self.obj_1.pk])
+
+        self.assertEqual(result, {str(self.obj_1.pk): self.obj_1, self.obj_1.pk: self.obj_1})
+
+    def test_get_many_or_none_no_values(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithGetOrNoneManagerModel.objects.get_many_or_none("id", []), {})
+
+    def test_get_many_or_none_chunked(self):
+        with mock.patch.object(connection.features, "max_query_params", 1):
+            with self.assertNumQueries(3):
+                result = ModelWithGetOrNoneManagerModel.objects.get_many_or_none(
+                    "id", [self.obj_1.pk, self.obj_2.pk, -1]
+                )
+
+        self.assertEqual(result, {self.obj_1.pk: self.obj_1, self.obj_2.pk: self.obj_2, -1: None})
+
+    def test_get_many_or_none_without_parameter_limit(self):
+        with mock.patch.object(connection.features, "max_query_params", None):
+            with self.assertNumQueries(1):
+                result = ModelWithGetOrNoneManagerModel.objects.get_many_or_none("id", [self.obj_1.pk, self.obj_2.pk])
+
+        self.assertEqual(result, {self.obj_1.pk: self.obj_1, self.obj_2.pk: self.obj_2})
+
+    def test_get_many_or_none_multiple_results(self):
+        ModelWithGetOrNoneManagerModel.objects.create(my_field=True)
+
+        with self.assertRaisesMessage(
+            ModelWithGetOrNoneManagerModel.MultipleObjectsReturned,
+            "get_many_or_none() returned more than one ModelWithGetOrNoneManagerModel for my_field=True!",
+        ):
+            ModelWithGetOrNoneManagerModel.objects.get_many_or_none("my_field", [True])
+
+    def test_get_many_or_none_foreign_key(self):
+        user = User.objects.create(username="my-username")
+        obj = CommonInfoBasedModel.objects.create(value=1, created_by=user)
+
+        # The mixin only needs a manager, so we can apply it to any model's manager
+        result = GetOrNoneManagerMixin.get_many_or_none(CommonInfoBasedModel.objects, "created_by", [user.pk, -1])
+
+        self.assertEqual(result, {user.pk: obj, -1: None})
+
+
+class CommonInfoQuerySetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-username")
+        cls.other_user = User.objects.create(username="other-username")
+
+    @freeze_time("2022-06-26 10:00")
+    def test_bulk_create_stamps_current_user(self):
+        with mock.patch.object(CommonInfoBasedModel, "get_current_user", return_value=self.user):
+            CommonInfoBasedModel.objects.bulk_create([CommonInfoBasedModel(value=1), CommonInfoBasedModel(value=2)])
+
+        self.assertEqual(
+            CommonInfoBasedModel.objects.filter(created_by=self.user, lastmodified_by=self.user).count(), 2
+        )
+        self.assertEqual(
+            CommonInfoBasedModel.objects.filter(lastmodified_at=timezone.now()).count(),
+            2,
+        )
+
+    def test_bulk_create_explicit_user(self):
+        with mock.patch.object(CommonInfoBasedModel, "get_current_user") as mocked_get_current_user:
+            objs = CommonInfoBasedModel.objects.bulk_create([CommonInfoBasedModel(value=1)], user=self.other_user)
+
+        mocked_get_current_user.assert_not_called()
+        self.assertEqual(objs[0].created_by, self.other_user)
+        self.assertEqual(objs[0].lastmodified_by, self.other_user)
+
+    def test_bulk_create_without_user(self):
+        objs = CommonInfoBasedModel.objects.bulk_create([CommonInfoBasedModel(value=1)])
+
+        self.assertIsNone(objs[0].created_by)
+        self.assertIsNone(objs[0].lastmodified_by)
+
+    def test_bulk_create_accepts_generator(self):
+        objs = CommonInfoBasedModel.objects.bulk_create(CommonInfoBasedModel(value=value) for value in range(3))
+
+        self.assertEqual(len(objs), 3)
+
+    def test_bulk_create_upsert_adds_audit_fields(self):
+        with mock.patch("django.db.models.QuerySet.bulk_create") as mocked_bulk_create:
+            CommonInfoBasedModel.objects.bulk_create(
+                [CommonInfoBasedModel(value=1)], update_conflicts=True, update_fields=["value"], unique_fields=["id"]
+            )
+
+        self.assertEqual(
+            mocked_bulk_create.call_args.kwargs["update_fields"], ["value", "lastmodified_at", "lastmodified_by"]
+        )
+
+    @freeze_time("2022-06-26 10:00")
+    def test_bulk_update_stamps_audit_fields(self):
+        obj = CommonInfoBasedModel.objects.create(value=1, created_by=self.user)
+        obj.value = 2
+
+        with freeze_time("2022-06-27 10:00"):
+            CommonInfoBasedModel.objects.bulk_update([obj], ["value"], user=self.other_user)
+            lastmodified_at = timezone.now()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertEqual(obj.lastmodified_at, lastmodified_at)
+        self.assertEqual(obj.lastmodified_by, self.other_user)
+        self.assertEqual(obj.created_by, self.user)
+
+    @mock.patch("testapp.models.CommonInfoBasedModel.ALWAYS_UPDATE_FIELDS", False)
+    def test_bulk_update_always_update_fields_disabled(self):
+        obj = CommonInfoBasedModel.objects.create(value=1)
+        obj.value = 2
+
+        CommonInfoBasedModel.objects.bulk_update([obj], ["value"], user=self.other_user)
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertIsNone(obj.lastmodified_by)
+
+    def test_bulk_update_single_query(self):
+        objs = CommonInfoBasedModel.objects.bulk_create([CommonInfoBasedModel(value=1), CommonInfoBasedModel(value=2)])
+        for obj in objs:
+            obj.value += 10
+
+        with self.assertNumQueries(1):
+            CommonInfoBasedModel.objects.bulk_update(objs, ["value"], user=self.user)
+
+    def test_update_injects_audit_fields(self):
+        obj = CommonInfoBasedModel.objects.create(value=1)
+
+        with freeze_time("2022-06-27 10:00"):
+            with mock.patch.object(CommonInfoBasedModel, "get_current_user", return_value=self.user):
+                CommonInfoBasedModel.objects.filter(pk=obj.pk).update(value=2)
+            lastmodified_at = timezone.now()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertEqual(obj.lastmodified_at, lastmodified_at)
+        self.assertEqual(obj.lastmodified_by, self.user)
+
+    def test_update_keeps_explicit_audit_fields(self):
+        obj = CommonInfoBasedModel.objects.create(value=1)
+        lastmodified_at = timezone.now() - datetime.timedelta(days=365)
+
+        with mock.patch.object(CommonInfoBasedModel, "get_current_user", return_value=self.user):
+            CommonInfoBasedModel.objects.filter(pk=obj.pk).update(
+                lastmodified_at=lastmodified_at, lastmodified_by_id=self.other_user.pk
+            )
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.lastmodified_at, lastmodified_at)
+        self.assertEqual(obj.lastmodified_by, self.other_user)
+
+    def test_update_without_user(self):
+        obj = CommonInfoBasedModel.objects.create(value=1, lastmodified_by=self.user)
+
+        CommonInfoBasedModel.objects.filter(pk=obj.pk).update(value=2)
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.lastmodified_by, self.user)
+
+    @mock.patch("testapp.models.CommonInfoBasedModel.ALWAYS_UPDATE_FIELDS", False)
+    def test_update_always_update_fields_disabled(self):
+        obj = CommonInfoBasedModel.objects.create(value=1)
+        lastmodified_at = obj.lastmodified_at
+
+        with mock.patch.object(CommonInfoBasedModel, "get_current_user", return_value=self.user):
+            CommonInfoBasedModel.objects.filter(pk=obj.pk).update(value=2)
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.lastmodified_at, lastmodified_at)
+        self.assertIsNone(obj.lastmodified_by)
+
+
+class CreatedAtInfoQuerySetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        created_at = timezone.now().replace(microsecond=123456)
+        # Two objects share a timestamp to ensure that the primary key breaks the tie
+        cls.objs = [
+            CommonInfoBasedModel.objects.create(
+                created_at=created_at + datetime.timedelta(minutes=offset), value=offset
+            )
+            for offset in (3, 0, 1, 1, 2)
+        ]
+        cls.ascending = sorted(cls.objs, key=lambda obj: (obj.created_at, obj.pk))
+
+    def test_common_info_queryset_is_created_at_info_queryset(self):
+        self.assertIsInstance(CommonInfoBasedModel.objects.all(), CreatedAtInfoQuerySet)
+
+    def test_keyset_chunks_ascending(self):
+        with self.assertNumQueries(3):
+            chunks = list(CommonInfoBasedModel.objects.keyset_chunks(chunk_size=2))
+
+        self.assertEqual(chunks, [self.ascending[0:2], self.ascending[2:4], self.ascending[4:]])
+
+    def test_keyset_chunks_descending(self):
+        chunks = list(CommonInfoBasedModel.objects.keyset_chunks(chunk_size=2, descending=True))
+
+        self.assertEqual([obj for chunk in chunks for obj in chunk], self.ascending[::-1])
+
+    def test_keyset_chunks_exact_multiple_of_chunk_size(self):
+        with self.assertNumQueries(2):
+            chunks = list(CommonInfoBasedModel.objects.keyset_chunks(chunk_size=5))
+
+        self.assertEqual(chunks, [self.ascending])
+
+    def test_keyset_chunks_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            list(CommonInfoBasedModel.objects.keyset_chunks(chunk_size=0))
+
+    def test_keyset_chunks_no_offset(self):
+        with CaptureQueriesContext(connection) as context:
+            list(CommonInfoBasedModel.objects.keyset_chunks(chunk_size=2))
+
+        for query in context.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+
+    def test_keyset_iterator_keeps_filters(self):
+        objs = list(CommonInfoBasedModel.objects.filter(value__gte=1).order_by("-value").keyset_iterator(chunk_size=1))
+
+        self.assertEqual(objs, [obj for obj in self.ascending if obj.value >= 1])
+
+    def test_keyset_page_walks_all_pages(self):
+        objs = []
+        cursor = None
+        while True:
+            page = CommonInfoBasedModel.objects.keyset_page(cursor=cursor, page_size=2)
+            objs.extend(page.objects)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(objs, self.ascending)
+
+    def test_keyset_page_descending(self):
+        page = CommonInfoBasedModel.objects.keyset_page(page_size=2, descending=True)
+        next_page = CommonInfoBasedModel.objects.keyset_page(cursor=page.next_cursor, page_size=2, descending=True)
+
+        self.assertEqual(page.objects, self.ascending[:-3:-1])
+        self.assertEqual(next_page.objects, self.ascending[-3:-5:-1])
+
+    def test_keyset_page_last_page(self):
+        page = CommonInfoBasedModel.objects.keyset_page(page_size=5)
+
+        self.assertEqual(page.objects, self.ascending)
+        self.assertIsNone(page.next_cursor)
+
+    def test_keyset_page_invalid_page_size(self):
+        with self.assertRaises(ValueError):
+            CommonInfoBasedModel.objects.keyset_page(page_size=0)
+
+    def test_keyset_page_invalid_cursor(self):
+        for cursor in ("not-base64!", "bm8tanNvbg==", "WyJmb28iLCAxXQ==", "WzFd"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                CommonInfoBasedModel.objects.keyset_page(cursor=cursor)
+
+    def test_get_keyset_cursor_keeps_microseconds(self):
+        cursor = CreatedAtInfoQuerySet.get_keyset_cursor(self.ascending[0])
+
+        self.assertEqual(
+            CommonInfoBasedModel.objects.all()._decode_keyset_cursor(cursor),
+            (self.ascending[0].created_at, self.ascending[0].pk),
+        )
+
+
+class CommonInfoQuerySetWithAuditUsersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my_user", email="user@example.com", first_name="Neo")
+        for value in range(5):
+            CommonInfoBasedModel.objects.create(value=value, created_by=cls.user, lastmodified_by=cls.user)
+
+    def test_with_audit_users_single_query(self):
+        with self.assertNumQueries(1):
+            for obj in CommonInfoBasedModel.objects.with_audit_users():
+                self.assertEqual(obj.created_by.email, "user@example.com")
+                self.assertEqual(obj.lastmodified_by.first_name, "Neo")
+
+    def test_with_audit_users_defers_other_user_fields(self):
+        obj = CommonInfoBasedModel.objects.with_audit_users().first()
+
+        self.assertEqual(obj.get_deferred_fields(), set())
+        self.assertIn("password", obj.created_by.get_deferred_fields())
+        self.assertIn("last_login", obj.lastmodified_by.get_deferred_fields())
+        self.assertNotIn("username", obj.created_by.get_deferred_fields())
+        self.assertNotIn("email", obj.created_by.get_deferred_fields())
+
+    def test_with_audit_users_custom_user_fields(self):
+        obj = CommonInfoBasedModel.objects.with_audit_users(user_fields=["is_active"]).first()
+
+        self.assertIn("email", obj.created_by.get_deferred_fields())
+        self.assertNotIn("is_active", obj.created_by.get_deferred_fields())
+
+    def test_with_audit_users_null_users(self):
+        CommonInfoBasedModel.objects.update(created_by=None, lastmodified_by=None)
+
+        with self.assertNumQueries(1):
+            obj = CommonInfoBasedModel.objects.with_audit_users().first()
+            self.assertIsNone(obj.created_by)
+            self.assertIsNone(obj.lastmodified_by)
+
+
+class RequestCachedGloballyVisibleQuerySet(RequestCachedPermissionQuerySetMixin, GloballyVisibleQuerySet):
+    pass
+
+
+class RequestCachedEmptyQuerySet(RequestCachedPermissionQuerySetMixin, GloballyVisibleQuerySet):
+    def visible_for(self, user):
+        return self.none()
+
+
+class RequestCachedPermissionQuerySetMixinTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-username")
+        cls.obj = MySingleSignalModel.objects.create(value=1)
+
+    def test_visible_for_cached_within_request(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            with self.assertNumQueries(1):
+                first_qs = queryset.visible_for(self.user)
+            self.assertIn("IN", str(first_qs.query))
+
+            with mock.patch.object(GloballyVisibleQuerySet, "visible_for") as mocked_visible_for:
+                with self.assertNumQueries(0):
+                    second_qs = queryset.visible_for(self.user)
+
+            mocked_visible_for.assert_not_called()
+            self.assertEqual(list(second_qs), [self.obj])
+
+        run_in_request(run)
+
+    def test_visible_for_result_cache_not_shared(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            first_qs = queryset.visible_for(self.user)
+            self.assertEqual(list(first_qs), [self.obj])
+
+            second_qs = queryset.visible_for(self.user)
+
+            self.assertIsNot(first_qs, second_qs)
+            with self.assertNumQueries(1):
+                self.assertEqual(list(second_qs), [self.obj])
+
+        run_in_request(run)
+
+    def test_editable_for_and_deletable_for_cached_separately(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            queryset.editable_for(self.user)
+            queryset.deletable_for(self.user)
+
+            request_cache = get_request_cache()
+            methods = {key[2] for key in request_cache._data if key[0] == PERMISSION_CACHE_NAMESPACE}
+            self.assertEqual(methods, {"visible_for", "editable_for", "deletable_for"})
+
+        run_in_request(run)
+
+    def test_different_classes_cached_separately(self):
+        def run():
+            self.assertEqual(
+                list(RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel).visible_for(self.user)), [self.obj]
+            )
+            self.assertEqual(list(RequestCachedEmptyQuerySet(model=MySingleSignalModel).visible_for(self.user)), [])
+
+        run_in_request(run)
+
+    def test_different_users_cached_separately(self):
+        other_user = User.objects.create(username="other-username")
+
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            self.assertIsNot(queryset.visible_for(self.user), queryset.visible_for(other_user))
+
+        run_in_request(run)
+
+    def test_different_base_querysets_cached_separately(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            self.assertEqual(list(queryset.filter(pk=self.obj.pk).visible_for(self.user)), [self.obj])
+            self.assertEqual(list(queryset.exclude(pk=self.obj.pk).visible_for(self.user)), [])
+
+        run_in_request(run)
+
+    def test_empty_queryset_not_cached(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel).none()
+            self.assertEqual(list(queryset.visible_for(self.user)), [])
+            self.assertEqual(len(get_request_cache()), 0)
+
+        run_in_request(run)
+
+    def test_not_cached_outside_request(self):
+        queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+
+        self.assertIsNot(queryset.visible_for(self.user), queryset.visible_for(self.user))
+
+    def test_not_cached_across_requests(self):
+        def run():
+            with self.assertNumQueries(1):
+                RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel).visible_for(self.user)
+
+        run_in_request(run)
+        run_in_request(run)
+
+    def test_invalidate_permission_cache(self):
+        def run():
+            queryset = RequestCachedGloballyVisibleQuerySet(model=MySingleSignalModel)
+            queryset.visible_for(self.user)
+            get_request_cache()["other"] = "value"
+
+            invalidate_permission_cache()
+
+            with self.assertNumQueries(1):
+                queryset.visible_for(self.user)
+            self.assertIn("other", get_request_cache())
+
+        run_in_request(run)
@@ -1,10 +1,14 @@
+import asyncio
 import threading
 from http import HTTPStatus
 from unittest.mock import Mock
 
 import pytest
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.functional import SimpleLazyObject
 
 from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
 from ambient_toolbox.middleware.current_user import CurrentUserMiddleware
@@ -104,6 +108,170 @@ def test_request_is_cleared_when_get_response_raises():
     assert CurrentRequestMiddleware.get_current_user() is None
 
 
+def test_current_request_is_none_if_no_request():
+    assert CurrentRequestMiddleware.get_current_request() is None
+
+
+def test_current_request_is_same_as_request():
+    request = Mock(user=None)
+
+    def get_response(request_from_mw):
+        assert CurrentRequestMiddleware.get_current_request() is request
+        return HttpResponse(status=HTTPStatus.OK)
+
+    response = CurrentRequestMiddleware(get_response)(request)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_current_user_id_is_none_if_no_request():
+    assert CurrentRequestMiddleware.get_current_user_id() is None
+
+
+def test_current_user_id_is_none_for_anonymous_user():
+    def get_response(request):
+        assert CurrentRequestMiddleware.get_current_user_id() is None
+        return HttpResponse(status=HTTPStatus.OK)
+
+    request = Mock(user=AnonymousUser())
+    del request._current_user_id
+    response = CurrentRequestMiddleware(get_response)(request)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_current_user_id_is_cached_on_request():
+    user = Mock(pk=1)
+
+    def get_response(request):
+        assert CurrentRequestMiddleware.get_current_user_id() == 1
+        user.pk = 2
+        assert CurrentRequestMiddleware.get_current_user_id() == 1
+        return HttpResponse(status=HTTPStatus.OK)
+
+    request = Mock(user=user)
+    del request._current_user_id
+    response = CurrentRequestMiddleware(get_response)(request)
+
+    assert response.status_code == HTTPStatus.OK
+    assert request._current_user_id == (user, 1)
+
+
+def test_current_user_id_reflects_replaced_user():
+    def get_response(request):
+        assert CurrentRequestMiddleware.get_current_user_id() is None
+        request.user = Mock(pk=3)
+        assert CurrentRequestMiddleware.get_current_user_id() == 3  # noqa: PLR2004
+        return HttpResponse(status=HTTPStatus.OK)
+
+    request = Mock(user=AnonymousUser())
+    del request._current_user_id
+    response = CurrentRequestMiddleware(get_response)(request)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_middleware_is_sync_and_async_capable():
+    assert CurrentRequestMiddleware.sync_capable is True
+    assert CurrentRequestMiddleware.async_capable is True
+
+
+def test_middleware_sync_get_response_not_marked_as_coroutine():
+    middleware = CurrentRequestMiddleware(lambda request: HttpResponse(status=HTTPStatus.OK))
+
+    assert iscoroutinefunction(middleware) is False
+
+
+def test_middleware_async_get_response_sets_request():
+    user = Mock(user_name="test_user")
+
+    async def get_response(request):
+        assert CurrentRequestMiddleware.get_current_user() is user
+        return HttpResponse(status=HTTPStatus.OK)
+
+    middleware = CurrentRequestMiddleware(get_response)
+    response = asyncio.run(middleware(Mock(user=user)))
+
+    assert iscoroutinefunction(middleware) is True
+    assert response.status_code == HTTPStatus.OK
+    assert CurrentRequestMiddleware.get_current_user() is None
+
+
+def test_middleware_async_request_visible_in_sync_code():
+    user = Mock(user_name="test_user")
+
+    async def get_response(request):
+        current_user = await sync_to_async(CurrentRequestMiddleware.get_current_user)()
+        return HttpResponse(status=HTTPStatus.OK if current_user is user else HTTPStatus.CONFLICT)
+
+    response = asyncio.run(CurrentRequestMiddleware(get_response)(Mock(user=user)))
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_middleware_async_request_is_cleared_when_get_response_raises():
+    async def get_response(request):
+        raise RuntimeError("boom")
+
+    middleware = CurrentRequestMiddleware(get_response)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(middleware(Mock(user=Mock())))
+
+    assert CurrentRequestMiddleware.get_current_user() is None
+
+
+def test_aget_current_user_is_none_if_no_request():
+    assert asyncio.run(CurrentRequestMiddleware.aget_current_user()) is None
+
+
+def test_aget_current_user_uses_auser_for_lazy_user():
+    user = Mock(user_name="test_user")
+    request = RequestFactory().get("/")
+    request.user = SimpleLazyObject(lambda: pytest.fail("Lazy user must not be evaluated"))
+
+    async def auser():
+        return user
+
+    request.auser = auser
+
+    async def get_response(request):
+        current_user = await CurrentRequestMiddleware.aget_current_user()
+        return HttpResponse(status=HTTPStatus.OK if current_user is user else HTTPStatus.CONFLICT)
+
+    response = asyncio.run(CurrentRequestMiddleware(get_response)(request))
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_aget_current_user_returns_evaluated_lazy_user():
+    user = Mock(user_name="test_user")
+    request = RequestFactory().get("/")
+    request.user = SimpleLazyObject(lambda: user)
+    request.user.user_name  # noqa: B018
+
+    async def get_response(request):
+        current_user = await CurrentRequestMiddleware.aget_current_user()
+        return HttpResponse(status=HTTPStatus.OK if current_user is user else HTTPStatus.CONFLICT)
+
+    response = asyncio.run(CurrentRequestMiddleware(get_response)(request))
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_aget_current_user_returns_replaced_user():
+    user = Mock(user_name="replaced_user")
+
+    async def get_response(request):
+        request.user = user
+        current_user = await CurrentRequestMiddleware.aget_current_user()
+        return HttpResponse(status=HTTPStatus.OK if current_user is user else HTTPStatus.CONFLICT)
+
+    response = asyncio.run(CurrentRequestMiddleware(get_response)(RequestFactory().get("/")))
+
+    assert response.status_code == HTTPStatus.OK
+
+
 def set_current_user(user=None, current_users=None, ready_event=None, proceed_event=None):
     def get_response(request):
         if ready_event is not None:
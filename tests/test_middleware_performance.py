@@ -0,0 +1,174 @@
+import logging
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ambient_toolbox.middleware.performance import PerformanceMiddleware, RequestMetrics, measure
+from ambient_toolbox.middleware.settings import (
+    get_performance_latency_budget,
+    get_performance_logger_name,
+    get_performance_query_budget,
+    get_performance_server_timing_enabled,
+)
+
+
+def get_response_with_queries(request):
+    list(User.objects.all())
+    list(User.objects.all())
+    return HttpResponse(status=HTTPStatus.OK)
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get("/my-path/")
+
+    def test_server_timing_header_contains_queries(self):
+        response = PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        self.assertRegex(response["Server-Timing"], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$')
+
+    def test_server_timing_header_contains_hooks(self):
+        def get_response(request):
+            with measure("my_hook"):
+                pass
+            return HttpResponse(status=HTTPStatus.OK)
+
+        response = PerformanceMiddleware(get_response)(self.request)
+
+        self.assertRegex(response["Server-Timing"], r", my_hook;dur=[\d.]+$")
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_SERVER_TIMING=False)
+    def test_server_timing_header_disabled(self):
+        response = PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        self.assertNotIn("Server-Timing", response)
+
+    def test_log_line_regular(self):
+        with self.assertLogs("toolbox_performance", level=logging.INFO) as logs:
+            PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        record = logs.records[0]
+        self.assertEqual(record.levelno, logging.INFO)
+        self.assertRegex(record.getMessage(), r"^GET /my-path/ 200 duration=[\d.]+ms queries=2 db=[\d.]+ms$")
+        self.assertEqual(record.performance["queries"], 2)
+        self.assertEqual(record.performance["path"], "/my-path/")
+        self.assertEqual(record.performance["exceeded_budgets"], [])
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_QUERY_BUDGET=1)
+    def test_log_line_query_budget_exceeded(self):
+        with self.assertLogs("toolbox_performance", level=logging.INFO) as logs:
+            PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        self.assertEqual(logs.records[0].levelno, logging.WARNING)
+        self.assertEqual(logs.records[0].performance["exceeded_budgets"], ["queries"])
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_LATENCY_BUDGET=0)
+    def test_log_line_latency_budget_exceeded(self):
+        with self.assertLogs("toolbox_performance", level=logging.INFO) as logs:
+            PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        self.assertEqual(logs.records[0].performance["exceeded_budgets"], ["latency"])
+
+    def test_query_wrapper_removed_after_request(self):
+        with self.assertLogs("toolbox_performance", level=logging.INFO) as logs:
+            PerformanceMiddleware(get_response_with_queries)(self.request)
+
+        list(User.objects.all())
+
+        self.assertEqual(logs.records[0].performance["queries"], 2)
+        self.assertIsNone(PerformanceMiddleware.get_current_metrics())
+
+    def test_metrics_reset_when_get_response_raises(self):
+        def get_response(request):
+            raise RuntimeError("boom")
+
+        with self.assertRaisesMessage(RuntimeError, "boom"):
+            PerformanceMiddleware(get_response)(self.request)
+
+        self.assertIsNone(PerformanceMiddleware.get_current_metrics())
+
+    def test_get_current_metrics_during_request(self):
+        def get_response(request):
+            self.assertIsInstance(PerformanceMiddleware.get_current_metrics(), RequestMetrics)
+            return HttpResponse(status=HTTPStatus.OK)
+
+        PerformanceMiddleware(get_response)(self.request)
+
+
+class MeasureTest(TestCase):
+    def test_measure_outside_request_is_noop(self):
+        with measure("my_hook"):
+            pass
+
+        self.assertIsNone(PerformanceMiddleware.get_current_metrics())
+
+    @mock.patch("ambient_toolbox.middleware.performance.time.perf_counter", side_effect=[0.0, 1.0, 1.5, 2.0, 2.25, 3.0])
+    def test_measure_sums_up_hook(self, *args):
+        def get_response(request):
+            with measure("my_hook"):
+                pass
+            with measure("my_hook"):
+                pass
+            self.assertEqual(PerformanceMiddleware.get_current_metrics().hooks, {"my_hook": 0.75})
+            return HttpResponse(status=HTTPStatus.OK)
+
+        with mock.patch.object(PerformanceMiddleware, "log"):
+            PerformanceMiddleware(get_response)(RequestFactory().get("/"))
+
+
+class RequestMetricsTest(TestCase):
+    def test_as_dict_regular(self):
+        metrics = RequestMetrics()
+        metrics.duration = 0.1234
+        metrics.queries = 3
+        metrics.db_time = 0.05
+        metrics.hooks = {"dispatch": 0.01}
+
+        self.assertEqual(
+            metrics.as_dict(),
+            {"duration_ms": 123.4, "queries": 3, "db_time_ms": 50.0, "hooks_ms": {"dispatch": 10.0}},
+        )
+
+    def test_get_exceeded_budgets_no_budgets(self):
+        metrics = RequestMetrics()
+        metrics.queries = 1000
+
+        self.assertEqual(metrics.get_exceeded_budgets(), [])
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_QUERY_BUDGET=10, AMBIENT_TOOLBOX_PERFORMANCE_LATENCY_BUDGET=100)
+    def test_get_exceeded_budgets_within_budgets(self):
+        metrics = RequestMetrics()
+        metrics.queries = 10
+        metrics.duration = 0.1
+
+        self.assertEqual(metrics.get_exceeded_budgets(), [])
+
+
+class PerformanceSettingsTest(TestCase):
+    def test_get_performance_query_budget_default_used(self):
+        self.assertIsNone(get_performance_query_budget())
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_QUERY_BUDGET=20)
+    def test_get_performance_query_budget_is_set(self):
+        self.assertEqual(get_performance_query_budget(), 20)
+
+    def test_get_performance_latency_budget_default_used(self):
+        self.assertIsNone(get_performance_latency_budget())
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_LATENCY_BUDGET=250)
+    def test_get_performance_latency_budget_is_set(self):
+        self.assertEqual(get_performance_latency_budget(), 250)
+
+    def test_get_performance_server_timing_enabled_default_used(self):
+        self.assertTrue(get_performance_server_timing_enabled())
+
+    def test_get_performance_logger_name_default_used(self):
+        self.assertEqual(get_performance_logger_name(), "toolbox_performance")
+
+    @override_settings(AMBIENT_TOOLBOX_PERFORMANCE_LOGGER_NAME="my_logger")
+    def test_get_performance_logger_name_is_set(self):
+        self.assertEqual(get_performance_logger_name(), "my_logger")
@@ -6,7 +6,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 
 from ambient_toolbox.models import CommonInfo
-from testapp.models import CommonInfoBasedModel
+from testapp.models import CommonInfoBasedAutoNowModel, CommonInfoBasedModel
 
 
 class CreatedAtInfoTest(TestCase):
@@ -196,3 +196,269 @@ class CommonInfoTest(TestCase):
 
         self.assertEqual(obj.created_by, mock_user)
         self.assertEqual(obj.lastmodified_by, mock_user)
+
+
+class CommonInfoUserIdTest(TestCase):
+    """Test suite for setting the user fields via their ids."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+
+    @patch("ambient_toolbox.middleware.current_request.CurrentRequestMiddleware.get_current_user_id")
+    def test_save_uses_user_id(self, mock_get_user_id):
+        """Test that save() sets the user fields via the id of the current user."""
+        mock_get_user_id.return_value = self.user.pk
+
+        obj = CommonInfoBasedModel.objects.create(value=1)
+
+        self.assertEqual(obj.created_by_id, self.user.pk)
+        self.assertEqual(obj.lastmodified_by_id, self.user.pk)
+
+    @patch("ambient_toolbox.middleware.current_request.CurrentRequestMiddleware.get_current_user_id")
+    def test_save_uses_user_id_via_set_user_id_fields(self, mock_get_user_id):
+        """Test that the fast path passes the id to set_user_id_fields()."""
+        mock_get_user_id.return_value = self.user.pk
+
+        with patch.object(CommonInfoBasedModel, "set_user_id_fields") as mocked_set_user_id_fields:
+            CommonInfoBasedModel.objects.create(value=1)
+
+        mocked_set_user_id_fields.assert_called_once_with(self.user.pk)
+
+    def test_save_uses_overwritten_get_current_user(self):
+        """Test that an overwritten get_current_user() is still respected."""
+        with patch.object(CommonInfoBasedModel, "get_current_user", return_value=self.user):
+            obj = CommonInfoBasedModel.objects.create(value=1)
+
+        self.assertEqual(obj.created_by, self.user)
+        self.assertEqual(obj.lastmodified_by, self.user)
+
+    def test_set_user_id_fields_new_object(self):
+        """Test that both fields are set on new objects."""
+        obj = CommonInfoBasedModel(value=1)
+        obj.set_user_id_fields(self.user.pk)
+
+        self.assertEqual(obj.created_by_id, self.user.pk)
+        self.assertEqual(obj.lastmodified_by_id, self.user.pk)
+
+    def test_set_user_id_fields_existing_object(self):
+        """Test that only lastmodified_by is set on existing objects."""
+        other_user = User.objects.create(username="other-user")
+        obj = CommonInfoBasedModel.objects.create(value=1, created_by=other_user)
+        obj.set_user_id_fields(self.user.pk)
+
+        self.assertEqual(obj.created_by_id, other_user.pk)
+        self.assertEqual(obj.lastmodified_by_id, self.user.pk)
+
+    def test_set_user_id_fields_none(self):
+        """Test that the fields are not touched without a user id."""
+        obj = CommonInfoBasedModel(value=1, lastmodified_by=self.user)
+        obj.set_user_id_fields(None)
+
+        self.assertIsNone(obj.created_by_id)
+        self.assertEqual(obj.lastmodified_by_id, self.user.pk)
+
+    @patch("ambient_toolbox.middleware.current_request.CurrentRequestMiddleware.get_current_user_id")
+    def test_get_current_user_id_from_middleware(self, mock_get_user_id):
+        """Test that get_current_user_id calls the middleware."""
+        mock_get_user_id.return_value = 42
+
+        self.assertEqual(CommonInfo.get_current_user_id(), 42)
+
+
+@patch("testapp.models.CommonInfoBasedModel.TRACK_FIELD_CHANGES", True)
+class CommonInfoTrackFieldChangesTest(TestCase):
+    """Test suite for the opt-in change tracking of CommonInfo."""
+
+    def test_unchanged_object_not_saved(self):
+        """Test that saving a loaded object without changes doesn't hit the database."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+
+        with self.assertNumQueries(0):
+            obj.save()
+
+    @freeze_time("2022-06-26 10:00")
+    def test_unchanged_object_keeps_lastmodified_at(self):
+        """Test that a skipped save doesn't bump lastmodified_at."""
+        with freeze_time("2020-09-19"):
+            CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+
+        obj.save()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.lastmodified_at.year, 2020)
+
+    @freeze_time("2022-06-26 10:00")
+    def test_changed_fields_and_audit_fields_saved(self):
+        """Test that only changed fields plus the audit fields are written."""
+        with freeze_time("2020-09-19"):
+            CommonInfoBasedModel.objects.create(value=1, value_b=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.value = 2
+        # Changed in the database in the meantime, must not be overwritten
+        CommonInfoBasedModel.objects.update(value_b=999)
+
+        obj.save()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertEqual(obj.value_b, 999)
+        self.assertEqual(obj.lastmodified_at, timezone.now())
+
+    @patch("testapp.models.CommonInfoBasedModel.ALWAYS_UPDATE_FIELDS", False)
+    def test_changed_fields_passed_as_update_fields(self):
+        """Test that the computed update_fields contain the changed fields and the audit fields."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.value = 2
+
+        with patch("ambient_toolbox.models.CreatedAtInfo.save") as mocked_save:
+            obj.save()
+
+        self.assertEqual(mocked_save.call_args.kwargs["update_fields"], {"value", "lastmodified_at", "lastmodified_by"})
+
+    def test_explicit_update_fields_not_overwritten(self):
+        """Test that explicitly passed update_fields take precedence over the tracking."""
+        CommonInfoBasedModel.objects.create(value=1, value_b=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.value = 2
+        obj.value_b = 2
+
+        obj.save(update_fields=["value"])
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertEqual(obj.value_b, 1)
+
+    def test_snapshot_refreshed_after_save(self):
+        """Test that a second save without changes is skipped."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.value = 2
+        obj.save()
+
+        self.assertEqual(obj.get_changed_fields(), set())
+        with self.assertNumQueries(0):
+            obj.save()
+
+    def test_created_object_tracked_after_save(self):
+        """Test that newly created objects are tracked after their first save."""
+        obj = CommonInfoBasedModel.objects.create(value=1)
+
+        with self.assertNumQueries(0):
+            obj.save()
+
+    def test_new_object_always_saved(self):
+        """Test that unsaved objects are inserted."""
+        obj = CommonInfoBasedModel(value=1)
+        obj.save()
+
+        self.assertEqual(CommonInfoBasedModel.objects.count(), 1)
+
+    @freeze_time("2022-06-26 10:00")
+    def test_auto_now_fields_saved_with_changed_fields(self):
+        """Test that fields set in pre_save, like auto_now fields, are written with the changed fields."""
+        with freeze_time("2020-09-19"):
+            CommonInfoBasedAutoNowModel.objects.create(value=1)
+        obj = CommonInfoBasedAutoNowModel.objects.get()
+        obj.value = 2
+
+        obj.save()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.value, 2)
+        self.assertEqual(obj.updated_at, timezone.now())
+
+    def test_auto_now_fields_not_considered_as_changed(self):
+        """Test that auto_now fields alone don't trigger a save."""
+        CommonInfoBasedAutoNowModel.objects.create(value=1)
+        obj = CommonInfoBasedAutoNowModel.objects.get()
+
+        with self.assertNumQueries(0):
+            obj.save()
+
+    def test_get_changed_fields_regular(self):
+        """Test that changed fields are detected."""
+        CommonInfoBasedModel.objects.create(value=1, value_b=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.value_b = 2
+
+        self.assertEqual(obj.get_changed_fields(), {"value_b"})
+
+    def test_get_changed_fields_foreign_key(self):
+        """Test that foreign keys are reported by their field name."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+        obj.created_by = User.objects.create(username="my-user")
+
+        self.assertEqual(obj.get_changed_fields(), {"created_by"})
+
+    def test_get_changed_fields_deferred_field_set(self):
+        """Test that deferred fields which were assigned without loading count as changed."""
+        CommonInfoBasedModel.objects.create(value=1, value_b=1)
+        obj = CommonInfoBasedModel.objects.defer("value_b").get()
+
+        self.assertEqual(obj.get_changed_fields(), set())
+
+        obj.value_b = 1
+
+        self.assertEqual(obj.get_changed_fields(), {"value_b"})
+
+    def test_get_changed_fields_deferred_field_loaded(self):
+        """Test that loading a deferred field adds it to the snapshot."""
+        CommonInfoBasedModel.objects.create(value=1, value_b=1)
+        obj = CommonInfoBasedModel.objects.defer("value_b").get()
+        obj.value = 2
+
+        self.assertEqual(obj.value_b, 1)
+        self.assertEqual(obj.get_changed_fields(), {"value"})
+
+    def test_refresh_from_db_resets_snapshot(self):
+        """Test that values loaded by refresh_from_db() are not reported as changed."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+        CommonInfoBasedModel.objects.update(value=5)
+
+        obj.refresh_from_db()
+
+        self.assertEqual(obj.get_changed_fields(), set())
+
+    def test_save_to_other_database_not_skipped(self):
+        """Test that saving to another database is never skipped."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+
+        self.assertFalse(obj._can_skip_unchanged_fields(force_insert=False, using="other", update_fields=None))
+
+    def test_mutable_values_copied(self):
+        """Test that the snapshot isn't affected by in-place changes of mutable values."""
+        obj = CommonInfoBasedModel(value=1)
+        obj.value = [1]
+
+        field_values = obj._get_field_values()
+        obj.value.append(2)
+
+        self.assertEqual(field_values["value"], [1])
+
+
+class CommonInfoTrackFieldChangesDisabledTest(TestCase):
+    """Test suite for the default behaviour without change tracking."""
+
+    def test_unchanged_object_saved(self):
+        """Test that objects are saved even if nothing changed."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+
+        with self.assertNumQueries(1):
+            obj.save()
+
+    def test_no_snapshot_taken(self):
+        """Test that no snapshot is kept if the tracking is disabled."""
+        CommonInfoBasedModel.objects.create(value=1)
+        obj = CommonInfoBasedModel.objects.get()
+
+        self.assertFalse(hasattr(obj, "_loaded_values"))
@@ -1,8 +1,20 @@
-from django.contrib.auth.models import Permission
+from django.contrib.auth.models import Group, Permission, User
 from django.test import TestCase
 
-from ambient_toolbox.utils import get_cached_related_obj, object_to_dict
-from testapp.models import ForeignKeyRelatedModel, MySingleSignalModel
+from ambient_toolbox.utils import (
+    LazyRelatedAccessError,
+    StrictRelatedAccess,
+    get_cached_related_obj,
+    get_uncached_related_paths,
+    object_to_dict,
+)
+from testapp.models import (
+    ForeignKeyRelatedModel,
+    ModelWithFkToSelf,
+    ModelWithM2MToUser,
+    ModelWithOneToOneToSelf,
+    MySingleSignalModel,
+)
 
 
 class UtilModelTest(TestCase):
@@ -84,3 +96,262 @@ class UtilModelTest(TestCase):
                 "Did you forget to use `select_related()` or `prefetch_related()`?",
                 str(ctx.exception),
             )
+
+
+class GetCachedRelatedObjNestedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.grandparent = ModelWithFkToSelf.objects.create()
+        cls.parent = ModelWithFkToSelf.objects.create(parent=cls.grandparent)
+        cls.child = ModelWithFkToSelf.objects.create(parent=cls.parent)
+
+    def test_get_cached_related_obj_nested_path(self):
+        obj = ModelWithFkToSelf.objects.select_related("parent__parent").get(pk=self.child.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_related_obj(obj, "parent__parent"), self.grandparent)
+            self.assertEqual(get_cached_related_obj(obj, "parent.parent"), self.grandparent)
+
+    def test_get_cached_related_obj_nested_path_with_null_relation(self):
+        obj = ModelWithFkToSelf.objects.select_related("parent__parent__parent").get(pk=self.child.pk)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_cached_related_obj(obj, "parent__parent__parent__parent"))
+
+    def test_get_cached_related_obj_nested_path_not_cached(self):
+        obj = ModelWithFkToSelf.objects.select_related("parent").get(pk=self.child.pk)
+
+        with self.assertNumQueries(0):
+            with self.assertRaisesMessage(AttributeError, 'Field "parent" not found in `fields_cache`'):
+                get_cached_related_obj(obj, "parent__parent")
+            self.assertIsNone(get_cached_related_obj(obj, "parent__parent", silently_return_none=True))
+
+    def test_get_cached_related_obj_prefetched_queryset(self):
+        obj = ModelWithFkToSelf.objects.prefetch_related("children").get(pk=self.parent.pk)
+
+        with self.assertNumQueries(0):
+            children = get_cached_related_obj(obj, "children")
+            self.assertEqual(list(children), [self.child])
+
+    def test_get_cached_related_obj_nested_prefetched_queryset(self):
+        obj = (
+            ModelWithFkToSelf.objects.select_related("parent")
+            .prefetch_related("parent__children")
+            .get(pk=self.child.pk)
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_cached_related_obj(obj, "parent__children")), [self.child])
+
+    def test_get_cached_related_obj_path_through_to_many_relation(self):
+        obj = ModelWithFkToSelf.objects.prefetch_related("children__parent").get(pk=self.parent.pk)
+
+        with self.assertRaises(TypeError):
+            get_cached_related_obj(obj, "children__parent")
+
+    def test_get_cached_related_obj_prefetched_many_to_many(self):
+        user = User.objects.create(username="user")
+        obj = ModelWithM2MToUser.objects.create()
+        obj.users.add(user)
+        obj = ModelWithM2MToUser.objects.prefetch_related("users").get(pk=obj.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_cached_related_obj(obj, "users")), [user])
+
+    def test_get_cached_related_obj_prefetched_reverse_many_to_many_without_related_name(self):
+        group = Group.objects.create(name="group")
+        permission = Permission.objects.first()
+        group.permissions.add(permission)
+        permission = Permission.objects.prefetch_related("group_set").get(pk=permission.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_cached_related_obj(permission, "group_set")), [group])
+            self.assertEqual(get_uncached_related_paths([permission], ["group_set"]), {})
+
+    def test_get_uncached_related_paths_regular(self):
+        objs = list(ModelWithFkToSelf.objects.select_related("parent").order_by("pk"))
+
+        with self.assertNumQueries(0):
+            uncached_paths = get_uncached_related_paths(objs, ["parent", "parent__parent", "children"])
+
+        self.assertEqual(
+            uncached_paths,
+            {
+                "parent__parent": [self.parent, self.child],
+                "children": [self.grandparent, self.parent, self.child],
+            },
+        )
+
+    def test_get_uncached_related_paths_all_cached(self):
+        objs = list(ModelWithFkToSelf.objects.select_related("parent__parent").prefetch_related("children"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_uncached_related_paths(objs, ["parent__parent", "children"]), {})
+
+    def test_get_uncached_related_paths_through_prefetched_objects(self):
+        objs = [ModelWithFkToSelf.objects.prefetch_related("children").get(pk=self.grandparent.pk)]
+
+        with self.assertNumQueries(0):
+            uncached_paths = get_uncached_related_paths(objs, ["children.children"])
+
+        self.assertEqual(uncached_paths, {"children__children": objs})
+
+
+class StrictRelatedAccessTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.single_signal = MySingleSignalModel.objects.create(value=1)
+        cls.fk_related = ForeignKeyRelatedModel.objects.create(single_signal=cls.single_signal)
+        cls.peer = ModelWithOneToOneToSelf.objects.create()
+        cls.one_to_one = ModelWithOneToOneToSelf.objects.create(peer=cls.peer)
+        cls.m2m = ModelWithM2MToUser.objects.create()
+        cls.m2m.users.add(User.objects.create(username="user"))
+
+    def test_init_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            StrictRelatedAccess(mode="ignore")
+
+    def test_init_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            StrictRelatedAccess(sample_rate=1.5)
+
+    def test_forward_foreign_key_lazy(self):
+        obj = ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk)
+
+        with StrictRelatedAccess():
+            with self.assertRaisesMessage(LazyRelatedAccessError, '"ForeignKeyRelatedModel.single_signal"'):
+                obj.single_signal  # noqa: B018
+
+    def test_forward_foreign_key_select_related(self):
+        obj = ForeignKeyRelatedModel.objects.select_related("single_signal").get(pk=self.fk_related.pk)
+
+        with StrictRelatedAccess(), self.assertNumQueries(0):
+            self.assertEqual(obj.single_signal, self.single_signal)
+
+    def test_reverse_one_to_one_lazy(self):
+        obj = ModelWithOneToOneToSelf.objects.get(pk=self.peer.pk)
+
+        with StrictRelatedAccess():
+            with self.assertRaisesMessage(LazyRelatedAccessError, '"ModelWithOneToOneToSelf.related_peer"'):
+                obj.related_peer  # noqa: B018
+
+    def test_reverse_one_to_one_prefetch_related(self):
+        with StrictRelatedAccess():
+            obj = ModelWithOneToOneToSelf.objects.prefetch_related("related_peer").get(pk=self.peer.pk)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(obj.related_peer, self.one_to_one)
+
+    def test_reverse_foreign_key_lazy(self):
+        obj = MySingleSignalModel.objects.get(pk=self.single_signal.pk)
+
+        with StrictRelatedAccess():
+            with self.assertRaisesMessage(LazyRelatedAccessError, '"MySingleSignalModel.foreign_key_related_models"'):
+                list(obj.foreign_key_related_models.all())
+
+    def test_reverse_foreign_key_prefetch_related(self):
+        with StrictRelatedAccess():
+            obj = MySingleSignalModel.objects.prefetch_related("foreign_key_related_models").get(
+                pk=self.single_signal.pk
+            )
+
+            with self.assertNumQueries(0):
+                self.assertEqual(list(obj.foreign_key_related_models.all()), [self.fk_related])
+
+    def test_reverse_foreign_key_write_methods(self):
+        obj = MySingleSignalModel.objects.get(pk=self.single_signal.pk)
+
+        with StrictRelatedAccess():
+            created_obj = obj.foreign_key_related_models.create()
+            obj.foreign_key_related_models.get_or_create(pk=created_obj.pk)
+            obj.foreign_key_related_models.update_or_create(pk=created_obj.pk)
+
+            with self.assertRaises(LazyRelatedAccessError):
+                list(obj.foreign_key_related_models.all())
+
+        self.assertEqual(ForeignKeyRelatedModel.objects.filter(single_signal=obj).count(), 2)
+
+    def test_many_to_many_write_methods(self):
+        obj = ModelWithM2MToUser.objects.get(pk=self.m2m.pk)
+        user = User.objects.create(username="other-user")
+
+        with StrictRelatedAccess():
+            obj.users.add(user)
+            obj.users.remove(user)
+            obj.users.set([user])
+            obj.users.create(username="created-user")
+            obj.users.clear()
+
+        self.assertFalse(obj.users.exists())
+
+    def test_many_to_many_lazy(self):
+        obj = ModelWithM2MToUser.objects.get(pk=self.m2m.pk)
+
+        with StrictRelatedAccess():
+            with self.assertRaisesMessage(LazyRelatedAccessError, '"ModelWithM2MToUser.users"'):
+                obj.users.count()
+
+    def test_many_to_many_prefetch_related(self):
+        obj = ModelWithM2MToUser.objects.prefetch_related("users").get(pk=self.m2m.pk)
+
+        with StrictRelatedAccess(), self.assertNumQueries(0):
+            self.assertEqual(obj.users.count(), 1)
+
+    def test_lazy_access_outside_block(self):
+        obj = ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk)
+
+        with StrictRelatedAccess():
+            pass
+
+        with self.assertNumQueries(1):
+            self.assertEqual(obj.single_signal, self.single_signal)
+
+    def test_log_mode(self):
+        objs = list(ForeignKeyRelatedModel.objects.all()) * 3
+
+        with self.assertLogs("toolbox_strict_mode", level="WARNING") as logs:
+            with StrictRelatedAccess(mode=StrictRelatedAccess.MODE_LOG) as strict_related_access:
+                for obj in objs:
+                    obj.single_signal  # noqa: B018
+
+        self.assertEqual(list(strict_related_access.violations), ["ForeignKeyRelatedModel.single_signal"])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Lazy access of "ForeignKeyRelatedModel.single_signal" (1 times)', logs.output[0])
+        self.assertIn("test_log_mode", logs.output[0])
+
+    def test_log_mode_counts_accesses(self):
+        with self.assertLogs("toolbox_strict_mode", level="WARNING") as logs:
+            with StrictRelatedAccess(mode=StrictRelatedAccess.MODE_LOG):
+                for _ in range(3):
+                    ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk).single_signal  # noqa: B018
+
+        self.assertIn("(3 times)", logs.output[0])
+
+    def test_sample_rate_zero(self):
+        obj = ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk)
+
+        with StrictRelatedAccess(sample_rate=0.0):
+            self.assertEqual(obj.single_signal, self.single_signal)
+
+    def test_nested_blocks(self):
+        obj = ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk)
+
+        with StrictRelatedAccess():
+            with StrictRelatedAccess(sample_rate=0.0):
+                self.assertEqual(obj.single_signal, self.single_signal)
+
+            obj = ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk)
+            with self.assertRaises(LazyRelatedAccessError):
+                obj.single_signal  # noqa: B018
+
+    def test_decorator(self):
+        @StrictRelatedAccess()
+        def access(obj):
+            return obj.single_signal
+
+        with self.assertRaises(LazyRelatedAccessError):
+            access(ForeignKeyRelatedModel.objects.get(pk=self.fk_related.pk))
@@ -0,0 +1,152 @@
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+
+from ambient_toolbox.tests.mixins import run_in_request
+from ambient_toolbox.utils import RequestCache, get_request_cache, request_memoize
+
+
+class RequestCacheTest(TestCase):
+    def test_get_or_set_miss_and_hit(self):
+        request_cache = RequestCache()
+        default = mock.Mock(return_value="value")
+
+        self.assertEqual(request_cache.get_or_set("key", default), "value")
+        self.assertEqual(request_cache.get_or_set("key", default), "value")
+
+        default.assert_called_once_with()
+        self.assertEqual(request_cache.hits, 1)
+        self.assertEqual(request_cache.misses, 1)
+
+    def test_get_counts_hits_and_misses(self):
+        request_cache = RequestCache()
+        request_cache.set("key", "value")
+
+        self.assertEqual(request_cache.get("key"), "value")
+        self.assertEqual(request_cache.get("other-key", "default"), "default")
+
+        self.assertEqual(request_cache.hits, 1)
+        self.assertEqual(request_cache.misses, 1)
+
+    def test_dict_interface(self):
+        request_cache = RequestCache()
+        request_cache["key"] = "value"
+
+        self.assertIn("key", request_cache)
+        self.assertEqual(request_cache["key"], "value")
+        self.assertEqual(len(request_cache), 1)
+
+        del request_cache["key"]
+
+        self.assertNotIn("key", request_cache)
+
+    def test_invalidate_namespace(self):
+        request_cache = RequestCache()
+        request_cache[("groups", 1)] = "a"
+        request_cache[("groups", 2)] = "b"
+        request_cache[("permissions", 1)] = "c"
+        request_cache["groups"] = "d"
+
+        request_cache.invalidate("groups")
+
+        self.assertNotIn(("groups", 1), request_cache)
+        self.assertNotIn(("groups", 2), request_cache)
+        self.assertIn(("permissions", 1), request_cache)
+        self.assertIn("groups", request_cache)
+
+    def test_invalidate_all(self):
+        request_cache = RequestCache()
+        request_cache[("groups", 1)] = "a"
+        request_cache["key"] = "b"
+
+        request_cache.invalidate()
+
+        self.assertEqual(len(request_cache), 0)
+
+
+class GetRequestCacheTest(TestCase):
+    def test_same_cache_within_request(self):
+        request = RequestFactory().get("/")
+
+        caches = run_in_request(lambda: (get_request_cache(), get_request_cache()), request=request)
+
+        self.assertIs(caches[0], caches[1])
+        self.assertIs(request._ambient_toolbox_request_cache, caches[0])
+
+    def test_new_cache_per_request(self):
+        first_cache = run_in_request(get_request_cache)
+        second_cache = run_in_request(get_request_cache)
+
+        self.assertIsNot(first_cache, second_cache)
+
+    def test_outside_request_not_stored(self):
+        self.assertIsNot(get_request_cache(), get_request_cache())
+
+
+class RequestMemoizeTest(TestCase):
+    def test_executed_once_per_request(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(func)
+
+        results = run_in_request(lambda: [memoized_func(1, flag=True), memoized_func(1, flag=True)])
+
+        self.assertEqual(results, ["result", "result"])
+        func.assert_called_once_with(1, flag=True)
+
+    def test_different_arguments_executed_separately(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(func)
+
+        run_in_request(lambda: [memoized_func(1), memoized_func(2)])
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_executed_again_in_next_request(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(func)
+
+        run_in_request(memoized_func)
+        run_in_request(memoized_func)
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_executed_every_time_outside_request(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(func)
+
+        memoized_func()
+        memoized_func()
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_unhashable_arguments_not_cached(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(func)
+
+        run_in_request(lambda: [memoized_func([1]), memoized_func([1])])
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_default_namespace(self):
+        @request_memoize
+        def my_function():
+            return "result"
+
+        self.assertEqual(
+            my_function.namespace,
+            "tests.test_utils_request_cache.RequestMemoizeTest.test_default_namespace.<locals>.my_function",
+        )
+
+    def test_custom_namespace_invalidated(self):
+        func = mock.Mock(return_value="result", __module__="my_module", __qualname__="func")
+        memoized_func = request_memoize(namespace="my_namespace")(func)
+
+        def run():
+            memoized_func()
+            get_request_cache().invalidate(memoized_func.namespace)
+            memoized_func()
+
+        run_in_request(run)
+
+        self.assertEqual(memoized_func.namespace, "my_namespace")
+        self.assertEqual(func.call_count, 2)
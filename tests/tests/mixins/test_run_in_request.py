@@ -0,0 +1,22 @@
+from django.test import RequestFactory, TestCase
+
+from ambient_toolbox.middleware.current_request import CurrentRequestMiddleware
+from ambient_toolbox.tests.mixins import run_in_request
+
+
+class RunInRequestTest(TestCase):
+    def test_result_is_returned(self):
+        self.assertEqual(run_in_request(lambda: 27), 27)
+
+    def test_default_request_is_provided(self):
+        request = run_in_request(CurrentRequestMiddleware.get_current_request)
+        self.assertEqual(request.method, "GET")
+        self.assertEqual(request.path, "/")
+
+    def test_passed_request_is_provided(self):
+        request = RequestFactory().post("/my-url/")
+        self.assertIs(run_in_request(CurrentRequestMiddleware.get_current_request, request=request), request)
+
+    def test_request_is_released_afterwards(self):
+        run_in_request(lambda: None)
+        self.assertIsNone(CurrentRequestMiddleware.get_current_request())